@@ -0,0 +1,135 @@
+"""
+Import-time budget check.
+
+Imports each module in a fresh interpreter with `python -X importtime`, reports
+the cumulative import time and fails if a module exceeds its budget or pulls in
+a module it must not load (e.g. tracing or google.adk for the numeric modules).
+
+The modules built on google.adk take seconds to import, nearly all of it in ADK
+itself, so a fixed budget would either fail on a slow machine or miss a
+regression. Their budget is the import time of their third-party dependencies
+(`ADK_BASELINE`, measured the same way) plus `ADK_MARGIN_MS`; both are the
+fastest of `ADK_RUNS` runs, which keeps the noise well below the margin.
+
+Usage:
+    python benchmarks/import_time.py
+"""
+
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Module -> (budget in milliseconds, modules it must not import)
+IMPORT_BUDGETS = {
+    "ryder_cup_prediction": (50, ("google.adk", "agentops", "numpy")),
+    "ryder_cup_prediction.scoring": (500, ("google.adk", "agentops")),
+    "ryder_cup_prediction.simulation": (500, ("google.adk", "agentops")),
+    "ryder_cup_prediction.exact": (500, ("google.adk", "agentops")),
+    "ryder_cup_prediction.lineup": (500, ("google.adk", "agentops", "mcp")),
+    "ryder_cup_prediction.live": (500, ("google.adk", "agentops", "mcp")),
+    "ryder_cup_prediction.match_play": (500, ("google.adk", "agentops", "mcp")),
+    "ryder_cup_prediction.backtest": (500, ("google.adk", "agentops", "mcp")),
+    "mcp_servers.name_index": (50, ("mcp", "numpy")),
+    "mcp_servers.cache": (100, ("mcp", "numpy")),
+    "mcp_servers.player_store": (500, ("mcp",)),
+}
+
+# Modules dominated by google.adk; the agent tree and tracing must stay deferred.
+# Module -> modules it must not import; the budget is relative to ADK_BASELINE
+ADK_BUDGETS = {
+    "ryder_cup_prediction.agent": ("agentops",),
+    "ryder_cup_prediction.service": ("agentops",),
+}
+
+# Third-party modules the ADK-based modules import
+ADK_BASELINE = (
+    "google.adk",
+    "google.adk.agents",
+    "google.adk.runners",
+    "google.adk.plugins.base_plugin",
+    "google.adk.tools.mcp_tool.mcp_toolset",
+    "google.genai.types",
+    "pydantic",
+    "numpy",
+    "dotenv",
+)
+ADK_MARGIN_MS = 1000
+ADK_RUNS = 3
+
+
+def _import_times(modules: tuple, forbidden: tuple = ()) -> tuple:
+    """Imports `modules` in a fresh interpreter; returns (importtime lines, forbidden modules that were loaded)."""
+    imports = "; ".join(f"import {module}" for module in modules)
+    check = f"import sys; {imports}; print(','.join(m for m in {forbidden!r} if m in sys.modules))"
+    env = {**os.environ, "AGENTOPS_API_KEY": ""}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", check],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # Lines look like "import time:  self [us] | cumulative | imported package",
+    # with nested imports indented below the package that imported them
+    lines = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            lines.append((int(cumulative), name))
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return lines, loaded
+
+
+def measure(module: str, forbidden: tuple) -> tuple:
+    """Returns (cumulative import time in ms, forbidden modules that were loaded)."""
+    lines, loaded = _import_times((module,), forbidden)
+    # The last entry for the top-level package of `module` covers the whole import
+    top_level = module.split(".")[0]
+    cumulative_us = max((us for us, name in lines if name.strip() in (module, top_level)), default=0)
+    return cumulative_us / 1000, loaded
+
+
+def measure_baseline(modules: tuple = ADK_BASELINE) -> float:
+    """Returns the cumulative import time in ms of `modules` imported together."""
+    lines, _ = _import_times(modules)
+    # Sum the outermost entries of the imported packages, skipping interpreter startup
+    packages = {module.split(".")[0] for module in modules}
+    outermost = [(us, name.strip()) for us, name in lines if name.startswith(" ") and not name.startswith("  ")]
+    return sum(us for us, name in outermost if name.split(".")[0] in packages) / 1000
+
+
+def _report(module: str, elapsed_ms: float, budget_ms: float, loaded: list) -> bool:
+    problems = []
+    if elapsed_ms > budget_ms:
+        problems.append("over budget")
+    if loaded:
+        problems.append("imports " + ", ".join(loaded))
+    print(f"{module:<36} {elapsed_ms:>10.1f} {budget_ms:>10.0f}  {'; '.join(problems) or 'ok'}")
+    return bool(problems)
+
+
+def main() -> int:
+    failures = 0
+    print(f"{'module':<36} {'import ms':>10} {'budget ms':>10}  status")
+    for module, (budget_ms, forbidden) in IMPORT_BUDGETS.items():
+        elapsed_ms, loaded = measure(module, forbidden)
+        failures += _report(module, elapsed_ms, budget_ms, loaded)
+
+    baseline_ms = min(measure_baseline() for _ in range(ADK_RUNS))
+    print(f"{'google.adk baseline':<36} {baseline_ms:>10.1f}")
+    for module, forbidden in ADK_BUDGETS.items():
+        runs = [measure(module, forbidden) for _ in range(ADK_RUNS)]
+        elapsed_ms = min(elapsed for elapsed, _ in runs)
+        loaded = sorted({name for _, names in runs for name in names})
+        failures += _report(module, elapsed_ms, baseline_ms + ADK_MARGIN_MS, loaded)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""
+Offline end-to-end benchmark of the prediction pipeline.
+
+Runs the real `create_agent()` fan-out tree and the real DataGolf MCP server
+(spawned over stdio, or the shared server at --mcp-url) on the
+`run_prediction.py` pairings. The deterministic `StubLlm` stands in for
+Gemini, so the benchmark needs no credentials or network and measures the
+orchestration overhead around the model.
+
+For each number of concurrent cards (default 1, 12 and 48) it reports:
+
+- throughput in cards per second and end-to-end latency per card,
+- per-stage, per-model-call and per-tool latency (MCP round trips) with call
+  counts, token estimates and session.state bytes, from `PipelineTracer`,
+- the tracemalloc peak of a separate, traced run of the same scenario.
+
+The first card, which spawns the MCP server and fills its cache, is reported
+separately as the cold start. The exit code is 1 if any card is missing a
+match's probabilities or the card result.
+
+With --llm-cache the stages go through an `LlmResponseCache` at that path:
+the cold start fills it and the scenarios are served from it, which checks
+that every stage's request (structured output schemas included) can be keyed.
+
+Usage:
+    python benchmarks/pipeline.py [--numeric] [--cards 1 12 48] [--llm-latency 0.05] [--json results.json]
+    python benchmarks/pipeline.py --cards 1 --no-memory --llm-cache /tmp/benchmark_cache.sqlite3
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_ROOT)
+
+# Keep the run hermetic: no AgentOps, no LLM response cache, and an in-memory
+# DataGolf cache unless one is explicitly exported
+os.environ["AGENTOPS_API_KEY"] = ""
+os.environ["RYDER_CUP_LLM_CACHE"] = ""
+os.environ.setdefault("DATAGOLF_CACHE_PATH", "")
+
+from google.adk import Runner  # noqa: E402
+from google.adk.sessions import InMemorySessionService  # noqa: E402
+from google.genai import types  # noqa: E402
+from run_prediction import PAIRINGS  # noqa: E402
+from run_prediction import STARTING_SCORE  # noqa: E402
+from run_prediction import build_user_prompt  # noqa: E402
+from ryder_cup_prediction.agent import create_agent  # noqa: E402
+from ryder_cup_prediction.agent import match_state_key  # noqa: E402
+from ryder_cup_prediction.instrumentation import PipelineTracer  # noqa: E402
+from ryder_cup_prediction.instrumentation import format_summary  # noqa: E402
+from ryder_cup_prediction.instrumentation import tracing_plugins  # noqa: E402
+from ryder_cup_prediction.llm_cache import LlmResponseCache  # noqa: E402
+from ryder_cup_prediction.stub_llm import StubLlm  # noqa: E402
+
+APP_NAME = "ryder_cup_benchmark"
+DEFAULT_CARDS = (1, 12, 48)
+
+
+def _summary(durations: list) -> dict:
+    """Count and mean/p50/p95/max in milliseconds of a list of durations in seconds."""
+    if not durations:
+        return {"count": 0}
+    ordered = sorted(durations)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+        "p50_ms": round(percentile(0.50), 2),
+        "p95_ms": round(percentile(0.95), 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+async def run_card(runner: Runner, session_service: InMemorySessionService, user_prompt: str) -> tuple:
+    """Runs one card in a fresh session; returns (latency in seconds, list of problems)."""
+    session = await session_service.create_session(app_name=APP_NAME, user_id="benchmark")
+    message = types.Content(role="user", parts=[types.Part(text=user_prompt)])
+
+    started = time.perf_counter()
+    async for _ in runner.run_async(user_id=session.user_id, session_id=session.id, new_message=message):
+        pass
+    latency = time.perf_counter() - started
+
+    state = (await session_service.get_session(app_name=APP_NAME, user_id="benchmark", session_id=session.id)).state
+    problems = []
+    for match_number in range(1, len(PAIRINGS) + 1):
+        probabilities = state.get(match_state_key("match_probabilities", match_number))
+        if not probabilities or (isinstance(probabilities, dict) and "error" in probabilities):
+            problems.append(f"match {match_number}: {probabilities!r}")
+    if not state.get("card_results"):
+        problems.append("no card_results")
+    return latency, problems
+
+
+async def run_scenario(runner, session_service, user_prompt, cards: int) -> dict:
+    started = time.perf_counter()
+    results = await asyncio.gather(*(run_card(runner, session_service, user_prompt) for _ in range(cards)))
+    wall = time.perf_counter() - started
+    return {
+        "cards": cards,
+        "wall_s": round(wall, 3),
+        "cards_per_s": round(cards / wall, 2),
+        "card_latency": _summary([latency for latency, _ in results]),
+        "problems": [problem for _, problems in results for problem in problems],
+    }
+
+
+async def benchmark(
+    card_counts,
+    numeric_scoring=False,
+    narrative=False,
+    llm_latency=0.0,
+    mcp_url=None,
+    memory=True,
+    trace_path=None,
+    llm_cache_path=None,
+):
+    tracer = PipelineTracer(trace_path)
+    llm_cache = LlmResponseCache(llm_cache_path) if llm_cache_path else None
+    agent = create_agent(
+        pairings=PAIRINGS,
+        starting_score=STARTING_SCORE,
+        numeric_scoring=numeric_scoring,
+        narrative=narrative,
+        mcp_url=mcp_url,
+        model=StubLlm(latency=llm_latency),
+        llm_cache=llm_cache,
+        tracer=tracer,
+    )
+
+    session_service = InMemorySessionService()
+    runner = Runner(app_name=APP_NAME, agent=agent, session_service=session_service, plugins=tracing_plugins(agent))
+    user_prompt = build_user_prompt(PAIRINGS, STARTING_SCORE, fan_out=True)
+
+    try:
+        results = {"cold_start": await run_scenario(runner, session_service, user_prompt, 1), "scenarios": []}
+        for cards in card_counts:
+            tracer.reset()
+            result = await run_scenario(runner, session_service, user_prompt, cards)
+            result.update(tracer.summary())
+
+            if memory:
+                # Traced separately, tracemalloc slows the timed run down several times
+                tracemalloc.start()
+                await run_scenario(runner, session_service, user_prompt, cards)
+                result["peak_memory_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+                tracemalloc.stop()
+
+            results["scenarios"].append(result)
+        if llm_cache:
+            results["llm_cache"] = llm_cache.stats()
+        return results
+    finally:
+        tracer.close()
+        await runner.close()
+
+
+def print_report(results: dict):
+    cold = results["cold_start"]
+    print(f"cold start (MCP server spawn, empty cache): {cold['wall_s'] * 1000:.0f} ms")
+    for scenario in results["scenarios"]:
+        latency = scenario["card_latency"]
+        memory = f", peak memory {scenario['peak_memory_mb']:.1f} MB" if "peak_memory_mb" in scenario else ""
+        print(
+            f"\n== {scenario['cards']} concurrent card(s): {scenario['cards_per_s']:.2f} cards/s,"
+            f" wall {scenario['wall_s']:.2f} s, card p50 {latency['p50_ms']:.0f} ms"
+            f" p95 {latency['p95_ms']:.0f} ms{memory}"
+        )
+        print(format_summary(scenario, limit=15))
+        for problem in scenario["problems"][:5]:
+            print(f"  PROBLEM: {problem}")
+    if "llm_cache" in results:
+        cache = results["llm_cache"]
+        print(f"\nLLM cache: {cache['hits']} hits, {cache['misses']} misses, {cache['entries']} entries")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark with a stub model.")
+    parser.add_argument(
+        "--cards", type=int, nargs="+", default=DEFAULT_CARDS, help="Numbers of concurrent cards to run."
+    )
+    parser.add_argument("--numeric", action="store_true", help="Benchmark the numeric scoring mode.")
+    parser.add_argument("--narrative", action="store_true", help="Add the narrative stage with --numeric.")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds each stub model call takes.")
+    parser.add_argument("--mcp-url", default=None, help="Shared DataGolf MCP server instead of stdio.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced run for the memory peak.")
+    parser.add_argument("--json", default=None, help="Also write the results to this JSON file.")
+    parser.add_argument("--trace", default=None, help="Also export every span to this JSONL file.")
+    parser.add_argument("--llm-cache", default=None, help="Run the stages through an LLM response cache at this path.")
+    args = parser.parse_args()
+
+    # ADK warns once per MCP tool and request about missing auth configs
+    logging.getLogger("google_adk").setLevel(logging.ERROR)
+
+    results = asyncio.run(
+        benchmark(
+            args.cards,
+            numeric_scoring=args.numeric,
+            narrative=args.narrative,
+            llm_latency=args.llm_latency,
+            mcp_url=args.mcp_url,
+            memory=not args.no_memory,
+            trace_path=args.trace,
+            llm_cache_path=args.llm_cache,
+        )
+    )
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failed = results["cold_start"]["problems"] or any(scenario["problems"] for scenario in results["scenarios"])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Two-level cache for upstream (DataGolf API) lookups made by the MCP server.
+
+Every `run_prediction.py` run and every `adk web` session spawns its own server
+process, so an in-memory cache alone would start cold each time. Entries are
+therefore kept in:
+
+1. an in-memory LRU for the lifetime of the process, and
+2. a local SQLite file shared by all server processes on the machine.
+
+Entries live in namespaces (the strokes-gained time windows) that each have
+their own TTL, so long-lived `2-year` data outlives `3-month` form data.
+Concurrent lookups of the same key are coalesced into one upstream fetch,
+which outlives any one cancelled caller.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "rydercup_prediction", "datagolf_cache.sqlite3")
+DEFAULT_MAX_MEMORY_ENTRIES = 4096
+DEFAULT_TTL_SECONDS = 6 * 3600
+
+
+class ToolResultCache:
+    """In-memory LRU in front of a SQLite store, with per-namespace TTLs and request coalescing."""
+
+    def __init__(
+        self,
+        path: str | None = DEFAULT_CACHE_PATH,
+        ttl_seconds: dict | None = None,
+        default_ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_memory_entries: int = DEFAULT_MAX_MEMORY_ENTRIES,
+    ):
+        """
+        Args:
+            path: SQLite file for the on-disk store, or None to only cache in memory.
+            ttl_seconds: Namespace -> TTL in seconds (e.g. {"2-year": 604800}).
+            default_ttl_seconds: TTL of namespaces without an explicit entry.
+            max_memory_entries: Size of the in-memory LRU.
+        """
+        self.ttl_seconds = dict(ttl_seconds or {})
+        self.default_ttl_seconds = default_ttl_seconds
+        self.max_memory_entries = max_memory_entries
+
+        self._memory = OrderedDict()
+        self._inflight = {}
+        # Fetch task -> callers awaiting it
+        self._callers = {}
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "upstream_errors": 0,
+            "evictions": 0,
+        }
+
+        self._db = None
+        if path:
+            path = os.path.expanduser(path)
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, isolation_level=None)
+            # WAL lets the server processes of concurrent sessions read while one writes
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+        self.path = path
+
+    def ttl_for(self, namespace: str) -> float:
+        return self.ttl_seconds.get(namespace, self.default_ttl_seconds)
+
+    async def get_or_fetch(self, namespace: str, key: str, fetch):
+        """
+        Returns the cached value or fetches, stores and returns it.
+
+        The fetch runs in a task of its own: a cancelled caller leaves it running for the
+        callers coalesced into it, and it is only cancelled once none of them is left.
+
+        Args:
+            namespace: Cache namespace, selects the TTL.
+            key: Key within the namespace.
+            fetch: Zero-argument coroutine function doing the upstream lookup.
+                   Its result must be JSON-serializable.
+        """
+        cache_key = (namespace, key)
+        now = time.time()
+
+        entry = self._memory.get(cache_key)
+        if entry and entry[0] > now:
+            self._memory.move_to_end(cache_key)
+            self._stats["memory_hits"] += 1
+            return entry[1]
+
+        row = self._read_disk(namespace, key, now)
+        if row is not None:
+            value, expires_at = row
+            self._stats["disk_hits"] += 1
+            self._remember(cache_key, value, expires_at)
+            return value
+
+        task = self._inflight.get(cache_key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["misses"] += 1
+            task = asyncio.ensure_future(self._fetch(namespace, key, fetch))
+            self._inflight[cache_key] = task
+
+        self._callers[task] = self._callers.get(task, 0) + 1
+        try:
+            # Shielded: cancelling one caller must not cancel the fetch the others wait on
+            return await asyncio.shield(task)
+        finally:
+            self._callers[task] -= 1
+            if not self._callers[task]:
+                del self._callers[task]
+                if not task.done():
+                    # Nobody waits for the fetch any more; new callers start their own
+                    self._forget(cache_key, task)
+                    task.cancel()
+
+    async def _fetch(self, namespace: str, key: str, fetch):
+        """The task of one upstream fetch, shared by every caller coalesced into it."""
+        cache_key = (namespace, key)
+        try:
+            value = await fetch()
+        except Exception:
+            self._stats["upstream_errors"] += 1
+            raise
+        else:
+            expires_at = time.time() + self.ttl_for(namespace)
+            self._remember(cache_key, value, expires_at)
+            self._write_disk(namespace, key, value, expires_at)
+            return value
+        finally:
+            self._forget(cache_key, asyncio.current_task())
+
+    def _forget(self, cache_key: tuple, task: asyncio.Task):
+        if self._inflight.get(cache_key) is task:
+            del self._inflight[cache_key]
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and entry counts."""
+        hits = self._stats["memory_hits"] + self._stats["disk_hits"] + self._stats["coalesced"]
+        lookups = hits + self._stats["misses"]
+        disk_entries = self._db.execute("SELECT COUNT(*) FROM cache").fetchone()[0] if self._db else 0
+        return {
+            **self._stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_entries": disk_entries,
+            "disk_path": self.path,
+            "ttl_seconds": {**self.ttl_seconds, "default": self.default_ttl_seconds},
+        }
+
+    def clear(self):
+        """Drops every entry from memory and disk."""
+        self._memory.clear()
+        if self._db:
+            self._db.execute("DELETE FROM cache")
+
+    def _remember(self, cache_key, value, expires_at):
+        self._memory[cache_key] = (expires_at, value)
+        self._memory.move_to_end(cache_key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _read_disk(self, namespace, key, now):
+        if not self._db:
+            return None
+        row = self._db.execute(
+            "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        if not row:
+            return None
+        if row[1] <= now:
+            self._db.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key))
+            return None
+        return json.loads(row[0]), row[1]
+
+    def _write_disk(self, namespace, key, value, expires_at):
+        if not self._db:
+            return
+        self._db.execute(
+            "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value), expires_at),
+        )
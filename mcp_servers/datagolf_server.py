@@ -1,12 +1,25 @@
+import argparse
 import asyncio
+import os
+import sys
 
 from mcp.server.fastmcp import FastMCP
 
+# MCPToolset runs this file as a script, so make the `mcp_servers` package importable
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_servers.cache import DEFAULT_CACHE_PATH
+from mcp_servers.cache import ToolResultCache
+from mcp_servers.name_index import PlayerNameIndex
+from mcp_servers.player_store import PlayerStore
+
 # Initialize FastMCP server
 mcp = FastMCP("DataGolf")
 
 # Mock data for Phase 1.
-# This simulates the data we'd get from the DataGolf API.
+# This simulates the data we'd get from the DataGolf API. It seeds the player
+# store when no DATAGOLF_STORE_PATH is configured.
 MOCK_PLAYER_DATA = {
     "Scottie Scheffler": {
         "2-year": {"total_sg": 2.85, "off_the_tee": 0.95, "approach": 1.25, "around_the_green": 0.35, "putting": 0.30},
@@ -113,27 +126,197 @@ MOCK_PLAYER_DATA = {
 }
 
 
+# Common alternative spellings that normalization alone can't resolve
+PLAYER_ALIASES = {
+    "Bob MacIntyre": "Robert MacIntyre",
+    "Matthew Fitzpatrick": "Matt Fitzpatrick",
+    "Thomas Fleetwood": "Tommy Fleetwood",
+    "Scott Scheffler": "Scottie Scheffler",
+    "Xander Schaufele": "Xander Schauffele",
+    "Jonathan Rahm": "Jon Rahm",
+}
+
+# Snapshot date of MOCK_PLAYER_DATA in the seeded store
+MOCK_DATA_AS_OF = "2025-09-22"
+
+
+def _open_player_store(path: str | None) -> PlayerStore:
+    """Opens the columnar store at `path` read-only, or an in-memory store seeded with MOCK_PLAYER_DATA."""
+    if path:
+        return PlayerStore(path, readonly=True)
+    store = PlayerStore()
+    store.upsert((name, MOCK_DATA_AS_OF, data) for name, data in MOCK_PLAYER_DATA.items())
+    return store
+
+
+# Build or refresh a store with `python -m mcp_servers.player_store PATH import dump.csv`
+PLAYER_STORE = _open_player_store(os.getenv("DATAGOLF_STORE_PATH"))
+
+# Built once at server start; every tool resolves names through it
+PLAYER_INDEX = PlayerNameIndex(
+    PLAYER_STORE.names(),
+    aliases={alias: name for alias, name in PLAYER_ALIASES.items() if name in PLAYER_STORE},
+)
+
+
+def _unknown_player_error(player_name: str) -> dict:
+    suggestions = PLAYER_INDEX.suggest(player_name)
+    return {"error": f"No data found for player: {player_name}", "suggestions": suggestions}
+
+
+def load_players(player_names) -> dict:
+    """
+    Reads players from the player store, for scripts that score a card without the MCP server.
+
+    Args:
+        player_names: Names as written on the card; resolved like the server tools resolve them.
+
+    Returns:
+        dict: Requested name -> {"2-year": {...}, "3-month": {...}}.
+
+    Raises:
+        ValueError: If a name isn't in the store, listing the closest names.
+    """
+    players, unknown = {}, []
+    for name in dict.fromkeys(player_names):
+        canonical_name = PLAYER_INDEX.resolve(name)
+        data = PLAYER_STORE.get(canonical_name) if canonical_name else None
+        if data is None:
+            unknown.append(f"{name} (did you mean: {', '.join(PLAYER_INDEX.suggest(name)) or 'no close names'})")
+        else:
+            players[name] = data
+    if unknown:
+        raise ValueError("No strokes gained in the player store for: " + "; ".join(unknown))
+    return players
+
+
+# Upstream results are cached per time window: 2-year averages barely move
+# between events, while 3-month form should be refreshed a few times a day
+TIME_WINDOWS = ("2-year", "3-month")
+CACHE_TTL_SECONDS = {"2-year": 7 * 24 * 3600, "3-month": 6 * 3600}
+
+# Set DATAGOLF_CACHE_PATH to an empty string to keep the cache in memory only
+CACHE = ToolResultCache(path=os.getenv("DATAGOLF_CACHE_PATH", DEFAULT_CACHE_PATH), ttl_seconds=CACHE_TTL_SECONDS)
+
+# The cache file outlives the server and is shared by every store, so keys name the store
+# snapshot they were read from: after an import (or with another DATAGOLF_STORE_PATH) a
+# restarted server misses and reads the store. A running server keeps the snapshot it
+# opened; restart it to serve rows imported since.
+CACHE_KEY_PREFIX = PLAYER_STORE.snapshot
+
+
+async def _fetch_upstream_window(player_name: str, window: str) -> dict:
+    """Fetches one time window of one player from the (mock) upstream API."""
+    # Simulate network delay
+    await asyncio.sleep(0.1)
+
+    return PLAYER_STORE.get(player_name)[window]
+
+
+async def _fetch_player_data(player_name: str) -> dict:
+    """Returns the 2-year and 3-month data for one canonical player name, served from the cache when fresh."""
+    windows = await asyncio.gather(
+        *(
+            CACHE.get_or_fetch(
+                window,
+                f"{CACHE_KEY_PREFIX}:{player_name}",
+                lambda window=window: _fetch_upstream_window(player_name, window),
+            )
+            for window in TIME_WINDOWS
+        )
+    )
+
+    # Return data for both time periods as required by Phase 1 agents
+    return {"player_name": player_name, **dict(zip(TIME_WINDOWS, windows))}
+
+
+async def _fetch_players_data(player_names: list[str]) -> dict:
+    """Fetches several players concurrently, keyed by the requested name."""
+    canonical_names = {name: PLAYER_INDEX.resolve(name) for name in player_names}
+
+    # Spelling variants of the same player are fetched once
+    unique_names = list(dict.fromkeys(name for name in canonical_names.values() if name))
+    results = dict(zip(unique_names, await asyncio.gather(*(_fetch_player_data(name) for name in unique_names))))
+
+    return {
+        requested: results[canonical] if canonical else _unknown_player_error(requested)
+        for requested, canonical in canonical_names.items()
+    }
+
+
 @mcp.tool()
 async def getPlayerTrueStrokesGained(player_name: str) -> dict:
     """
     Retrieves the 2-year and 3-month True Strokes Gained data for a specific golfer.
+    Names are matched ignoring case, accents and punctuation; the canonical name is returned as `player_name`.
     Args:
         player_name: The full name of the golfer (e.g., "Scottie Scheffler").
     """
-    # Simulate network delay
-    await asyncio.sleep(0.1)
+    canonical_name = PLAYER_INDEX.resolve(player_name)
+    if canonical_name is None:
+        return _unknown_player_error(player_name)
+    return await _fetch_player_data(canonical_name)
 
-    data = MOCK_PLAYER_DATA.get(player_name)
-    if not data:
-        return {"error": f"No data found for player: {player_name}"}
 
-    # Return data for both time periods as required by Phase 1 agents
-    return {"2-year": data["2-year"], "3-month": data["3-month"]}
+@mcp.tool()
+async def getPlayersTrueStrokesGained(player_names: list[str]) -> dict:
+    """
+    Retrieves the 2-year and 3-month True Strokes Gained data for several golfers in one call.
+    Prefer this over calling getPlayerTrueStrokesGained once per player.
+    Args:
+        player_names: The full names of the golfers (e.g., ["Scottie Scheffler", "Rory McIlroy"]).
+    Returns:
+        A dict keyed by the requested player name. Each value has the same shape as
+        getPlayerTrueStrokesGained (including the canonical `player_name`), or an "error" entry
+        with close "suggestions" if the player is unknown.
+    """
+    return await _fetch_players_data(player_names)
+
+
+@mcp.tool()
+async def getRosterTrueStrokesGained() -> dict:
+    """
+    Retrieves the 2-year and 3-month True Strokes Gained data for every golfer on the roster.
+    Returns:
+        A dict keyed by player name with the same shape as getPlayerTrueStrokesGained.
+    """
+    return await _fetch_players_data(PLAYER_STORE.names())
+
+
+@mcp.tool()
+async def getCacheStats() -> dict:
+    """
+    Returns hit/miss statistics of the server's player-data cache.
+    Returns:
+        A dict with memory/disk hits, misses (upstream fetches), coalesced concurrent lookups,
+        the hit rate, entry counts and the TTL of each time window.
+    """
+    return CACHE.stats()
+
+
+DEFAULT_HTTP_HOST = "127.0.0.1"
+# Not 8000, which `adk web` uses
+DEFAULT_HTTP_PORT = 8765
 
 
 def main():
-    # Run the server using stdio transport
-    mcp.run(transport="stdio")
+    parser = argparse.ArgumentParser(description="DataGolf MCP server.")
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "streamable-http", "sse"],
+        default="stdio",
+        help="stdio (default) is spawned per toolset by MCPToolset; streamable-http and sse run one "
+        "long-lived server that many agent sessions share.",
+    )
+    parser.add_argument("--host", default=DEFAULT_HTTP_HOST, help="Bind address for the HTTP transports.")
+    parser.add_argument("--port", type=int, default=DEFAULT_HTTP_PORT, help="Port for the HTTP transports.")
+    args = parser.parse_args()
+
+    mcp.settings.host = args.host
+    mcp.settings.port = args.port
+
+    # Run the server using the chosen transport
+    mcp.run(transport=args.transport)
 
 
 if __name__ == "__main__":
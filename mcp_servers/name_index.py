@@ -0,0 +1,188 @@
+"""
+Player-name index for the DataGolf MCP server.
+
+Requests come from LLMs and users, so names don't always match the stored
+display strings ("J. J. Spaun" vs "J.J. Spaun", "Ludvig Aberg" vs "Ludvig Åberg",
+"Scheffler, Scottie"). The index is built once at server start and resolves
+names in three steps:
+
+1. Exact match on a normalized key (Unicode folding, punctuation, case and
+   spacing removed) or on a registered alias, O(1).
+2. Fuzzy match through a character-trigram inverted index, which only scores
+   names sharing at least one trigram with the query. A candidate must agree
+   on the surname (up to a typo) and on the first initial, if one is given,
+   and lead the next such candidate clearly; otherwise the name is left
+   unresolved and the caller shows suggestions. "Alex Fitzpatrick" doesn't
+   become "Matt Fitzpatrick", and "Justin" matches no Justin.
+3. Memoization of resolved queries in a bounded LRU, so repeated lookups are
+   O(1) and a long-lived server's memory stays flat.
+"""
+
+import unicodedata
+from collections import Counter
+from collections import OrderedDict
+
+# Letters that NFKD does not decompose into an ASCII base letter
+_SPECIAL_LETTERS = str.maketrans({"ø": "o", "æ": "ae", "œ": "oe", "ß": "ss", "đ": "d", "ð": "d", "ł": "l", "þ": "th"})
+
+# Minimum Dice similarity of trigram sets for a fuzzy match
+DEFAULT_FUZZY_THRESHOLD = 0.6
+# Minimum similarity lead of a fuzzy match over the next plausible candidate
+DEFAULT_FUZZY_MARGIN = 0.1
+DEFAULT_MAX_RESOLVED = 4096
+
+
+def _fold(name: str) -> str:
+    if "," in name:
+        last, _, first = name.partition(",")
+        name = f"{first} {last}"
+    return unicodedata.normalize("NFKD", name.casefold().translate(_SPECIAL_LETTERS))
+
+
+def normalize_name(name: str) -> str:
+    """
+    Folds a player name into its lookup key.
+
+    "J. J. Spaun", "J.J. Spaun" and "jj spaun" all become "jjspaun";
+    "Rasmus Højgaard" becomes "rasmushojgaard"; "Scheffler, Scottie" is
+    reordered to "scottiescheffler".
+    """
+    return "".join(char for char in _fold(name) if char.isalnum())
+
+
+def _name_parts(name: str) -> tuple:
+    """(first initial or "", surname key) of a name; a single word is taken as the surname."""
+    words = ["".join(char for char in word if char.isalnum()) for word in _fold(name).split()]
+    words = [word for word in words if word]
+    if not words:
+        return "", ""
+    return (words[0][0] if len(words) > 1 else ""), words[-1]
+
+
+def _dice(a: set, b: set) -> float:
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class PlayerNameIndex:
+    """Resolves free-form player names to the canonical names of the data store."""
+
+    def __init__(
+        self,
+        names,
+        aliases: dict | None = None,
+        fuzzy_threshold: float = DEFAULT_FUZZY_THRESHOLD,
+        fuzzy_margin: float = DEFAULT_FUZZY_MARGIN,
+        max_resolved: int = DEFAULT_MAX_RESOLVED,
+    ):
+        """
+        Args:
+            names: The canonical player names.
+            aliases: Optional alias -> canonical name mapping (e.g. "Bob MacIntyre").
+            fuzzy_threshold: Minimum trigram similarity (0-1) for a fuzzy match.
+            fuzzy_margin: Minimum similarity lead of a fuzzy match over the next candidate
+                          agreeing on surname and initial.
+            max_resolved: Size of the memo of resolved queries (least recently used dropped first).
+        """
+        self.fuzzy_threshold = fuzzy_threshold
+        self.fuzzy_margin = fuzzy_margin
+        self.max_resolved = max_resolved
+        self._canonical = []
+        self._keys = {}
+        self._parts = []
+        self._trigram_sets = []
+        self._postings = {}
+        self._resolved = OrderedDict()
+
+        for name in names:
+            self.add(name)
+        for alias, name in (aliases or {}).items():
+            self.add_alias(alias, name)
+
+    def __len__(self) -> int:
+        return len(self._canonical)
+
+    def add(self, name: str):
+        """Adds a canonical name to the index."""
+        key = normalize_name(name)
+        if key in self._keys:
+            return
+
+        name_id = len(self._canonical)
+        self._canonical.append(name)
+        self._keys[key] = name_id
+        self._parts.append(_name_parts(name))
+
+        trigrams = _trigrams(key)
+        self._trigram_sets.append(trigrams)
+        for trigram in trigrams:
+            self._postings.setdefault(trigram, []).append(name_id)
+        self._resolved.clear()
+
+    def add_alias(self, alias: str, name: str):
+        """Registers an alternative spelling of an indexed canonical name."""
+        name_id = self._keys.get(normalize_name(name))
+        if name_id is None:
+            raise KeyError(f"Unknown player for alias {alias!r}: {name!r}")
+        self._keys.setdefault(normalize_name(alias), name_id)
+        self._resolved.clear()
+
+    def resolve(self, name: str) -> str | None:
+        """
+        Returns the canonical name for `name`, or None if nothing is close enough.
+
+        A fuzzy match needs the similarity threshold, the same surname (up to a typo) and
+        first initial, and a `fuzzy_margin` lead over the next candidate that agrees on both.
+        """
+        if name in self._resolved:
+            self._resolved.move_to_end(name)
+            return self._resolved[name]
+
+        key = normalize_name(name)
+        name_id = self._keys.get(key)
+        if name_id is None:
+            name_id = self._fuzzy_resolve(name, key)
+
+        canonical = None if name_id is None else self._canonical[name_id]
+        self._resolved[name] = canonical
+        if len(self._resolved) > self.max_resolved:
+            self._resolved.popitem(last=False)
+        return canonical
+
+    def _fuzzy_resolve(self, name: str, key: str) -> int | None:
+        initial, surname = _name_parts(name)
+        surname_trigrams = _trigrams(surname)
+        plausible = [
+            (name_id, score)
+            for name_id, score in self._fuzzy_matches(key, limit=None)
+            if (not initial or initial == self._parts[name_id][0])
+            and _dice(surname_trigrams, _trigrams(self._parts[name_id][1])) >= self.fuzzy_threshold
+        ]
+        if not plausible or plausible[0][1] < self.fuzzy_threshold:
+            return None
+        if len(plausible) > 1 and plausible[0][1] - plausible[1][1] < self.fuzzy_margin:
+            # Ambiguous, e.g. a misspelled surname two players share
+            return None
+        return plausible[0][0]
+
+    def suggest(self, name: str, limit: int = 3) -> list[str]:
+        """Returns the closest canonical names, best first, regardless of the threshold."""
+        return [self._canonical[name_id] for name_id, _ in self._fuzzy_matches(normalize_name(name), limit)]
+
+    def _fuzzy_matches(self, key: str, limit: int | None) -> list:
+        """Scores candidates sharing a trigram with `key` by Dice similarity, best first."""
+        query = _trigrams(key)
+        shared = Counter()
+        for trigram in query:
+            shared.update(self._postings.get(trigram, ()))
+
+        scored = [
+            (name_id, 2 * count / (len(query) + len(self._trigram_sets[name_id])))
+            for name_id, count in shared.items()
+        ]
+        scored.sort(key=lambda match: match[1], reverse=True)
+        return scored[:limit]
@@ -0,0 +1,457 @@
+"""
+Columnar, memory-mapped store of the players' strokes-gained snapshots.
+
+Each row is one snapshot: a player's strokes gained in every time window as
+of a date. A store on disk is a directory of flat binary columns plus two
+small JSON files:
+
+    meta.json       windows, metrics and the number of rows
+    players.json    player names; a player's id is its position in the list
+    player.i32      player id of each row
+    as_of.i32       snapshot date of each row, in days since 1970-01-01
+    values.f64      (rows, windows, metrics) strokes gained
+    order.i32       row ids sorted by (player, as_of)
+    offsets.i64     start of each player's rows in `order`
+
+The columns are memory-mapped, so opening a store only reads the JSON files,
+and a lookup touches the few pages of the rows it reads. Memory stays flat
+however many players and snapshots the store holds.
+
+A lookup resolves the player's id with a dict, slices the player's rows out
+of `order`, and binary-searches their dates for the latest snapshot on or
+before the requested date (`as_of=None` is the latest snapshot).
+
+`upsert` refreshes a store incrementally. A snapshot equal to the player's
+previous one adds no row, one for an existing (player, date) is overwritten
+in place, and anything else is appended. A batch is validated in full before
+anything is written, and the sorted index is rebuilt once per batch. Index
+and JSON files are replaced atomically, meta.json last, and lookups ignore
+index entries past the `rows` a reader opened with, so a server reading the
+store never sees a half-written batch. A reader keeps the rows it opened
+with; reopen the store to see rows appended since.
+
+    python -m mcp_servers.player_store ~/datagolf_store import dump.csv --as-of 2025-09-01
+    python -m mcp_servers.player_store ~/datagolf_store get "Rory McIlroy" --as-of 2025-06-30
+"""
+
+import argparse
+import csv
+import datetime
+import hashlib
+import json
+import os
+
+import numpy as np
+
+TIME_WINDOWS = ("2-year", "3-month")
+METRICS = ("total_sg", "off_the_tee", "approach", "around_the_green", "putting")
+
+_EPOCH = datetime.date(1970, 1, 1)
+_MIN_CAPACITY = 1024
+# Columns with one entry per row: file name and dtype
+_ROW_COLUMNS = (("player.i32", np.int32), ("as_of.i32", np.int32), ("values.f64", np.float64))
+
+
+def to_day(value) -> int:
+    """Converts a date, datetime or ISO "YYYY-MM-DD" string to days since 1970-01-01."""
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value[:10])
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return (value - _EPOCH).days
+
+
+def from_day(day: int) -> str:
+    """Converts days since 1970-01-01 back to an ISO date string."""
+    return (_EPOCH + datetime.timedelta(days=int(day))).isoformat()
+
+
+def _write_json(path: str, data):
+    # Written next to the target and renamed, so readers see the old or the new file
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(data, f)
+    os.replace(temporary, path)
+
+
+class PlayerStore:
+    """Dated strokes-gained snapshots of many players, kept in memory-mapped columns."""
+
+    def __init__(
+        self,
+        path: str | None = None,
+        windows: tuple = TIME_WINDOWS,
+        metrics: tuple = METRICS,
+        readonly: bool = False,
+    ):
+        """
+        Args:
+            path: Store directory, created if missing; None keeps the store in memory only.
+            windows: Time windows of a new store; an existing store keeps its own.
+            metrics: Strokes-gained metrics of a new store; an existing store keeps its own.
+            readonly: Map the columns read-only (e.g. in the MCP server).
+        """
+        self.path = os.path.expanduser(path) if path else None
+        self.readonly = readonly
+        meta = {"windows": list(windows), "metrics": list(metrics), "rows": 0, "generation": 0}
+        names = []
+        if self.path and os.path.exists(os.path.join(self.path, "meta.json")):
+            with open(os.path.join(self.path, "meta.json")) as f:
+                meta = json.load(f)
+            with open(os.path.join(self.path, "players.json")) as f:
+                names = json.load(f)
+        elif self.path:
+            if readonly:
+                raise FileNotFoundError(f"No player store at {self.path}")
+            os.makedirs(self.path, exist_ok=True)
+
+        self.windows = tuple(meta["windows"])
+        self.metrics = tuple(meta["metrics"])
+        self._rows = meta["rows"]
+        # Number of committed batches, so readers can tell snapshots of the same directory apart
+        self._generation = meta.get("generation", 0)
+        self._names = names
+        self._ids = {name: player_id for player_id, name in enumerate(names)}
+        self._capacity = 0
+        self._columns = {}
+        self._reserve(self._rows if readonly else max(self._rows, _MIN_CAPACITY))
+        self._load_index()
+
+    # -- storage -----------------------------------------------------------------
+
+    def _column_shape(self, name: str) -> tuple:
+        return (len(self.windows), len(self.metrics)) if name == "values.f64" else ()
+
+    def _open(self, name: str, dtype, rows: int, shape: tuple = ()):
+        """Maps a column file of `rows` rows, growing the file if needed."""
+        if self.path is None:
+            return np.zeros((rows,) + shape, dtype=dtype)
+        file = os.path.join(self.path, name)
+        if rows == 0:
+            return np.zeros((0,) + shape, dtype=dtype)
+        if not self.readonly:
+            size = rows * int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+            with open(file, "ab") as f:
+                if f.tell() < size:
+                    f.truncate(size)
+        return np.memmap(file, dtype=dtype, mode="r" if self.readonly else "r+", shape=(rows,) + shape)
+
+    def _reserve(self, rows: int):
+        """Grows the row columns to hold at least `rows` rows (doubling, so appends amortize)."""
+        if rows <= self._capacity and self._columns:
+            return
+        capacity = max(rows, 2 * self._capacity)
+        for name, dtype in _ROW_COLUMNS:
+            old = self._columns.get(name)
+            if isinstance(old, np.memmap):
+                old.flush()
+            column = self._open(name, dtype, capacity, self._column_shape(name))
+            if self.path is None and old is not None:
+                column[: len(old)] = old
+            self._columns[name] = column
+        self._capacity = capacity
+
+    def _load_index(self):
+        if self.path and os.path.exists(os.path.join(self.path, "order.i32")):
+            self._order = self._read_only_column("order.i32", np.int32)
+            self._offsets = self._read_only_column("offsets.i64", np.int64)
+        else:
+            self._order = np.zeros(0, dtype=np.int32)
+            self._offsets = np.zeros(len(self._names) + 1, dtype=np.int64)
+
+    def _read_only_column(self, name: str, dtype):
+        file = os.path.join(self.path, name)
+        if os.path.getsize(file) == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(file, dtype=dtype, mode="r")
+
+    def _rebuild_index(self):
+        """Sorts the rows by (player, date) and stores the per-player offsets."""
+        players = np.asarray(self._columns["player.i32"][: self._rows])
+        days = np.asarray(self._columns["as_of.i32"][: self._rows])
+        order = np.lexsort((days, players)).astype(np.int32)
+        offsets = np.searchsorted(players[order], np.arange(len(self._names) + 1)).astype(np.int64)
+        if self.path is None:
+            self._order, self._offsets = order, offsets
+            return
+        for name, column in (("order.i32", order), ("offsets.i64", offsets)):
+            temporary = os.path.join(self.path, f"{name}.tmp")
+            column.tofile(temporary)
+            os.replace(temporary, os.path.join(self.path, name))
+        self._load_index()
+
+    def _commit(self):
+        self._generation += 1
+        if self.path is None:
+            self._rebuild_index()
+            return
+        for column in self._columns.values():
+            if isinstance(column, np.memmap):
+                column.flush()
+        # Names first, so the index never holds a player id a reader can't name
+        _write_json(os.path.join(self.path, "players.json"), self._names)
+        self._rebuild_index()
+        # Last: a reader of the old meta.json may map the new index, but only looks up rows below its `rows`
+        _write_json(
+            os.path.join(self.path, "meta.json"),
+            {
+                "windows": list(self.windows),
+                "metrics": list(self.metrics),
+                "rows": self._rows,
+                "generation": self._generation,
+            },
+        )
+
+    # -- queries -----------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    @property
+    def rows(self) -> int:
+        """Number of stored snapshots."""
+        return self._rows
+
+    @property
+    def snapshot(self) -> str:
+        """
+        Identifies the data the store serves: the directory and its number of committed batches,
+        or a digest of the rows of an in-memory store. Changes with every `upsert`.
+        """
+        if self.path:
+            return f"{os.path.realpath(self.path)}#{self._generation}"
+        digest = hashlib.md5(json.dumps(self._names).encode())
+        for name, _ in _ROW_COLUMNS:
+            digest.update(np.ascontiguousarray(self._columns[name][: self._rows]).tobytes())
+        return f"memory#{digest.hexdigest()}"
+
+    def names(self) -> list[str]:
+        """Returns the names of all players in the store."""
+        return list(self._names)
+
+    def _player_rows(self, name: str) -> np.ndarray:
+        player_id = self._ids.get(name)
+        if player_id is None or player_id + 1 >= len(self._offsets):
+            return self._order[:0]
+        rows = self._order[self._offsets[player_id] : self._offsets[player_id + 1]]
+        # The index may be newer than the rows this store mapped (see `_commit`)
+        return rows[rows < self._rows]
+
+    def _row_at(self, name: str, as_of=None) -> int | None:
+        rows = self._player_rows(name)
+        if not len(rows):
+            return None
+        if as_of is None:
+            return int(rows[-1])
+        days = self._columns["as_of.i32"][rows]
+        position = int(np.searchsorted(days, to_day(as_of), side="right")) - 1
+        return int(rows[position]) if position >= 0 else None
+
+    def _decode(self, row: int) -> dict:
+        values = self._columns["values.f64"][row]
+        return {
+            window: {metric: float(value) for metric, value in zip(self.metrics, window_values)}
+            for window, window_values in zip(self.windows, values)
+        }
+
+    def get(self, name: str, as_of=None) -> dict | None:
+        """
+        Returns a player's strokes gained in the DataGolf shape.
+
+        Args:
+            name: Canonical player name.
+            as_of: Date (or ISO string); the latest snapshot on or before it is returned.
+                   None returns the latest snapshot.
+
+        Returns:
+            dict | None: {"2-year": {"total_sg": ..., ...}, "3-month": {...}}, or None if the
+                         player is unknown or has no snapshot by that date.
+        """
+        row = self._row_at(name, as_of)
+        return None if row is None else self._decode(row)
+
+    def get_many(self, names, as_of=None) -> dict:
+        """Returns name -> `get(name, as_of)` for the players that have data."""
+        found = {}
+        for name in names:
+            data = self.get(name, as_of)
+            if data is not None:
+                found[name] = data
+        return found
+
+    def history(self, name: str) -> list[tuple]:
+        """Returns every (ISO date, data) snapshot of a player, oldest first."""
+        rows = self._player_rows(name)
+        return [(from_day(self._columns["as_of.i32"][row]), self._decode(int(row))) for row in rows]
+
+    # -- updates -----------------------------------------------------------------
+
+    def _encode(self, data: dict) -> np.ndarray:
+        """DataGolf-shaped dict -> (windows, metrics) array, NaN where a value is missing."""
+        values = np.full((len(self.windows), len(self.metrics)), np.nan)
+        for i, window in enumerate(self.windows):
+            for j, metric in enumerate(self.metrics):
+                value = data.get(window, {}).get(metric)
+                if value is not None and value != "":
+                    values[i, j] = float(value)
+        return values
+
+    def upsert(self, records) -> dict:
+        """
+        Adds or refreshes dated snapshots.
+
+        Args:
+            records: Iterable of (player name, date, data) with data in the DataGolf shape. A
+                     window or metric left out keeps the player's value from the previous snapshot.
+
+        Returns:
+            dict: Counts of `added`, `updated` (overwritten in place) and `unchanged` snapshots.
+
+        Raises:
+            ValueError: If a new player lacks a value with no earlier snapshot to take it from.
+        """
+        if self.readonly:
+            raise PermissionError("The player store is open read-only")
+
+        # Last record wins per (player, date); applied in date order per player
+        latest = {}
+        for name, as_of, data in records:
+            latest[(name, to_day(as_of))] = data
+        counts = {"added": 0, "updated": 0, "unchanged": 0}
+        # The whole batch is encoded and validated before anything is written, so a bad
+        # record leaves the store as it was. Snapshots planned so far: name -> {day: values}
+        planned = {}
+        overwrites, appends = [], []
+
+        for (name, day), data in sorted(latest.items(), key=lambda item: item[0]):
+            values = self._encode(data)
+            stored = {int(self._columns["as_of.i32"][row]): int(row) for row in self._player_rows(name)}
+            batch = planned.setdefault(name, {})
+            snapshots = {snapshot_day: self._columns["values.f64"][row] for snapshot_day, row in stored.items()}
+            snapshots.update(batch)
+            earlier = [snapshot_day for snapshot_day in snapshots if snapshot_day < day]
+            previous = snapshots[max(earlier)] if earlier else None
+
+            missing = np.isnan(values)
+            if missing.any():
+                base = snapshots.get(day, previous)
+                if base is None:
+                    raise ValueError(f"{name}: no earlier snapshot to fill missing values from ({from_day(day)})")
+                values[missing] = base[missing]
+
+            if day in stored:
+                if np.array_equal(snapshots[day], values):
+                    counts["unchanged"] += 1
+                else:
+                    overwrites.append((stored[day], values))
+                    batch[day] = values
+                    counts["updated"] += 1
+                continue
+            if previous is not None and np.array_equal(previous, values):
+                # Same as the last snapshot before it: as-of lookups already return these values
+                counts["unchanged"] += 1
+                continue
+
+            appends.append((name, day, values))
+            batch[day] = values
+            counts["added"] += 1
+
+        for name, _, _ in appends:
+            if name not in self._ids:
+                self._ids[name] = len(self._names)
+                self._names.append(name)
+        for row, values in overwrites:
+            self._columns["values.f64"][row] = values
+        self._reserve(self._rows + len(appends))
+        for name, day, values in appends:
+            row = self._rows
+            self._columns["player.i32"][row] = self._ids[name]
+            self._columns["as_of.i32"][row] = day
+            self._columns["values.f64"][row] = values
+            self._rows += 1
+
+        self._commit()
+        return counts
+
+    def import_file(self, path: str, as_of=None) -> dict:
+        """
+        Bulk-imports a CSV or JSON dump, see `read_csv` and `read_json`.
+
+        Args:
+            path: .csv or .json file.
+            as_of: Snapshot date of records without their own `as_of`.
+
+        Returns:
+            dict: The `upsert` counts.
+        """
+        reader = read_csv if path.endswith(".csv") else read_json
+        return self.upsert(reader(path, as_of))
+
+
+def read_csv(path: str, as_of=None):
+    """
+    Yields (name, date, data) records of a CSV dump with one row per player and time window.
+
+    Columns: player_name, window, as_of (optional), then one column per metric.
+    """
+    records = {}
+    with open(path, newline="") as f:
+        for line in csv.DictReader(f):
+            date = line.get("as_of") or as_of
+            if not date:
+                raise ValueError(f"{path}: row of {line['player_name']} has no as_of date")
+            metrics = {key: value for key, value in line.items() if key not in ("player_name", "window", "as_of")}
+            records.setdefault((line["player_name"], date), {})[line["window"]] = metrics
+    for (name, date), data in records.items():
+        yield name, date, data
+
+
+def read_json(path: str, as_of=None):
+    """
+    Yields (name, date, data) records of a JSON dump.
+
+    Either the MOCK_PLAYER_DATA shape {name: {window: {metric: value}}}, dated `as_of`, or a
+    list of {"player_name": ..., "as_of": ..., "2-year": {...}, "3-month": {...}} snapshots.
+    """
+    with open(path) as f:
+        data = json.load(f)
+    entries = data if isinstance(data, list) else [{"player_name": name, **windows} for name, windows in data.items()]
+    for entry in entries:
+        date = entry.get("as_of") or as_of
+        if not date:
+            raise ValueError(f"{path}: snapshot of {entry['player_name']} has no as_of date")
+        yield entry["player_name"], date, {key: value for key, value in entry.items() if isinstance(value, dict)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage a columnar DataGolf player store.")
+    parser.add_argument("path", help="Store directory.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    importer = commands.add_parser("import", help="Import or refresh from CSV/JSON dumps.")
+    importer.add_argument("files", nargs="+", help=".csv or .json dumps.")
+    importer.add_argument("--as-of", help="Snapshot date of records without one (YYYY-MM-DD).")
+    getter = commands.add_parser("get", help="Print a player's strokes gained.")
+    getter.add_argument("name", help="Canonical player name.")
+    getter.add_argument("--as-of", help="Latest snapshot on or before this date (YYYY-MM-DD).")
+    commands.add_parser("info", help="Print the store's size.")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        store = PlayerStore(args.path)
+        for file in args.files:
+            print(f"{file}: {store.import_file(file, args.as_of)}")
+        return
+
+    store = PlayerStore(args.path, readonly=True)
+    if args.command == "get":
+        data = store.get(args.name, args.as_of)
+        print(json.dumps(data, indent=2) if data else f"No data for {args.name}")
+    else:
+        print(json.dumps({"players": len(store), "snapshots": store.rows, "windows": store.windows}))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,39 +7,30 @@ with MCP tools automatically managed by MCPToolset.
 """
 
 
+import argparse
 import asyncio
 import os
 
 from dotenv import load_dotenv
+from ryder_cup_prediction.simulation import DEFAULT_PAIRINGS
+from ryder_cup_prediction.simulation import DEFAULT_STARTING_SCORE
 
 load_dotenv()
 
-from google.adk import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
-from ryder_cup_prediction.agent import root_agent
 
+PAIRINGS = DEFAULT_PAIRINGS
+STARTING_SCORE = DEFAULT_STARTING_SCORE
 
-async def main():
-    """Main async function that orchestrates the entire prediction workflow."""
 
-    pairings = [
-        ("Justin Rose", "Cameron Young"),
-        ("Tommy Fleetwood", "Justin Thomas"),
-        ("Matt Fitzpatrick", "Bryson DeChambeau"),
-        ("Rory McIlroy", "Scottie Scheffler"),
-        ("Ludvig Åberg", "Patrick Cantlay"),
-        ("Jon Rahm", "Xander Schauffele"),
-        ("Sepp Straka", "J. J. Spaun"),
-        ("Shane Lowry", "Russell Henley"),
-        ("Rasmus Højgaard", "Ben Griffin"),
-        ("Tyrrell Hatton", "Collin Morikawa"),
-        ("Robert MacIntyre", "Sam Burns"),
-        ("Viktor Hovland", "Harris English"),
-    ]
-
-    starting_score = {"USA": 4.5, "Europe": 11.5}
+def build_user_prompt(pairings=PAIRINGS, starting_score=STARTING_SCORE, fan_out=False):
+    """
+    Builds the user message for the prediction run.
 
+    Args:
+        pairings: (Europe player, USA player) tuples of the singles card.
+        starting_score: Score after Saturday, e.g. {"USA": 4.5, "Europe": 11.5}.
+        fan_out: Ask for the whole card at once (fan-out mode) instead of match by match.
+    """
     pairings_text = "\n".join([f"Match {i+1}: {eur} (Europe) vs {usa} (USA)" for i, (eur, usa) in enumerate(pairings)])
 
     user_prompt = f"""
@@ -60,19 +51,75 @@ Your task:
      b) Analyze recent form (RecentFormAnalyst)
      c) Analyze baseline skill (BaselineSkillAnalyst)
      d) Synthesize probabilities (MatchupSynthesizerAgent)
-     e) Generate outcome (MonteCarloSimulationAgent)
 2. Report the result for this match
 3. Show how the pipeline stages communicate via session.state
+4. Once match probabilities are available, run the `simulate_ryder_cup_singles` tool
+   with the current score to estimate the cup win/retain probabilities
 
 Begin your analysis now.
 """
 
+    if fan_out:
+        user_prompt = f"""
+Analyze all Sunday singles matches for the 2025 Ryder Cup.
+
+Current Score (after Saturday):
+- USA: {starting_score['USA']}
+- Europe: {starting_score['Europe']}
+
+Sunday Singles Pairings (Europe player listed first):
+{pairings_text}
+
+Each match is analyzed by its own pipeline. Predict every match, then aggregate the card
+into the cup win/retain probabilities.
+"""
+
+    return user_prompt
+
+
+async def main(fan_out=False, max_concurrency=None, numeric_scoring=False, narrative=False, trace_path=None):
+    """
+    Main async function that orchestrates the entire prediction workflow.
+
+    Args:
+        fan_out: Analyze all pairings concurrently with one pipeline per match
+                 instead of delegating match by match through the coordinator.
+        max_concurrency: Maximum number of match pipelines in flight in fan-out mode.
+        numeric_scoring: Score form, baseline skill and probabilities deterministically
+                         instead of with three LLM stages per match.
+        narrative: Add an LLM narrative summary per match in numeric scoring mode.
+        trace_path: Record per-stage spans to this JSONL file and print a summary of the hot stages.
+    """
+
+    pairings = PAIRINGS
+    starting_score = STARTING_SCORE
+    user_prompt = build_user_prompt(pairings, starting_score, fan_out)
+
     if not os.getenv("GOOGLE_API_KEY"):
         print("ERROR: GOOGLE_API_KEY not found in environment variables!")
         return
 
+    # Imported only once we know we can run, google.adk takes seconds to import
+    from google.adk import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+    from ryder_cup_prediction.agent import create_agent
+    from ryder_cup_prediction.instrumentation import PipelineTracer
+    from ryder_cup_prediction.instrumentation import tracing_plugins
+
+    tracer = PipelineTracer(trace_path) if trace_path else None
+    pipeline_options = {"numeric_scoring": numeric_scoring, "narrative": narrative, "tracer": tracer}
+    if fan_out:
+        agent = create_agent(
+            pairings=pairings, starting_score=starting_score, max_concurrency=max_concurrency, **pipeline_options
+        )
+    else:
+        agent = create_agent(**pipeline_options)
+
     session_service = InMemorySessionService()
-    runner = Runner(app_name="ryder_cup_prediction", agent=root_agent, session_service=session_service)
+    runner = Runner(
+        app_name="ryder_cup_prediction", agent=agent, session_service=session_service, plugins=tracing_plugins(agent)
+    )
 
     session = await session_service.create_session(app_name="ryder_cup_prediction", user_id="predictor_user")
 
@@ -87,6 +134,35 @@ Begin your analysis now.
                 if part.text:
                     print(part.text)
 
+    if tracer:
+        tracer.flush()
+        print(f"\nTrace written to {trace_path}")
+        print(tracer.format_summary())
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Predict the Ryder Cup Sunday singles.")
+    parser.add_argument(
+        "--fan-out", action="store_true", help="Analyze all pairings concurrently, one pipeline per match."
+    )
+    parser.add_argument(
+        "--max-concurrency", type=int, default=None, help="Maximum match pipelines in flight with --fan-out."
+    )
+    parser.add_argument(
+        "--numeric", action="store_true", help="Score matchups deterministically instead of with LLM stages."
+    )
+    parser.add_argument(
+        "--narrative", action="store_true", help="Add an LLM narrative summary per match with --numeric."
+    )
+    parser.add_argument("--trace", default=None, help="Write per-stage spans to this JSONL file and print a summary.")
+    args = parser.parse_args()
+
+    asyncio.run(
+        main(
+            fan_out=args.fan_out,
+            max_concurrency=args.max_concurrency,
+            numeric_scoring=args.numeric,
+            narrative=args.narrative,
+            trace_path=args.trace,
+        )
+    )
@@ -0,0 +1,15 @@
+"""
+Ryder Cup prediction agent.
+
+`root_agent` is exported for `adk web` but only built on first access, so
+importing the package (or its numeric modules) doesn't pull in google.adk,
+start tracing or construct the agent tree.
+"""
+
+
+def __getattr__(name):
+    if name == "root_agent":
+        from ryder_cup_prediction.agent import root_agent
+
+        return root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,37 +1,123 @@
+import functools
+import logging
 import os
+import socket
 import sys
+from urllib.parse import urlparse
 
-import agentops
 from dotenv import load_dotenv
 from google.adk.agents import LlmAgent
 from google.adk.agents import SequentialAgent
+from google.adk.tools.mcp_tool.mcp_session_manager import SseConnectionParams
 from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
 from google.adk.tools.mcp_tool.mcp_session_manager import StdioServerParameters
+from google.adk.tools.mcp_tool.mcp_session_manager import StreamableHTTPConnectionParams
 from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset
+from ryder_cup_prediction.custom_agents import ConcurrentMatchAgent
+from ryder_cup_prediction.custom_agents import NumericMatchupAgent
+from ryder_cup_prediction.instrumentation import PipelineTracer
+from ryder_cup_prediction.llm_cache import LlmResponseCache
+from ryder_cup_prediction.schemas import BaselineSkill
+from ryder_cup_prediction.schemas import CardSimulation
+from ryder_cup_prediction.schemas import MatchProbabilities
+from ryder_cup_prediction.schemas import MatchProfiles
+from ryder_cup_prediction.schemas import RecentForm
+from ryder_cup_prediction.schemas import dump_state
+from ryder_cup_prediction.scoring import DEFAULT_CONFIG
+from ryder_cup_prediction.simulation import simulate_ryder_cup_singles
+from ryder_cup_prediction.sub_agent_definitions import CARD_AGGREGATOR_INSTRUCTIONS
 from ryder_cup_prediction.sub_agent_definitions import MASTER_INSTRUCTIONS
+from ryder_cup_prediction.sub_agent_definitions import NARRATIVE_INSTRUCTIONS
 from ryder_cup_prediction.sub_agent_definitions import get_sub_agents
 
-AGENTOPS_API_KEY = os.getenv("AGENTOPS_API_KEY")
-agentops.init(api_key=AGENTOPS_API_KEY, default_tags=["google adk"])
+logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
+MODEL = "gemini-2.5-flash"
 
+# One toolset per shared MCP server URL. Its session manager keeps the MCP session
+# (and the HTTP connection under it) open, so all agents built in this process reuse it.
+_SHARED_MCP_TOOLSETS = {}
 
-def create_agent(mcp_tool_wrappers=None):
+# session.state keys written by the stages of one match pipeline
+PIPELINE_STATE_KEYS = ("player_profiles", "recent_form_analysis", "baseline_skill_analysis", "match_probabilities")
+
+# session.state key of the numbers of the last `simulate_ryder_cup_singles` run
+SIMULATION_STATE_KEY = "simulation_results"
+
+# Stages with an output_schema answer in JSON and get their inputs templated into the
+# instruction, so they need neither agent transfer nor the conversation history
+_STRUCTURED_STAGE = {
+    "include_contents": "none",
+    "disallow_transfer_to_parent": True,
+    "disallow_transfer_to_peers": True,
+}
+
+
+def match_state_key(key, match_number=None):
     """
-    Creates the Ryder Cup prediction agent with MCP tools.
+    Returns the session.state key a pipeline stage writes to.
 
-    The MCP server is automatically spawned as a subprocess by the adk runner
-    when the agent starts, and communicates via stdio.
+    In fan-out mode every match gets its own namespace (e.g. `match_3_player_profiles`)
+    so that concurrent pipelines don't overwrite each other's state.
+    """
+    return key if match_number is None else f"match_{match_number}_{key}"
 
-    Args:
-        mcp_tool_wrappers: Deprecated parameter for backward compatibility.
-                          MCP tools are now automatically loaded via MCPToolset.
+
+@functools.cache
+def init_tracing() -> bool:
+    """
+    Initializes AgentOps tracing once per process, if AGENTOPS_API_KEY is set.
+
+    Deferred until an agent is actually built (and agentops imported only then),
+    so importing this module stays cheap and free of side effects.
 
     Returns:
-        LlmAgent: The root coordinator agent with sequential pipeline
+        bool: Whether tracing was initialized.
     """
+    api_key = os.getenv("AGENTOPS_API_KEY")
+    if not api_key:
+        return False
+
+    import agentops
+
+    agentops.init(api_key=api_key, default_tags=["google adk"])
+    return True
+
+
+def _is_reachable(url, timeout=0.5):
+    """Checks that something accepts TCP connections at the URL's host and port."""
+    parsed = urlparse(url)
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    try:
+        with socket.create_connection((parsed.hostname, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def _create_mcp_toolset(mcp_url=None):
+    """
+    Creates the MCPToolset for the DataGolf MCP server.
+
+    Args:
+        mcp_url: URL of a long-lived DataGolf server started with
+                 `--transport streamable-http` (e.g. http://127.0.0.1:8765/mcp) or
+                 `--transport sse` (a URL ending in /sse). The toolset is shared by every
+                 agent connecting to that URL. When the server is unreachable, or no URL is
+                 given, a private server is spawned over stdio instead.
+    """
+    if mcp_url:
+        if mcp_url in _SHARED_MCP_TOOLSETS:
+            return _SHARED_MCP_TOOLSETS[mcp_url]
+        if _is_reachable(mcp_url):
+            if urlparse(mcp_url).path.rstrip("/").endswith("/sse"):
+                connection_params = SseConnectionParams(url=mcp_url)
+            else:
+                connection_params = StreamableHTTPConnectionParams(url=mcp_url)
+            _SHARED_MCP_TOOLSETS[mcp_url] = MCPToolset(connection_params=connection_params)
+            return _SHARED_MCP_TOOLSETS[mcp_url]
+        logger.warning("DataGolf MCP server at %s is unreachable, falling back to stdio", mcp_url)
+
     # --- Configuration to find the MCP script ---
 
     # Get the absolute path to the Python executable that is currently running
@@ -46,7 +132,10 @@ def create_agent(mcp_tool_wrappers=None):
     # --- Toolset Configuration ---
 
     # 1. Define the command to run the MCP server
-    mcp_server_config = StdioServerParameters(command=python_executable, args=[mcp_script_path])
+    # The stdio client only passes a minimal environment (HOME, PATH, ...) to the
+    # server; forward its own settings such as DATAGOLF_CACHE_PATH explicitly
+    server_env = {name: value for name, value in os.environ.items() if name.startswith("DATAGOLF_")}
+    mcp_server_config = StdioServerParameters(command=python_executable, args=[mcp_script_path], env=server_env)
 
     # 2. Define the connection parameters
     mcp_connection_config = StdioConnectionParams(
@@ -55,82 +144,341 @@ def create_agent(mcp_tool_wrappers=None):
 
     # 3. Create the MCPToolset instance
     # The adk runner will automatically start and stop the MCP server
-    managed_mcp_tools = MCPToolset(connection_params=mcp_connection_config)
+    return MCPToolset(connection_params=mcp_connection_config)
 
-    # Get sub-agent configurations with MCP toolset
-    sub_agents_configs = get_sub_agents([managed_mcp_tools])
+
+def _create_match_pipeline(
+    sub_agents_configs,
+    match_number=None,
+    pairing=None,
+    numeric_scoring=False,
+    scoring_config=None,
+    narrative=False,
+    profiles_in_state=False,
+    model=MODEL,
+):
+    """
+    Creates the sequential per-match pipeline.
+
+    Args:
+        sub_agents_configs: The configurations returned by `get_sub_agents`.
+        match_number: 1-based match number. When set, agent names and state keys are
+                      namespaced for this match (fan-out mode).
+        pairing: (Europe player, USA player) tuple of the match in fan-out mode.
+        numeric_scoring: Replace the form, baseline and synthesis LLM stages with
+                         the deterministic `NumericMatchupAgent`.
+        scoring_config: `ScoringConfig` for the numeric scoring mode.
+        narrative: Add an LLM stage that writes a narrative summary of the numeric
+                   results to `match_narrative` (numeric scoring mode only).
+        profiles_in_state: Leave out the PlayerProfilerAgent; the caller seeds
+                           `player_profiles` in session.state.
+        model: Model name or `BaseLlm` instance used by the LLM stages.
+
+    Returns:
+        SequentialAgent: The pipeline for one match.
+    """
+
+    def key(name):
+        return match_state_key(name, match_number)
+
+    def instruction(config, state_hint=""):
+        prompt = config["prompt"] + state_hint
+        if match_number is None:
+            return prompt
+        for state_key in PIPELINE_STATE_KEYS:
+            prompt = prompt.replace(f"session.state['{state_key}']", f"session.state['{key(state_key)}']")
+            # Instruction templates, {key} and {key?}
+            prompt = prompt.replace("{" + state_key, "{" + key(state_key))
+        europe_player, usa_player = pairing
+        return (
+            f"You are working on Match {match_number} only: {europe_player} (Europe) vs {usa_player} (USA).\n\n"
+            + prompt
+        )
+
+    name_suffix = "" if match_number is None else f"_Match{match_number}"
 
     # 1. PlayerProfilerAgent (with MCP tools)
-    player_profiler = LlmAgent(
-        name="PlayerProfilerAgent",
+    player_profiler = None if profiles_in_state else LlmAgent(
+        name="PlayerProfilerAgent" + name_suffix,
         description="Profiles all 24 players by fetching TSG data",
-        instruction=sub_agents_configs[0]["prompt"],
+        instruction=instruction(sub_agents_configs[0]),
         tools=sub_agents_configs[0].get("tools", []),
-        model="gemini-2.5-flash",
-        output_key="player_profiles",
+        model=model,
+        output_key=key("player_profiles"),
+        # With tools present, ADK enforces the schema through its set_model_response tool
+        output_schema=MatchProfiles,
+        disallow_transfer_to_parent=True,
+        disallow_transfer_to_peers=True,
+        # Keeps the default history: with include_contents="none" the events of the
+        # concurrent matches split its tool call from the tool response
     )
 
+    if numeric_scoring:
+        return _create_numeric_match_pipeline(
+            player_profiler, key, pairing, scoring_config, narrative, name_suffix, model
+        )
+
     # 2. RecentFormAnalyst
     recent_form_analyst = LlmAgent(
-        name="RecentFormAnalyst",
+        name="RecentFormAnalyst" + name_suffix,
         description="Analyzes 3-month recent form trends",
-        instruction=sub_agents_configs[1]["prompt"] + "\n\nAccess player data from session.state['player_profiles']",
-        model="gemini-2.5-flash",
-        output_key="recent_form_analysis",
+        instruction=instruction(sub_agents_configs[1], "\n\nPlayer profiles: {player_profiles?}"),
+        model=model,
+        output_key=key("recent_form_analysis"),
+        output_schema=RecentForm,
+        **_STRUCTURED_STAGE,
     )
 
     # 3. BaselineSkillAnalyst
     baseline_skill_analyst = LlmAgent(
-        name="BaselineSkillAnalyst",
+        name="BaselineSkillAnalyst" + name_suffix,
         description="Analyzes 2-year baseline skill levels",
-        instruction=sub_agents_configs[2]["prompt"] + "\n\nAccess player data from session.state['player_profiles']",
-        model="gemini-2.5-flash",
-        output_key="baseline_skill_analysis",
+        instruction=instruction(sub_agents_configs[2], "\n\nPlayer profiles: {player_profiles?}"),
+        model=model,
+        output_key=key("baseline_skill_analysis"),
+        output_schema=BaselineSkill,
+        **_STRUCTURED_STAGE,
     )
 
     # 4. MatchupSynthesizerAgent
     matchup_synthesizer = LlmAgent(
-        name="MatchupSynthesizerAgent",
+        name="MatchupSynthesizerAgent" + name_suffix,
         description="Synthesizes form + skill into match probabilities",
-        instruction=sub_agents_configs[3]["prompt"]
-        + "\n\nAccess analysis from session.state['recent_form_analysis'] and session.state['baseline_skill_analysis']",
-        model="gemini-2.5-flash",
-        output_key="match_probabilities",
-    )
-
-    # 5. MonteCarloSimulationAgent
-    monte_carlo_simulator = LlmAgent(
-        name="MonteCarloSimulationAgent",
-        description="Runs discrete outcome simulation",
-        instruction=sub_agents_configs[4]["prompt"]
-        + "\n\nAccess probabilities from session.state['match_probabilities']",
-        model="gemini-2.5-flash",
-        output_key="simulation_results",
+        instruction=instruction(
+            sub_agents_configs[3],
+            "\n\nPlayer profiles: {player_profiles?}"
+            "\n\nRecent form: {recent_form_analysis?}"
+            "\n\nBaseline skill: {baseline_skill_analysis?}",
+        ),
+        model=model,
+        output_key=key("match_probabilities"),
+        output_schema=MatchProbabilities,
+        **_STRUCTURED_STAGE,
     )
 
     # Create SequentialAgent to orchestrate the pipeline
-    match_analysis_pipeline = SequentialAgent(
-        name="MatchAnalysisPipeline",
+    return SequentialAgent(
+        name="MatchAnalysisPipeline" + name_suffix,
         description="Sequential pipeline for analyzing one match",
         sub_agents=[
-            player_profiler,
-            recent_form_analyst,
-            baseline_skill_analyst,
-            matchup_synthesizer,
-            monte_carlo_simulator,
+            stage
+            for stage in (player_profiler, recent_form_analyst, baseline_skill_analyst, matchup_synthesizer)
+            if stage is not None
         ],
     )
 
-    # Create coordinator agent that delegates to the pipeline
+
+def _create_numeric_match_pipeline(player_profiler, key, pairing, scoring_config, narrative, name_suffix, model):
+    """Creates the per-match pipeline of the numeric scoring mode."""
+    numeric_matchup = NumericMatchupAgent(
+        name="NumericMatchupAgent" + name_suffix,
+        description="Scores recent form, baseline skill and match probabilities without an LLM",
+        profiles_key=key("player_profiles"),
+        recent_form_key=key("recent_form_analysis"),
+        baseline_skill_key=key("baseline_skill_analysis"),
+        probabilities_key=key("match_probabilities"),
+        pairing=pairing,
+        scoring_config=scoring_config or DEFAULT_CONFIG,
+    )
+    stages = [numeric_matchup] if player_profiler is None else [player_profiler, numeric_matchup]
+
+    if narrative:
+        stages.append(
+            LlmAgent(
+                name="MatchNarrativeAgent" + name_suffix,
+                description="Writes a narrative summary of the numeric match analysis",
+                # Optional keys: when the profiles can't be read, NumericMatchupAgent only
+                # writes the error to match_probabilities
+                instruction=NARRATIVE_INSTRUCTIONS.format(
+                    recent_form="{" + key("recent_form_analysis") + "?}",
+                    baseline_skill="{" + key("baseline_skill_analysis") + "?}",
+                    match_probabilities="{" + key("match_probabilities") + "?}",
+                ),
+                model=model,
+                output_key=key("match_narrative"),
+                # Everything it needs is templated into the instruction
+                include_contents="none",
+            )
+        )
+
+    return SequentialAgent(
+        name="MatchAnalysisPipeline" + name_suffix,
+        description="Sequential pipeline for analyzing one match with numeric scoring",
+        sub_agents=stages,
+    )
+
+
+def _create_card_agent(
+    sub_agents_configs, pairings, starting_score=None, max_concurrency=None, model=MODEL, **pipeline_options
+):
+    """
+    Creates the fan-out agent that analyzes a whole singles card.
+
+    Every pairing gets an independent pipeline with namespaced state keys. The
+    pipelines run concurrently (at most `max_concurrency` at a time) and a final
+    aggregation agent runs the Monte Carlo engine over all match probabilities.
+    """
+    match_pipelines = [
+        _create_match_pipeline(sub_agents_configs, match_number=i + 1, pairing=pairing, model=model, **pipeline_options)
+        for i, pairing in enumerate(pairings)
+    ]
+
+    fan_out = ConcurrentMatchAgent(
+        name="MatchFanOut",
+        description="Runs the per-match pipelines of the singles card concurrently",
+        sub_agents=match_pipelines,
+        max_concurrency=max_concurrency,
+    )
+
+    # Each match's probabilities are injected from session.state by ADK's
+    # instruction templating; `?` leaves a failed match empty instead of raising
+    match_lines = "\n".join(
+        f"Match {i + 1}: {eur} (Europe) vs {usa} (USA)\n{{{match_state_key('match_probabilities', i + 1)}?}}"
+        for i, (eur, usa) in enumerate(pairings)
+    )
+    if starting_score:
+        score_line = f"Current score: Europe {starting_score['Europe']}, USA {starting_score['USA']}"
+    else:
+        score_line = "Use the current score given in the user's message."
+
+    aggregator = LlmAgent(
+        name="CardAggregatorAgent",
+        description="Aggregates all match probabilities into cup win/retain probabilities",
+        instruction=f"{CARD_AGGREGATOR_INSTRUCTIONS}\n\n{score_line}\n\nMatch probabilities:\n{match_lines}",
+        tools=[simulate_ryder_cup_singles],
+        after_tool_callback=_store_simulation_results,
+        model=model,
+        output_key="card_results",
+        # Everything it needs is templated into the instruction; leaving out the
+        # interleaved history of the concurrent branches saves tokens and keeps
+        # the request identical across runs (see `LlmResponseCache`)
+        include_contents="none" if starting_score else "default",
+    )
+
+    return SequentialAgent(
+        name="RyderCupCardPipeline",
+        description="Analyzes all singles matches concurrently and aggregates the card",
+        sub_agents=[fan_out, aggregator],
+    )
+
+
+def create_agent(
+    mcp_tool_wrappers=None,
+    pairings=None,
+    starting_score=None,
+    max_concurrency=None,
+    numeric_scoring=False,
+    scoring_config=None,
+    narrative=False,
+    profiles_in_state=False,
+    llm_cache=None,
+    mcp_url=None,
+    model=None,
+    tracer=None,
+):
+    """
+    Creates the Ryder Cup prediction agent with MCP tools.
+
+    The MCP server is automatically spawned as a subprocess by the adk runner
+    when the agent starts, and communicates via stdio.
+
+    Args:
+        mcp_tool_wrappers: Deprecated parameter for backward compatibility.
+                          MCP tools are now automatically loaded via MCPToolset.
+        pairings: Optional list of (Europe player, USA player) tuples. When given,
+                  the agent runs in fan-out mode: one pipeline per pairing, all
+                  running concurrently, followed by a card aggregation step.
+        starting_score: Score after Saturday (e.g. {"USA": 4.5, "Europe": 11.5}) used
+                        by the aggregation step in fan-out mode.
+        max_concurrency: Maximum number of match pipelines in flight in fan-out mode.
+                         None runs all pairings at once.
+        numeric_scoring: Compute form, baseline skill and match probabilities with the
+                         deterministic `ryder_cup_prediction.scoring` module instead of
+                         three LLM stages per match.
+        scoring_config: `ScoringConfig` (form weighting, tie-rate model) for numeric scoring.
+        narrative: Keep an LLM stage for a narrative summary in numeric scoring mode.
+        profiles_in_state: Skip the PlayerProfilerAgent and read each match's `player_profiles`
+                           from session.state, seeded by the caller (e.g. the backtest, with
+                           the strokes gained as of a past event instead of today's).
+        llm_cache: Optional `LlmResponseCache` serving repeated model calls from disk.
+                   Defaults to a cache at RYDER_CUP_LLM_CACHE when that env var is set.
+        mcp_url: URL of a shared, long-lived DataGolf MCP server (HTTP/SSE transport).
+                 Defaults to DATAGOLF_MCP_URL; falls back to spawning the server over stdio.
+        model: Model name or `BaseLlm` instance for every LLM stage (e.g. the offline
+               `StubLlm`). Defaults to MODEL.
+        tracer: Optional `PipelineTracer` recording per-stage spans and metrics locally.
+                Defaults to a tracer writing to RYDER_CUP_TRACE_PATH when that env var is set.
+
+    Returns:
+        BaseAgent: The root coordinator agent with sequential pipeline, or the
+                   card pipeline in fan-out mode
+    """
+    # Load environment variables
+    load_dotenv()
+    init_tracing()
+
+    managed_mcp_tools = _create_mcp_toolset(mcp_url or os.getenv("DATAGOLF_MCP_URL"))
+
+    # Get sub-agent configurations with MCP toolset
+    sub_agents_configs = get_sub_agents([managed_mcp_tools])
+
+    model = model or MODEL
+    pipeline_options = {
+        "numeric_scoring": numeric_scoring,
+        "scoring_config": scoring_config,
+        "narrative": narrative,
+        "profiles_in_state": profiles_in_state,
+    }
+
+    if llm_cache is None and os.getenv("RYDER_CUP_LLM_CACHE"):
+        llm_cache = LlmResponseCache(os.getenv("RYDER_CUP_LLM_CACHE"))
+    if tracer is None and os.getenv("RYDER_CUP_TRACE_PATH"):
+        tracer = PipelineTracer(os.getenv("RYDER_CUP_TRACE_PATH"))
+
+    if pairings:
+        card_agent = _create_card_agent(
+            sub_agents_configs, pairings, starting_score, max_concurrency, model, **pipeline_options
+        )
+        return _install_callbacks(card_agent, llm_cache, tracer)
+
+    match_analysis_pipeline = _create_match_pipeline(sub_agents_configs, model=model, **pipeline_options)
+
+    # Create coordinator agent that delegates to the pipeline and runs the
+    # NumPy Monte Carlo engine over the collected match probabilities
     coordinator = LlmAgent(
         name="RyderCupCoordinator",
         description="Coordinates analysis of all 12 Ryder Cup matches using sequential pipeline",
         instruction=MASTER_INSTRUCTIONS,
         sub_agents=[match_analysis_pipeline],
-        model="gemini-2.5-flash",
+        tools=[simulate_ryder_cup_singles],
+        after_tool_callback=_store_simulation_results,
+        model=model,
     )
 
-    return coordinator
+    return _install_callbacks(coordinator, llm_cache, tracer)
+
+
+def _store_simulation_results(tool, args, tool_context, tool_response):
+    """Saves the numbers of a simulation run to session.state, so code can read them without parsing text."""
+    if tool.name == simulate_ryder_cup_singles.__name__ and isinstance(tool_response, dict):
+        if "error" not in tool_response:
+            tool_context.state[SIMULATION_STATE_KEY] = dump_state(CardSimulation.model_validate(tool_response))
+    return None
+
+
+def _install_callbacks(agent, llm_cache=None, tracer=None):
+    """Installs the LLM cache, then the tracer, so cache hits are not traced as model calls."""
+    if llm_cache:
+        llm_cache.install(agent)
+    if tracer:
+        tracer.install(agent)
+    return agent
 
 
-root_agent = create_agent()
+def __getattr__(name):
+    # `root_agent` is built on first access (e.g. by `adk web` discovery), not at import time
+    if name == "root_agent":
+        global root_agent
+        root_agent = create_agent()
+        return root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
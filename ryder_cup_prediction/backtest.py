@@ -0,0 +1,498 @@
+"""
+Historical backtesting of the match probabilities.
+
+Past singles cards (Ryder Cup, Presidents Cup, ...) are read from local JSON
+files, one event per file (or a list of events per file, or a JSONL file):
+
+    {
+      "name": "Ryder Cup 2023",
+      "date": "2023-10-01",
+      "teams": ["Europe", "USA"],
+      "starting_score": {"Europe": 10.5, "USA": 5.5},
+      "players": {"Jon Rahm": {"2-year": {...}, "3-month": {...}}, ...},
+      "matches": [{"players": ["Jon Rahm", "Scottie Scheffler"], "result": "halved"}, ...]
+    }
+
+`players` holds each player's strokes gained as of the event, so a backtest
+never sees data from after it. Players left out of it are looked up in a
+`mcp_servers.player_store.PlayerStore` as of the event's date, when one is
+given. `result` is a team name or "halved", and each match lists the first
+team's player first. No historical data ships with the repository.
+
+Every event is scored by one of the `PREDICTORS`:
+
+- `numeric`: `scoring.score_matchup`, the NumericMatchupAgent's scoring;
+- `match_play`: the hole-by-hole model of `ryder_cup_prediction.match_play`,
+  evaluated exactly with the state tables of `ryder_cup_prediction.live`;
+- `stub` / `llm`: the real per-match agent pipeline, up to the
+  MatchupSynthesizerAgent, with the event's players seeded as
+  `player_profiles`. `stub` uses the offline `StubLlm`; `llm` uses Gemini
+  through the `LlmResponseCache` at RYDER_CUP_LLM_CACHE, so a warm cache
+  replays a backtest offline. The first team plays the pipeline's Europe side.
+
+Events are spread over a process pool. Predictions and outcomes are stored
+column by column in a compressed .npz file (`save_predictions`) and scored
+with the multi-class Brier score, log loss and reliability curves for a win
+of the first team and a halve (`evaluate`).
+
+    python -m ryder_cup_prediction.backtest events/ [--predictor numeric] [--workers 4] [--output runs/numeric.npz]
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import glob
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from dataclasses import field
+
+import numpy as np
+from mcp_servers.name_index import PlayerNameIndex
+from mcp_servers.player_store import PlayerStore
+from ryder_cup_prediction.live import HOLES
+from ryder_cup_prediction.live import state_tables
+from ryder_cup_prediction.match_play import hole_outcome_probabilities
+from ryder_cup_prediction.scoring import DEFAULT_CONFIG
+from ryder_cup_prediction.scoring import ScoringConfig
+from ryder_cup_prediction.scoring import score_matchup
+
+PREDICTORS = ("numeric", "match_play", "stub", "llm")
+
+# Outcome columns, from the first team's point of view
+OUTCOME_COLUMNS = ("first_team_win", "halve", "second_team_win")
+
+_APP_NAME = "ryder_cup_backtest"
+
+# Probabilities are clipped to this before taking logs, so a confident miss is finite
+_LOG_LOSS_EPSILON = 1e-6
+
+
+@dataclass
+class BacktestPredictions:
+    """Columnar predictions and outcomes of a backtest, one row per match."""
+
+    predictor: str
+    event_names: np.ndarray
+    event_dates: np.ndarray
+    # Index into event_names for every match
+    event: np.ndarray
+    # 1-based match number within its event
+    match: np.ndarray
+    # (n_matches, 3) predicted [first team win, halve, second team win]
+    probabilities: np.ndarray
+    # Index into OUTCOME_COLUMNS of what happened
+    outcome: np.ndarray
+
+
+@dataclass
+class BacktestReport:
+    """Accuracy and calibration of a backtest."""
+
+    predictor: str
+    events: int
+    matches: int
+    brier_score: float
+    log_loss: float
+    # Brier score of always predicting the observed outcome frequencies, for reference
+    climatology_brier_score: float
+    observed_frequencies: dict = field(default_factory=dict)
+    # Outcome -> reliability bins of mean predicted probability vs observed frequency
+    calibration: dict = field(default_factory=dict)
+    elapsed_s: float = 0.0
+
+    def to_dict(self) -> dict:
+        """Returns a JSON-serializable view of the report."""
+        return dataclasses.asdict(self)
+
+
+def _validate_event(event: dict, source: str) -> dict:
+    name = event.get("name") or source
+    teams = tuple(event.get("teams", ("Europe", "USA")))
+    if len(teams) != 2:
+        raise ValueError(f"{name}: expected two teams, got {teams}")
+    players = event.get("players", {})
+    matches = event.get("matches") or []
+    if not matches:
+        raise ValueError(f"{name}: no matches")
+    for number, match in enumerate(matches, start=1):
+        if len(match.get("players", ())) != 2:
+            raise ValueError(f"{name}, match {number}: expected two players")
+        missing = [player for player in match["players"] if player not in players]
+        if missing:
+            raise ValueError(f"{name}, match {number}: no strokes-gained data for {', '.join(missing)}")
+        if match.get("result") not in teams + ("halved",):
+            raise ValueError(f"{name}, match {number}: result {match.get('result')!r} is not one of {teams} or halved")
+    return {
+        "name": name,
+        "date": str(event.get("date", "")),
+        "teams": teams,
+        "starting_score": event.get("starting_score"),
+        "players": players,
+        "matches": matches,
+    }
+
+
+def _with_store_players(event: dict, store, index) -> dict:
+    """Fills in the players an event has no strokes gained for, as of the event's date."""
+    players = dict(event.get("players", {}))
+    for match in event.get("matches") or []:
+        for name in match.get("players", ()):
+            canonical = None if name in players or not event.get("date") else index.resolve(name)
+            data = store.get(canonical, event["date"]) if canonical else None
+            if data is not None:
+                players[name] = data
+    return {**event, "players": players}
+
+
+def load_events(path: str, store=None) -> list[dict]:
+    """
+    Loads and validates the events of a JSON file, a JSONL file or a directory of them.
+
+    Args:
+        path: File or directory (all *.json and *.jsonl files, in name order).
+        store: Optional `PlayerStore` for players without strokes gained in the event file.
+
+    Returns:
+        list[dict]: The events, sorted by date.
+
+    Raises:
+        ValueError: If an event lacks matches, a result or a player's strokes gained.
+    """
+    paths = sorted(glob.glob(os.path.join(path, "*.json*"))) if os.path.isdir(path) else [path]
+    index = PlayerNameIndex(store.names()) if store is not None else None
+    events = []
+    for source in paths:
+        with open(source) as f:
+            if source.endswith(".jsonl"):
+                entries = [json.loads(line) for line in f if line.strip()]
+            else:
+                data = json.load(f)
+                entries = data if isinstance(data, list) else [data]
+        if store is not None:
+            entries = [_with_store_players(entry, store, index) for entry in entries]
+        events.extend(_validate_event(entry, os.path.basename(source)) for entry in entries)
+    return sorted(events, key=lambda event: event["date"])
+
+
+def _outcome_index(event: dict, result: str) -> int:
+    if result == "halved":
+        return 1
+    return 0 if result == event["teams"][0] else 2
+
+
+def _predict_numeric(event: dict, config: ScoringConfig) -> np.ndarray:
+    players = event["players"]
+    rows = []
+    for first, second in (match["players"] for match in event["matches"]):
+        scored = score_matchup(players[first], players[second], config)
+        rows.append([scored["player_A_win_prob"], scored["tie_prob"], scored["player_B_win_prob"]])
+    return np.asarray(rows)
+
+
+def _predict_match_play(event: dict, config: ScoringConfig) -> np.ndarray:
+    players = event["players"]
+    pairings = [match["players"] for match in event["matches"]]
+    hole_probabilities = hole_outcome_probabilities(
+        [players[first] for first, _ in pairings], [players[second] for _, second in pairings], config
+    )
+    return state_tables(hole_probabilities, HOLES)[:, HOLES, HOLES]
+
+
+async def _predict_pipeline(event: dict, config: ScoringConfig, model) -> np.ndarray:
+    # Imported here: google.adk takes seconds to import and the numeric predictors don't need it
+    from google.adk import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+    from ryder_cup_prediction.agent import create_agent
+    from ryder_cup_prediction.agent import match_state_key
+    from ryder_cup_prediction.instrumentation import tracing_plugins
+    from ryder_cup_prediction.schemas import MatchProbabilities
+    from ryder_cup_prediction.schemas import MatchProfiles
+    from ryder_cup_prediction.schemas import PlayerProfile
+    from ryder_cup_prediction.schemas import dump_state
+    from ryder_cup_prediction.schemas import load_state
+
+    pairings = [tuple(match["players"]) for match in event["matches"]]
+    starting_score = event["starting_score"] or {}
+    # The pipeline's prompts are written for Europe vs USA; the first team takes the Europe side
+    first_team, second_team = event["teams"]
+    card_score = {"Europe": starting_score.get(first_team, 0.0), "USA": starting_score.get(second_team, 0.0)}
+    agent = create_agent(
+        pairings=pairings, starting_score=card_score, scoring_config=config, profiles_in_state=True, model=model
+    )
+    state = {
+        match_state_key("player_profiles", number): dump_state(
+            MatchProfiles(players=[PlayerProfile.from_windows(name, event["players"][name]) for name in pairing])
+        )
+        for number, pairing in enumerate(pairings, start=1)
+    }
+
+    session_service = InMemorySessionService()
+    runner = Runner(app_name=_APP_NAME, agent=agent, session_service=session_service, plugins=tracing_plugins(agent))
+    try:
+        session = await session_service.create_session(app_name=_APP_NAME, user_id="backtest", state=state)
+        message = types.Content(role="user", parts=[types.Part(text=f"Predict the singles card of {event['name']}.")])
+        async for _ in runner.run_async(user_id=session.user_id, session_id=session.id, new_message=message):
+            pass
+        final = await session_service.get_session(app_name=_APP_NAME, user_id="backtest", session_id=session.id)
+    finally:
+        await runner.close()
+
+    rows = []
+    for number in range(1, len(pairings) + 1):
+        try:
+            value = final.state.get(match_state_key("match_probabilities", number))
+            probabilities = load_state(value, MatchProbabilities)
+            rows.append(
+                probabilities.europe_view()
+                or (probabilities.player_A_win_prob, probabilities.tie_prob, probabilities.player_B_win_prob)
+            )
+        except ValueError:
+            # A stage that failed is scored as "no information", like the card aggregator does
+            rows.append((np.nan, np.nan, np.nan))
+    return np.asarray(rows, dtype=np.float64)
+
+
+def _predict_events(events: list, predictor: str, config: ScoringConfig) -> list:
+    """Process-pool entry point: the probability rows of each event."""
+    if predictor == "numeric":
+        return [_predict_numeric(event, config) for event in events]
+    if predictor == "match_play":
+        return [_predict_match_play(event, config) for event in events]
+
+    # The pipeline reads no credentials or caches it isn't given
+    os.environ.setdefault("AGENTOPS_API_KEY", "")
+    if predictor == "stub":
+        from ryder_cup_prediction.stub_llm import StubLlm
+
+        model = StubLlm()
+    else:
+        model = None
+
+    async def run_all():
+        return [await _predict_pipeline(event, config, model) for event in events]
+
+    return asyncio.run(run_all())
+
+
+def predict_events(
+    events: list[dict],
+    predictor: str = "numeric",
+    config: ScoringConfig = DEFAULT_CONFIG,
+    workers: int | None = None,
+) -> BacktestPredictions:
+    """
+    Predicts every match of the events and collects the predictions with the outcomes.
+
+    Args:
+        events: Events from `load_events`.
+        predictor: One of `PREDICTORS`.
+        config: Scoring parameters of the numeric predictors and the numeric pipeline stages.
+        workers: Process pool size; None uses every CPU, 1 runs in this process.
+
+    Returns:
+        BacktestPredictions: One row per match, in event order.
+    """
+    if predictor not in PREDICTORS:
+        raise ValueError(f"Unknown predictor: {predictor}, expected one of {PREDICTORS}")
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(events)))
+    # Contiguous chunks keep each worker's ADK and model setup to one per chunk
+    chunk_size = math.ceil(len(events) / workers) if events else 1
+    chunks = [events[i : i + chunk_size] for i in range(0, len(events), chunk_size)]
+
+    if workers == 1:
+        predicted = [rows for chunk in chunks for rows in _predict_events(chunk, predictor, config)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_predict_events, chunk, predictor, config) for chunk in chunks]
+            predicted = [rows for future in futures for rows in future.result()]
+
+    event_index, match_number, outcome = [], [], []
+    for i, event in enumerate(events):
+        for number, match in enumerate(event["matches"], start=1):
+            event_index.append(i)
+            match_number.append(number)
+            outcome.append(_outcome_index(event, match["result"]))
+
+    probabilities = np.concatenate(predicted) if predicted else np.empty((0, 3))
+    totals = probabilities.sum(axis=1, keepdims=True)
+    return BacktestPredictions(
+        predictor=predictor,
+        event_names=np.array([event["name"] for event in events]),
+        event_dates=np.array([event["date"] for event in events]),
+        event=np.asarray(event_index, dtype=np.int32),
+        match=np.asarray(match_number, dtype=np.int16),
+        probabilities=(probabilities / np.where(totals > 0, totals, 1)).astype(np.float32),
+        outcome=np.asarray(outcome, dtype=np.int8),
+    )
+
+
+def save_predictions(predictions: BacktestPredictions, path: str):
+    """Stores the predictions column by column in a compressed .npz file."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    columns = {f.name: np.asarray(getattr(predictions, f.name)) for f in dataclasses.fields(predictions)}
+    np.savez_compressed(path, **columns)
+
+
+def load_predictions(path: str) -> BacktestPredictions:
+    """Reads predictions stored by `save_predictions`."""
+    with np.load(path) as data:
+        columns = {f.name: data[f.name] for f in dataclasses.fields(BacktestPredictions)}
+    columns["predictor"] = str(columns["predictor"])
+    return BacktestPredictions(**columns)
+
+
+def calibration_curve(predicted: np.ndarray, observed: np.ndarray, bins: int = 10) -> list[dict]:
+    """
+    Bins predicted probabilities of one outcome and compares them with how often it happened.
+
+    Args:
+        predicted: Predicted probability of the outcome per match.
+        observed: 1 where the outcome happened, else 0.
+        bins: Number of equal-width probability bins.
+
+    Returns:
+        list[dict]: Non-empty bins with their range, match count, mean predicted
+                    probability and observed frequency.
+    """
+    index = np.minimum((predicted * bins).astype(np.int64), bins - 1)
+    counts = np.bincount(index, minlength=bins)
+    predicted_sums = np.bincount(index, weights=predicted, minlength=bins)
+    observed_sums = np.bincount(index, weights=observed, minlength=bins)
+    return [
+        {
+            "bin": [round(b / bins, 4), round((b + 1) / bins, 4)],
+            "count": int(counts[b]),
+            "mean_predicted": round(float(predicted_sums[b] / counts[b]), 4),
+            "observed_frequency": round(float(observed_sums[b] / counts[b]), 4),
+        }
+        for b in range(bins)
+        if counts[b]
+    ]
+
+
+def evaluate(predictions: BacktestPredictions, bins: int = 10) -> BacktestReport:
+    """
+    Scores predictions against the outcomes.
+
+    Matches without a prediction (a failed pipeline stage) are left out.
+
+    Args:
+        predictions: From `predict_events` or `load_predictions`.
+        bins: Number of reliability bins.
+
+    Returns:
+        BacktestReport: Multi-class Brier score (0 is perfect, 2 the worst), log loss
+                        and reliability curves of a first-team win and a halve.
+    """
+    scored = ~np.isnan(predictions.probabilities).any(axis=1)
+    probabilities = predictions.probabilities[scored].astype(np.float64)
+    outcome = predictions.outcome[scored]
+    if not len(outcome):
+        raise ValueError("No scored matches to evaluate")
+    observed = np.eye(3)[outcome]
+
+    frequencies = observed.mean(axis=0)
+    chosen = probabilities[np.arange(len(outcome)), outcome]
+    return BacktestReport(
+        predictor=predictions.predictor,
+        events=int(len(np.unique(predictions.event[scored]))),
+        matches=int(len(outcome)),
+        brier_score=float(((probabilities - observed) ** 2).sum(axis=1).mean()),
+        log_loss=float(-np.log(np.clip(chosen, _LOG_LOSS_EPSILON, 1.0)).mean()),
+        climatology_brier_score=float(((frequencies - observed) ** 2).sum(axis=1).mean()),
+        observed_frequencies={name: round(float(p), 4) for name, p in zip(OUTCOME_COLUMNS, frequencies)},
+        calibration={
+            name: calibration_curve(probabilities[:, column], observed[:, column], bins)
+            for column, name in ((0, "first_team_win"), (1, "halve"))
+        },
+    )
+
+
+def run_backtest(
+    events: list[dict],
+    predictor: str = "numeric",
+    config: ScoringConfig = DEFAULT_CONFIG,
+    workers: int | None = None,
+    output: str | None = None,
+) -> BacktestReport:
+    """
+    Predicts the events, optionally stores the predictions, and evaluates them.
+
+    Args:
+        events: Events from `load_events`.
+        predictor: One of `PREDICTORS`.
+        config: Scoring parameters.
+        workers: Process pool size; None uses every CPU.
+        output: Optional .npz path for the predictions.
+
+    Returns:
+        BacktestReport: With the wall time of the predictions.
+    """
+    started = time.perf_counter()
+    predictions = predict_events(events, predictor, config, workers)
+    elapsed = time.perf_counter() - started
+    if output:
+        save_predictions(predictions, output)
+    report = evaluate(predictions)
+    report.elapsed_s = round(elapsed, 3)
+    return report
+
+
+def _parse_overrides(assignments: list) -> dict:
+    """Parses `name=value` ScoringConfig overrides, e.g. sg_scale=1.4."""
+    names = {f.name for f in dataclasses.fields(ScoringConfig)}
+    overrides = {}
+    for assignment in assignments:
+        name, _, value = assignment.partition("=")
+        if name not in names:
+            raise SystemExit(f"Unknown ScoringConfig field: {name}, expected one of {sorted(names)}")
+        overrides[name] = float(value)
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the match probabilities on past singles cards.")
+    parser.add_argument("events", help="Event JSON/JSONL file or directory of them.")
+    parser.add_argument("--store", help="Player store for players without strokes gained in the event files.")
+    parser.add_argument("--predictor", choices=PREDICTORS, default="numeric", help="How matches are predicted.")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: all CPUs).")
+    parser.add_argument("--output", help="Store the predictions in this .npz file.")
+    parser.add_argument(
+        "--set", action="append", default=[], metavar="NAME=VALUE", help="Override a ScoringConfig field."
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    config = dataclasses.replace(DEFAULT_CONFIG, **_parse_overrides(args.set))
+    store = PlayerStore(args.store, readonly=True) if args.store else None
+    events = load_events(args.events, store)
+    report = run_backtest(events, args.predictor, config, args.workers, args.output)
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+        return
+
+    print(
+        f"{report.predictor}: {report.matches} matches of {report.events} events in {report.elapsed_s:.2f} s\n"
+        f"  Brier score {report.brier_score:.4f} (climatology {report.climatology_brier_score:.4f}),"
+        f" log loss {report.log_loss:.4f}"
+    )
+    for outcome, curve in report.calibration.items():
+        print(f"  Calibration of {outcome}:")
+        for entry in curve:
+            low, high = entry["bin"]
+            print(
+                f"    {low:.1f}-{high:.1f}: predicted {entry['mean_predicted']:.3f}"
+                f" observed {entry['observed_frequency']:.3f} ({entry['count']} matches)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Custom (non-LLM) ADK agents used to orchestrate the prediction pipeline.
+"""
+
+import asyncio
+import json
+import time
+from typing import AsyncGenerator
+from typing import Callable
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.utils.context_utils import Aclosing
+from google.genai import types
+from mcp_servers.name_index import normalize_name
+from ryder_cup_prediction.schemas import BaselineSkill
+from ryder_cup_prediction.schemas import MatchProbabilities
+from ryder_cup_prediction.schemas import MatchProfiles
+from ryder_cup_prediction.schemas import RecentForm
+from ryder_cup_prediction.schemas import dump_state
+from ryder_cup_prediction.schemas import load_state
+from ryder_cup_prediction.scoring import DEFAULT_CONFIG
+from ryder_cup_prediction.scoring import ScoringConfig
+from ryder_cup_prediction.scoring import score_matchup
+
+
+class ConcurrentMatchAgent(BaseAgent):
+    """
+    Runs one sub-agent pipeline per match concurrently.
+
+    Works like ADK's `ParallelAgent` (every sub-agent gets its own isolated
+    branch, so matches don't see each other's conversation) but caps the number
+    of pipelines in flight with `max_concurrency` to stay within model quotas.
+    """
+
+    max_concurrency: int | None = None
+    """Maximum number of match pipelines running at once. None runs all of them."""
+    wait_observer: Callable[[str, str, int], None] | None = None
+    """Called with (invocation id, agent name, nanoseconds) for every wait of a match: for a
+    `max_concurrency` slot (booked to this agent) or for the runner to commit an event (booked
+    to the event's author, whose generator is suspended meanwhile). Set by `PipelineTracer`."""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        if not self.sub_agents:
+            return
+
+        semaphore = asyncio.Semaphore(self.max_concurrency or len(self.sub_agents))
+        queue = asyncio.Queue()
+        finished = object()
+
+        async def run_pipeline(sub_agent: BaseAgent):
+            branch_ctx = ctx.model_copy()
+            branch_suffix = f"{self.name}.{sub_agent.name}"
+            branch_ctx.branch = f"{ctx.branch}.{branch_suffix}" if ctx.branch else branch_suffix
+            try:
+                waiting = time.perf_counter_ns()
+                async with semaphore:
+                    self._observe_wait(ctx, self.name, waiting)
+                    async with Aclosing(sub_agent.run_async(branch_ctx)) as events:
+                        async for event in events:
+                            # Wait until the runner has committed the event (and its
+                            # state delta) before the next stage of this match reads it
+                            consumed = asyncio.Event()
+                            waiting = time.perf_counter_ns()
+                            await queue.put((event, consumed))
+                            await consumed.wait()
+                            self._observe_wait(ctx, event.author, waiting)
+            finally:
+                await queue.put((finished, None))
+
+        async with asyncio.TaskGroup() as task_group:
+            for sub_agent in self.sub_agents:
+                task_group.create_task(run_pipeline(sub_agent))
+
+            running = len(self.sub_agents)
+            while running:
+                event, consumed = await queue.get()
+                if event is finished:
+                    running -= 1
+                    continue
+                yield event
+                consumed.set()
+
+    def _observe_wait(self, ctx: InvocationContext, agent_name: str, since_ns: int):
+        if self.wait_observer:
+            self.wait_observer(ctx.invocation_id, agent_name, time.perf_counter_ns() - since_ns)
+
+
+class NumericMatchupAgent(BaseAgent):
+    """
+    Deterministic replacement for the form, baseline and synthesis LLM stages.
+
+    Reads the PlayerProfilerAgent output from session.state, scores the matchup
+    with `ryder_cup_prediction.scoring` and writes the same three typed state
+    values (`ryder_cup_prediction.schemas`) the LLM stages would, in one event
+    and without any model call.
+    """
+
+    profiles_key: str = "player_profiles"
+    recent_form_key: str = "recent_form_analysis"
+    baseline_skill_key: str = "baseline_skill_analysis"
+    probabilities_key: str = "match_probabilities"
+    pairing: tuple[str, str] | None = None
+    """(Europe player, USA player); adds Europe-perspective probabilities when the names match."""
+    scoring_config: ScoringConfig = DEFAULT_CONFIG
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        try:
+            players = load_state(ctx.session.state.get(self.profiles_key), MatchProfiles).player_data()
+            if len(players) != 2:
+                raise ValueError(f"expected 2 player profiles, found {len(players)}")
+        except (ValueError, TypeError, KeyError) as e:
+            probabilities = {"error": f"Could not read session.state['{self.profiles_key}']: {e}"}
+            yield self._state_event(ctx, {self.probabilities_key: probabilities}, probabilities)
+            return
+
+        (name_a, data_a), (name_b, data_b) = players.items()
+        scores = score_matchup(data_a, data_b, self.scoring_config)
+        probabilities = MatchProbabilities(
+            player_A=name_a,
+            player_B=name_b,
+            player_A_win_prob=scores["player_A_win_prob"],
+            tie_prob=scores["tie_prob"],
+            player_B_win_prob=scores["player_B_win_prob"],
+            skill_gap=scores["skill_gap"],
+        )
+
+        if self.pairing:
+            europe_player = normalize_name(self.pairing[0])
+            if europe_player in (normalize_name(name_a), normalize_name(name_b)):
+                europe_is_a = europe_player == normalize_name(name_a)
+                probabilities.europe_win_prob = scores["player_A_win_prob" if europe_is_a else "player_B_win_prob"]
+                probabilities.usa_win_prob = scores["player_B_win_prob" if europe_is_a else "player_A_win_prob"]
+
+        summary = dump_state(probabilities)
+        state_delta = {
+            self.recent_form_key: dump_state(RecentForm.from_player_data(players, self.scoring_config)),
+            self.baseline_skill_key: dump_state(BaselineSkill.from_player_data(players)),
+            self.probabilities_key: summary,
+        }
+        yield self._state_event(ctx, state_delta, summary)
+
+    def _state_event(self, ctx: InvocationContext, state_delta: dict, summary: dict) -> Event:
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=json.dumps(summary))]),
+            actions=EventActions(state_delta=state_delta),
+        )
@@ -0,0 +1,270 @@
+"""
+Exact team-score distribution of the Sunday singles session.
+
+Each match contributes a polynomial over Europe's half points:
+
+    usa_win * x^0 + halve * x^1 + europe_win * x^2
+
+The session's distribution is the product (convolution) of the 12 match
+polynomials, so it's exact and needs no sampling. `ExactSinglesEngine` keeps
+the products in a segment tree: changing one match's probabilities or fixing
+its result only recomputes the log2(n) products on that match's path to the
+root, and a what-if query recombines those paths without touching the stored
+tree.
+
+    engine = ExactSinglesEngine(match_probabilities, starting_score={"USA": 4.5, "Europe": 11.5})
+    engine.distribution().probability_at_least("Europe", 14)
+    engine.what_if({4: "halved"}).probability_at_least("USA", 14.5)
+    engine.update(7, [0.5, 0.1, 0.4])
+
+Queries on a `TeamScoreDistribution` are lookups into a precomputed survival
+function.
+"""
+
+import math
+
+import numpy as np
+from ryder_cup_prediction.simulation import RETAIN_POINTS
+from ryder_cup_prediction.simulation import TEAMS
+from ryder_cup_prediction.simulation import SimulationResult
+from ryder_cup_prediction.simulation import probabilities_to_array
+
+# Known match results as [europe_win, halve, usa_win] rows
+OUTCOMES = {
+    "Europe": (1.0, 0.0, 0.0),
+    "halved": (0.0, 1.0, 0.0),
+    "USA": (0.0, 0.0, 1.0),
+}
+
+_IDENTITY = np.ones(1)
+
+
+def _match_polynomial(row) -> np.ndarray:
+    """Coefficients by Europe's half points: [usa_win, halve, europe_win]."""
+    europe_win, halve, usa_win = row
+    return np.array([usa_win, halve, europe_win], dtype=np.float64)
+
+
+def _outcome_row(result) -> np.ndarray:
+    """Accepts an OUTCOMES label or a probability row / dict for a match."""
+    if isinstance(result, str):
+        if result not in OUTCOMES:
+            raise ValueError(f"Unknown match result: {result!r}, expected one of {sorted(OUTCOMES)}")
+        return np.asarray(OUTCOMES[result])
+    return probabilities_to_array([result])[0]
+
+
+class TeamScoreDistribution:
+    """Exact distribution of the final team totals after the singles session."""
+
+    def __init__(self, half_point_probs: np.ndarray, starting_score: dict, holder: str = "Europe"):
+        """
+        Args:
+            half_point_probs: Probability of Europe earning k half points in the session, k = 0..2n.
+            starting_score: Points after Saturday, e.g. {"USA": 4.5, "Europe": 11.5}.
+            holder: The team holding the cup, which retains it on a 14-14 tie.
+        """
+        if holder not in TEAMS:
+            raise ValueError(f"Unknown holder: {holder}")
+        self.half_point_probs = half_point_probs
+        self.starting_score = dict(starting_score)
+        self.holder = holder
+        self.n_matches = (len(half_point_probs) - 1) // 2
+        # survival[k] = P(Europe earns at least k half points); survival[2n + 1] = 0
+        self._survival = np.append(np.cumsum(half_point_probs[::-1])[::-1], 0.0)
+
+    def _europe_half_points_for(self, team: str, points: float) -> tuple:
+        """Returns (k, at_least): `team` reaches `points` iff Europe's half points are >= k (or <= k)."""
+        if team == "Europe":
+            return math.ceil(round(2 * (points - self.starting_score["Europe"]), 9)), True
+        if team == "USA":
+            # USA total = USA start + n - k / 2
+            return math.floor(round(2 * (self.starting_score["USA"] + self.n_matches - points), 9)), False
+        raise ValueError(f"Unknown team: {team}")
+
+    def probability_at_least(self, team: str, points: float) -> float:
+        """
+        Returns the probability that `team` finishes with at least `points`.
+
+        Args:
+            team: "Europe" or "USA".
+            points: Final team total, e.g. 14 or 14.5.
+
+        Returns:
+            float: P(team total >= points).
+        """
+        k, at_least = self._europe_half_points_for(team, points)
+        top = 2 * self.n_matches + 1
+        if at_least:
+            return float(self._survival[min(max(k, 0), top)])
+        # P(Europe half points <= k) = 1 - P(>= k + 1)
+        return float(1.0 - self._survival[min(max(k + 1, 0), top)]) if k >= 0 else 0.0
+
+    def clinch_points(self, team: str) -> float:
+        """Points `team` needs to take the cup: 14 retains it for the holder, 14.5 wins it outright."""
+        return RETAIN_POINTS if team == self.holder else RETAIN_POINTS + 0.5
+
+    def clinch_probability(self, team: str) -> float:
+        """Probability that `team` reaches its `clinch_points`."""
+        return self.probability_at_least(team, self.clinch_points(team))
+
+    def points_needed(self, team: str) -> float:
+        """Singles points `team` still needs to reach its `clinch_points` (0 if already there)."""
+        return max(0.0, self.clinch_points(team) - self.starting_score[team])
+
+    def europe_totals(self) -> np.ndarray:
+        """Europe's final total for each entry of `half_point_probs`."""
+        return self.starting_score["Europe"] + np.arange(2 * self.n_matches + 1) / 2
+
+    def win_probability(self) -> dict:
+        """Probability of each side finishing above 14 points."""
+        return {team: self.probability_at_least(team, RETAIN_POINTS + 0.5) for team in TEAMS}
+
+    def tie_probability(self) -> float:
+        k, _ = self._europe_half_points_for("Europe", RETAIN_POINTS)
+        return float(self.half_point_probs[k]) if 0 <= k <= 2 * self.n_matches else 0.0
+
+    def to_result(self, match_probabilities=None) -> SimulationResult:
+        """
+        Returns the distribution in the `simulate_singles` result shape.
+
+        Args:
+            match_probabilities: Optional per-match rows, used for `match_expected_points`.
+
+        Returns:
+            SimulationResult: With `num_simulations` 0, since nothing was sampled.
+        """
+        europe_totals = self.europe_totals()
+        usa_totals = self.starting_score["USA"] + self.n_matches - np.arange(2 * self.n_matches + 1) / 2
+        win = self.win_probability()
+        tie = self.tie_probability()
+        match_points = []
+        if match_probabilities is not None:
+            for i, (europe_win, halve, _) in enumerate(probabilities_to_array(match_probabilities)):
+                points = float(europe_win + halve / 2)
+                match_points.append({"match": i + 1, "Europe": points, "USA": 1 - points})
+        return SimulationResult(
+            num_simulations=0,
+            seed=None,
+            holder=self.holder,
+            starting_score=dict(self.starting_score),
+            europe_total_distribution={
+                float(total): float(p) for total, p in zip(europe_totals, self.half_point_probs) if p > 0
+            },
+            expected_points={
+                "Europe": float(europe_totals @ self.half_point_probs),
+                "USA": float(usa_totals @ self.half_point_probs),
+            },
+            match_expected_points=match_points,
+            win_probability=win,
+            retain_probability=win[self.holder] + tie,
+            tie_probability=tie,
+        )
+
+
+class ExactSinglesEngine:
+    """
+    Segment tree of match polynomials with incremental updates and what-if queries.
+
+    Match numbers are 1-based, like the `Match n` pairings of the card.
+    """
+
+    def __init__(self, match_probabilities, starting_score: dict, holder: str = "Europe"):
+        """
+        Args:
+            match_probabilities: Per-match [europe_win, halve, usa_win] probabilities,
+                                 see `probabilities_to_array`.
+            starting_score: Points after Saturday, e.g. {"USA": 4.5, "Europe": 11.5}.
+            holder: The team holding the cup, which retains it on a 14-14 tie.
+        """
+        if holder not in TEAMS:
+            raise ValueError(f"Unknown holder: {holder}")
+        rows = probabilities_to_array(match_probabilities)
+        self.n_matches = rows.shape[0]
+        self.starting_score = dict(starting_score)
+        self.holder = holder
+        self.match_probabilities = rows
+
+        self._size = 1 << max(0, (self.n_matches - 1).bit_length())
+        self._tree = [_IDENTITY] * (2 * self._size)
+        for i, row in enumerate(rows):
+            self._tree[self._size + i] = _match_polynomial(row)
+        for node in range(self._size - 1, 0, -1):
+            self._tree[node] = np.convolve(self._tree[2 * node], self._tree[2 * node + 1])
+        self._distribution = None
+
+    def _leaf(self, match_number: int) -> int:
+        if not 1 <= match_number <= self.n_matches:
+            raise ValueError(f"Unknown match: {match_number}, the card has {self.n_matches} matches")
+        return self._size + match_number - 1
+
+    def update(self, match_number: int, probabilities):
+        """
+        Replaces one match's probabilities (or fixes its result) and recomputes its path to the root.
+
+        Args:
+            match_number: 1-based match number.
+            probabilities: A [europe_win, halve, usa_win] row, a probability dict,
+                           or an `OUTCOMES` label ("Europe", "halved", "USA").
+        """
+        node = self._leaf(match_number)
+        row = _outcome_row(probabilities)
+        self.match_probabilities[match_number - 1] = row
+        self._tree[node] = _match_polynomial(row)
+        node //= 2
+        while node:
+            self._tree[node] = np.convolve(self._tree[2 * node], self._tree[2 * node + 1])
+            node //= 2
+        self._distribution = None
+
+    def distribution(self) -> TeamScoreDistribution:
+        """Returns the current distribution (cached until the next `update`)."""
+        if self._distribution is None:
+            self._distribution = TeamScoreDistribution(self._tree[1], self.starting_score, self.holder)
+        return self._distribution
+
+    def what_if(self, results: dict) -> TeamScoreDistribution:
+        """
+        Returns the distribution with some matches overridden, leaving the engine unchanged.
+
+        Args:
+            results: Match number -> `OUTCOMES` label or probability row, e.g. {4: "halved"}.
+
+        Returns:
+            TeamScoreDistribution: Only the paths of the overridden matches are recombined.
+        """
+        overrides = {
+            self._leaf(match_number): _match_polynomial(_outcome_row(result))
+            for match_number, result in results.items()
+        }
+        if not overrides:
+            return self.distribution()
+
+        # Walk up from the overridden leaves, recombining each affected node once
+        nodes = dict(overrides)
+        level = set(overrides)
+        while level != {1}:
+            parents = {node // 2 for node in level}
+            for parent in parents:
+                left = nodes.get(2 * parent, self._tree[2 * parent])
+                right = nodes.get(2 * parent + 1, self._tree[2 * parent + 1])
+                nodes[parent] = np.convolve(left, right)
+            level = parents
+        return TeamScoreDistribution(nodes[1], self.starting_score, self.holder)
+
+
+def exact_singles(match_probabilities, starting_score: dict, holder: str = "Europe") -> SimulationResult:
+    """
+    Computes the exact team-total distribution of the singles session.
+
+    Args:
+        match_probabilities: Per-match [europe_win, halve, usa_win] probabilities,
+                             see `probabilities_to_array`.
+        starting_score: Points after Saturday, e.g. {"USA": 4.5, "Europe": 11.5}.
+        holder: The team holding the cup, which retains it on a 14-14 tie.
+
+    Returns:
+        SimulationResult: The same fields as `simulate_singles`, without sampling noise.
+    """
+    engine = ExactSinglesEngine(match_probabilities, starting_score, holder)
+    return engine.distribution().to_result(engine.match_probabilities)
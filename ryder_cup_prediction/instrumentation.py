@@ -0,0 +1,555 @@
+"""
+Local per-stage tracing of the prediction pipeline, without AgentOps.
+
+`PipelineTracer` hooks into ADK's before/after agent, model and tool
+callbacks and records one span per agent run, model call and tool call:
+
+- wall time, with each span linked to its parent so time can be attributed
+  to the coordinator, every pipeline stage and the MCP tool calls below them,
+- prompt/output token counts of model calls,
+- tool latency (MCP tools are tagged),
+- bytes written to session.state by every agent,
+- the match a span belongs to in fan-out mode (`PlayerProfilerAgent_Match3`),
+- time a match spent blocked in `ConcurrentMatchAgent` (waiting for a
+  `max_concurrency` slot, or for the runner to commit an event). It is taken
+  out of the blocked stage's self time and reported as its own `queue wait` row.
+
+Spans are appended to a local JSONL file, one span per line, with the field
+names of the OpenTelemetry span data model (traceId, spanId, parentSpanId,
+startTimeUnixNano, ...) and GenAI semantic-convention attributes. Aggregates
+per stage, tool and match are kept in memory for `summary()` and
+`format_summary()`, which rank the hot stages by self time.
+
+Recording a span costs 10-40 microseconds, most of it JSON encoding, and the
+file is written in batches. Next to model calls of hundreds of milliseconds
+that is negligible, so the tracer can stay enabled in production:
+
+    tracer = PipelineTracer("traces/pipeline.jsonl")
+    tracer.install(root_agent)
+    ...
+    print(tracer.format_summary())
+
+or set RYDER_CUP_TRACE_PATH and `create_agent()` installs it. A trace file can
+be summarized later with `python -m ryder_cup_prediction.instrumentation FILE`.
+
+ADK only reports failed model and tool calls to plugins, so pass
+`tracing_plugins(agent)` to the Runner as well:
+
+    runner = Runner(app_name=..., agent=agent, session_service=..., plugins=tracing_plugins(agent))
+
+The error callbacks close the failed span with an error status. The error then
+aborts the invocation (the match pipelines' TaskGroup cancels the other
+matches), so every span still open in it is closed too, instead of staying in
+memory for the life of the process.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from collections import defaultdict
+from collections import deque
+
+from google.adk.agents import LlmAgent
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.tools.mcp_tool.mcp_tool import McpTool
+from ryder_cup_prediction.custom_agents import ConcurrentMatchAgent
+
+DEFAULT_FLUSH_EVERY = 256
+# Durations kept per stage for the percentiles of the summary
+DEFAULT_RESERVOIR_SIZE = 2048
+
+SPAN_KINDS = ("agent", "llm", "tool")
+
+# Stage row of the time matches spent blocked in ConcurrentMatchAgent
+QUEUE_WAIT_STAGE = "queue wait"
+
+_MATCH_SUFFIX = re.compile(r"_Match(\d+)$")
+# Fan-out state keys are namespaced per match, see `agent.match_state_key`
+_MATCH_STATE_KEY = re.compile(r"^match_(\d+)_")
+
+
+def stage_name(agent_name: str) -> tuple:
+    """
+    Splits a fan-out agent name into (stage, match number).
+
+    "RecentFormAnalyst_Match3" -> ("RecentFormAnalyst", 3); "RyderCupCoordinator" -> ("RyderCupCoordinator", None)
+    """
+    found = _MATCH_SUFFIX.search(agent_name)
+    if not found:
+        return agent_name, None
+    return agent_name[: found.start()], int(found.group(1))
+
+
+def _payload_size(value) -> int:
+    if isinstance(value, str):
+        return len(value)
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(str(value))
+
+
+class _Span:
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "parent_key",
+        "kind",
+        "name",
+        "stage",
+        "match",
+        "start_ns",
+        "child_ns",
+        "attributes",
+    )
+
+    def __init__(self, trace_id, parent_id, parent_key, kind, name, agent_name, attributes):
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.parent_key = parent_key
+        self.kind = kind
+        self.name = name
+        self.stage, self.match = stage_name(agent_name)
+        self.start_ns = time.time_ns()
+        self.child_ns = 0
+        self.attributes = attributes
+
+
+class _Aggregate:
+    """Running totals of one stage or tool, with a bounded sample of durations for the percentiles."""
+
+    __slots__ = ("count", "total_ns", "self_ns", "max_ns", "durations", "input_tokens", "output_tokens", "state_bytes")
+
+    def __init__(self, reservoir_size):
+        self.count = 0
+        self.total_ns = 0
+        self.self_ns = 0
+        self.max_ns = 0
+        self.durations = deque(maxlen=reservoir_size)
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.state_bytes = 0
+
+    def add(self, duration_ns, self_ns, attributes):
+        self.count += 1
+        self.total_ns += duration_ns
+        self.self_ns += self_ns
+        self.max_ns = max(self.max_ns, duration_ns)
+        self.durations.append(duration_ns)
+        self.input_tokens += attributes.get("gen_ai.usage.input_tokens", 0)
+        self.output_tokens += attributes.get("gen_ai.usage.output_tokens", 0)
+        self.state_bytes += attributes.get("rydercup.state_bytes", 0)
+
+    def to_dict(self) -> dict:
+        ordered = sorted(self.durations)
+
+        def percentile(p):
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] / 1e6, 2) if ordered else 0.0
+
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ns / 1e6, 2),
+            "self_ms": round(self.self_ns / 1e6, 2),
+            "mean_ms": round(self.total_ns / self.count / 1e6, 2) if self.count else 0.0,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "max_ms": round(self.max_ns / 1e6, 2),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "state_bytes": self.state_bytes,
+        }
+
+
+class PipelineTracer:
+    """Records agent, model and tool spans through ADK callbacks and exports them to JSONL."""
+
+    def __init__(
+        self,
+        path: str | None = None,
+        flush_every: int = DEFAULT_FLUSH_EVERY,
+        reservoir_size: int = DEFAULT_RESERVOIR_SIZE,
+        service_name: str = "ryder_cup_prediction",
+    ):
+        """
+        Args:
+            path: JSONL file the spans are appended to, or None to only keep the
+                  in-memory aggregates.
+            flush_every: Number of finished spans buffered before they are written.
+            reservoir_size: Durations kept per stage for the percentiles.
+            service_name: `service.name` attribute of every span.
+        """
+        self.path = os.path.expanduser(path) if path else None
+        self.flush_every = flush_every
+        self.reservoir_size = reservoir_size
+        self.service_name = service_name
+
+        self._open = {}
+        self._parents = {}
+        self._state_before = {}
+        self._buffer = []
+        self._lock = threading.Lock()
+        self.reset()
+
+        if self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+    def reset(self):
+        """Drops the in-memory aggregates (spans already exported stay in the file)."""
+        self._aggregates = {kind: defaultdict(self._new_aggregate) for kind in SPAN_KINDS}
+        self._matches = defaultdict(Counter)
+        self._mcp_tools = set()
+
+    def install(self, agent):
+        """Adds the tracing callbacks to `agent` and every agent below it, after any existing callbacks."""
+        self._parents[agent.name] = agent.parent_agent.name if agent.parent_agent else None
+        agent.before_agent_callback = _append(agent.before_agent_callback, self.before_agent_callback)
+        agent.after_agent_callback = _append(agent.after_agent_callback, self.after_agent_callback)
+        if isinstance(agent, ConcurrentMatchAgent):
+            agent.wait_observer = self.record_wait
+        if isinstance(agent, LlmAgent):
+            # Appended, so a cache hit served by an earlier before_model_callback opens no span
+            agent.before_model_callback = _append(agent.before_model_callback, self.before_model_callback)
+            agent.after_model_callback = _append(agent.after_model_callback, self.after_model_callback)
+            agent.before_tool_callback = _append(agent.before_tool_callback, self.before_tool_callback)
+            agent.after_tool_callback = _append(agent.after_tool_callback, self.after_tool_callback)
+        for sub_agent in agent.sub_agents:
+            self.install(sub_agent)
+        return agent
+
+    # --- ADK callbacks ---
+
+    def before_agent_callback(self, callback_context):
+        invocation_id, agent_name = callback_context.invocation_id, callback_context.agent_name
+        self._start(
+            ("agent", invocation_id, agent_name),
+            invocation_id,
+            ("agent", invocation_id, self._parents.get(agent_name)),
+            "agent",
+            agent_name,
+            agent_name,
+            {"session.id": callback_context.session.id},
+        )
+        # References, not copies: identity tells which keys the agent rewrote
+        self._state_before[(invocation_id, agent_name)] = callback_context.state.to_dict()
+
+    def after_agent_callback(self, callback_context):
+        invocation_id, agent_name = callback_context.invocation_id, callback_context.agent_name
+        before = self._state_before.pop((invocation_id, agent_name), {})
+        _, match = stage_name(agent_name)
+        state_bytes = 0
+        for key, value in callback_context.state.to_dict().items():
+            if before.get(key, _MISSING) is value:
+                continue
+            # Concurrent matches write their own keys meanwhile; only count this match's
+            key_match = _MATCH_STATE_KEY.match(key)
+            if match is not None and key_match and int(key_match.group(1)) != match:
+                continue
+            state_bytes += _payload_size(value)
+        self._end(("agent", invocation_id, agent_name), {"rydercup.state_bytes": state_bytes})
+
+    def before_model_callback(self, callback_context, llm_request):
+        invocation_id, agent_name = callback_context.invocation_id, callback_context.agent_name
+        self._start(
+            ("llm", invocation_id, agent_name),
+            invocation_id,
+            ("agent", invocation_id, agent_name),
+            "llm",
+            agent_name,
+            agent_name,
+            {"gen_ai.request.model": llm_request.model or ""},
+        )
+
+    def after_model_callback(self, callback_context, llm_response):
+        usage = llm_response.usage_metadata
+        attributes = {}
+        if usage:
+            attributes["gen_ai.usage.input_tokens"] = usage.prompt_token_count or 0
+            attributes["gen_ai.usage.output_tokens"] = usage.candidates_token_count or 0
+        if llm_response.error_code:
+            attributes["error.type"] = str(llm_response.error_code)
+        self._end(("llm", callback_context.invocation_id, callback_context.agent_name), attributes)
+
+    def before_tool_callback(self, tool, args, tool_context):
+        invocation_id = tool_context.invocation_id
+        self._start(
+            ("tool", tool_context.function_call_id),
+            invocation_id,
+            ("agent", invocation_id, tool_context.agent_name),
+            "tool",
+            tool.name,
+            tool_context.agent_name,
+            {
+                "gen_ai.tool.name": tool.name,
+                "rydercup.agent": tool_context.agent_name,
+                "rydercup.mcp": isinstance(tool, McpTool),
+            },
+        )
+
+    def after_tool_callback(self, tool, args, tool_context, tool_response):
+        if isinstance(tool, McpTool):
+            self._mcp_tools.add(tool.name)
+        self._end(("tool", tool_context.function_call_id), {"rydercup.response_bytes": _payload_size(tool_response)})
+
+    def on_model_error_callback(self, callback_context, llm_request, error):
+        invocation_id = callback_context.invocation_id
+        self._end(("llm", invocation_id, callback_context.agent_name), {"error.type": type(error).__name__})
+        self._end_invocation(invocation_id, error)
+
+    def on_tool_error_callback(self, tool, tool_args, tool_context, error):
+        self._end(("tool", tool_context.function_call_id), {"error.type": type(error).__name__})
+        self._end_invocation(tool_context.invocation_id, error)
+
+    def record_wait(self, invocation_id, agent_name, wait_ns):
+        """Books time the open span of `agent_name` spent blocked in ConcurrentMatchAgent as queue wait."""
+        span = self._open.get(("agent", invocation_id, agent_name))
+        if span is None:
+            return
+        # Not the stage's own work: kept out of its self time like a child span's
+        span.child_ns += wait_ns
+        span.attributes["rydercup.queue_wait_ns"] = span.attributes.get("rydercup.queue_wait_ns", 0) + wait_ns
+
+    def plugin(self) -> BasePlugin:
+        """Returns the ADK plugin forwarding model and tool errors to this tracer."""
+        return _TracingPlugin(self)
+
+    # --- Reporting ---
+
+    def summary(self) -> dict:
+        """Returns the aggregates per stage, model-calling stage, tool and match."""
+        return {
+            "stages": {name: agg.to_dict() for name, agg in self._aggregates["agent"].items()},
+            "model_calls": {name: agg.to_dict() for name, agg in self._aggregates["llm"].items()},
+            "tools": {name: agg.to_dict() for name, agg in self._aggregates["tool"].items()},
+            "mcp_tools": sorted(self._mcp_tools),
+            "matches": {match: _match_stats(counters) for match, counters in sorted(self._matches.items())},
+        }
+
+    def format_summary(self, limit: int = 10) -> str:
+        """Renders the hot stages, model calls and tools by self time as a text table."""
+        return format_summary(self.summary(), limit)
+
+    def flush(self):
+        """Writes the buffered spans to the JSONL file."""
+        with self._lock:
+            buffer, self._buffer = self._buffer, []
+        if buffer and self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(buffer))
+
+    close = flush
+
+    # --- Internals ---
+
+    def _new_aggregate(self):
+        return _Aggregate(self.reservoir_size)
+
+    def _start(self, key, invocation_id, parent_key, kind, name, agent_name, attributes):
+        parent = self._open.get(parent_key)
+        if parent is None:
+            trace_id, parent_id, parent_key = hashlib.md5(invocation_id.encode()).hexdigest(), None, None
+        else:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        self._open[key] = _Span(trace_id, parent_id, parent_key, kind, name, agent_name, attributes)
+
+    def _add_queue_wait(self, attributes):
+        wait_ns = attributes.get("rydercup.queue_wait_ns", 0)
+        if wait_ns:
+            self._aggregates["agent"][QUEUE_WAIT_STAGE].add(wait_ns, wait_ns, {})
+
+    def _end_invocation(self, invocation_id, error):
+        """Closes the spans left open by an invocation an error aborts, innermost first."""
+        trace_id = hashlib.md5(invocation_id.encode()).hexdigest()
+        orphans = sorted(
+            (key for key, span in self._open.items() if span.trace_id == trace_id),
+            key=lambda key: self._open[key].start_ns,
+            reverse=True,
+        )
+        for key in orphans:
+            self._end(key, {"error.type": type(error).__name__})
+        for key in [key for key in self._state_before if key[0] == invocation_id]:
+            del self._state_before[key]
+
+    def _end(self, key, attributes):
+        span = self._open.pop(key, None)
+        if span is None:
+            return
+        end_ns = time.time_ns()
+        duration_ns = end_ns - span.start_ns
+        span.attributes.update(attributes)
+
+        parent = self._open.get(span.parent_key) if span.parent_key else None
+        if parent:
+            parent.child_ns += duration_ns
+        # Concurrent children can add up to more than the parent's wall time
+        self_ns = max(0, duration_ns - span.child_ns)
+
+        aggregate_name = span.stage if span.kind != "tool" else span.name
+        self._aggregates[span.kind][aggregate_name].add(duration_ns, self_ns, span.attributes)
+        self._add_queue_wait(span.attributes)
+        if span.match is not None:
+            _count_match(self._matches[span.match], span.kind, span.stage, duration_ns, span.attributes)
+
+        if self.path:
+            record = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "parentSpanId": span.parent_id,
+                "name": f"{span.kind} {span.name}",
+                "kind": "SPAN_KIND_CLIENT" if span.kind in ("llm", "tool") else "SPAN_KIND_INTERNAL",
+                "startTimeUnixNano": span.start_ns,
+                "endTimeUnixNano": end_ns,
+                "attributes": {
+                    "service.name": self.service_name,
+                    "rydercup.span_kind": span.kind,
+                    "rydercup.stage": span.stage,
+                    "rydercup.match": span.match,
+                    **span.attributes,
+                },
+                "status": {"code": "STATUS_CODE_ERROR" if "error.type" in span.attributes else "STATUS_CODE_OK"},
+            }
+            with self._lock:
+                self._buffer.append(json.dumps(record, default=str) + "\n")
+                full = len(self._buffer) >= self.flush_every
+            if full or span.parent_id is None:
+                self.flush()
+
+
+class _TracingPlugin(BasePlugin):
+    """Forwards ADK's plugin-only model and tool error callbacks to a `PipelineTracer`."""
+
+    def __init__(self, tracer: PipelineTracer):
+        super().__init__(name=f"pipeline_tracer_{id(tracer):x}")
+        self.tracer = tracer
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error):
+        return self.tracer.on_model_error_callback(callback_context, llm_request, error)
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error):
+        return self.tracer.on_tool_error_callback(tool, tool_args, tool_context, error)
+
+
+def tracing_plugins(agent) -> list:
+    """Returns the error plugins of the tracers installed on `agent`, for `Runner(plugins=...)`."""
+    callbacks = agent.before_agent_callback
+    callbacks = callbacks if isinstance(callbacks, list) else [callbacks]
+    return [
+        callback.__self__.plugin()
+        for callback in callbacks
+        if isinstance(getattr(callback, "__self__", None), PipelineTracer)
+    ]
+
+
+_MISSING = object()
+
+
+def _count_match(counters: Counter, kind: str, stage: str, duration_ns: int, attributes: dict):
+    """Adds a span of one match to that match's counters."""
+    if kind == "agent" and stage == "MatchAnalysisPipeline":
+        counters["pipeline_runs"] += 1
+        counters["pipeline_ns"] += duration_ns
+        # The pipeline span covers the state written by all stages of the match
+        counters["state_bytes"] += attributes.get("rydercup.state_bytes", 0)
+    elif kind == "llm":
+        counters["model_calls"] += 1
+        counters["input_tokens"] += attributes.get("gen_ai.usage.input_tokens", 0)
+        counters["output_tokens"] += attributes.get("gen_ai.usage.output_tokens", 0)
+    elif kind == "tool":
+        counters["tool_calls"] += 1
+        counters["tool_ns"] += duration_ns
+
+
+def _match_stats(counters: Counter) -> dict:
+    runs = counters["pipeline_runs"]
+    return {
+        "pipeline_runs": runs,
+        "pipeline_mean_ms": round(counters["pipeline_ns"] / runs / 1e6, 2) if runs else 0.0,
+        "model_calls": counters["model_calls"],
+        "tool_calls": counters["tool_calls"],
+        "tool_ms": round(counters["tool_ns"] / 1e6, 2),
+        "input_tokens": counters["input_tokens"],
+        "output_tokens": counters["output_tokens"],
+        "state_bytes": counters["state_bytes"],
+    }
+
+
+def _append(existing, callback):
+    """Runs `callback` after the agent's existing callback(s)."""
+    if existing is None:
+        return callback
+    if isinstance(existing, list):
+        return [*existing, callback]
+    return [existing, callback]
+
+
+def summarize_file(path: str, reservoir_size: int = DEFAULT_RESERVOIR_SIZE) -> dict:
+    """Rebuilds the `PipelineTracer.summary()` aggregates from an exported JSONL trace."""
+    tracer = PipelineTracer(reservoir_size=reservoir_size)
+    spans = []
+    with open(os.path.expanduser(path), encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                spans.append(json.loads(line))
+
+    child_ns = defaultdict(int)
+    for span in spans:
+        if span.get("parentSpanId"):
+            child_ns[span["parentSpanId"]] += span["endTimeUnixNano"] - span["startTimeUnixNano"]
+
+    for span in spans:
+        attributes = span["attributes"]
+        kind, stage, match = (attributes[f"rydercup.{field}"] for field in ("span_kind", "stage", "match"))
+        duration_ns = span["endTimeUnixNano"] - span["startTimeUnixNano"]
+        wait_ns = attributes.get("rydercup.queue_wait_ns", 0)
+        self_ns = max(0, duration_ns - child_ns[span["spanId"]] - wait_ns)
+        tracer._aggregates[kind][attributes.get("gen_ai.tool.name", stage)].add(duration_ns, self_ns, attributes)
+        tracer._add_queue_wait(attributes)
+        if attributes.get("rydercup.mcp"):
+            tracer._mcp_tools.add(attributes["gen_ai.tool.name"])
+        if match is not None:
+            _count_match(tracer._matches[match], kind, stage, duration_ns, attributes)
+    return tracer.summary()
+
+
+def format_summary(summary: dict, limit: int = 10) -> str:
+    """Renders a `summary()` as a text report of the hot stages, model calls and tools."""
+    header = f"{'hot spots by self time':<40} {'calls':>7} {'self ms':>10} {'total ms':>10} {'p95 ms':>9} {'tokens':>9}"
+    lines = [header]
+    rows = [(f"stage {name}", stats) for name, stats in summary["stages"].items()]
+    rows += [(f"model {name}", stats) for name, stats in summary["model_calls"].items()]
+    mcp_tools = set(summary["mcp_tools"])
+    rows += [(f"{'mcp' if name in mcp_tools else 'tool'} {name}", stats) for name, stats in summary["tools"].items()]
+    rows.sort(key=lambda row: row[1]["self_ms"], reverse=True)
+    for label, stats in rows[:limit]:
+        tokens = stats["input_tokens"] + stats["output_tokens"]
+        lines.append(
+            f"{label[:40]:<40} {stats['count']:>7} {stats['self_ms']:>10.1f} {stats['total_ms']:>10.1f}"
+            f" {stats['p95_ms']:>9.1f} {tokens:>9}"
+        )
+
+    if summary["matches"]:
+        lines.append("")
+        lines.append(
+            f"{'match':<8} {'runs':>6} {'mean ms':>10} {'model calls':>12} {'tool calls':>11} {'tool ms':>10}"
+            f" {'tokens':>9} {'state bytes':>12}"
+        )
+        for match, stats in summary["matches"].items():
+            lines.append(
+                f"{match:<8} {stats['pipeline_runs']:>6} {stats['pipeline_mean_ms']:>10.1f} {stats['model_calls']:>12}"
+                f" {stats['tool_calls']:>11} {stats['tool_ms']:>10.1f}"
+                f" {stats['input_tokens'] + stats['output_tokens']:>9} {stats['state_bytes']:>12}"
+            )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python -m ryder_cup_prediction.instrumentation TRACE.jsonl")
+    print(format_summary(summarize_file(sys.argv[1])))
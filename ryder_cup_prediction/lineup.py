@@ -0,0 +1,400 @@
+"""
+Captain's singles lineup optimizer.
+
+Singles pairings come from two blind orders: each captain lists their 12
+players by slot, and slot s of one order meets slot s of the other. Against a
+known opponent order, choosing our order assigns our players to theirs. The
+objective, the probability of taking the cup, depends on the whole team-score
+distribution, so it isn't linear in the pairings. `optimize_lineup` finds the
+best of the 12! (~479M) orders without scoring them one by one:
+
+1. The 12x12 head-to-head win/halve/loss matrix is precomputed from strokes
+   gained (`scoring.head_to_head_matrix`).
+2. The order with the most expected points, a linear assignment problem solved
+   with the Hungarian method and then improved by pairwise swaps, is the
+   starting incumbent.
+3. Branch and bound over the split of our players into the first and second
+   half of the order (924 splits of 12). Each half's 720 orders are turned
+   into exact half-point distributions, as in `ryder_cup_prediction.exact`.
+   A split is bounded by pairing every first-half order with the best
+   second-half tail at each score, and skipped when that can't beat the
+   incumbent. Otherwise one matrix product scores all 720 x 720 combinations
+   exactly.
+
+Against an uncertain opponent, pass several opponent orders (for example from
+`sample_orders`), optionally weighted. The objective is then the weighted mean
+cup probability. The bound lets every opponent order pick its own best second
+half, and sampled orders disagree, so it hardly ever skips a split: all 924
+are scored, at about 1.3 s per opponent order on one core (8 orders take
+about 11 s, 16 about 20 s). `workers` spreads the splits over a process pool,
+and `time_limit` returns the best order found so far.
+
+    python -m ryder_cup_prediction.lineup [--opponent-samples 8] [--workers 4] [--time-limit 30]
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from dataclasses import field
+
+import numpy as np
+from ryder_cup_prediction.exact import ExactSinglesEngine
+from ryder_cup_prediction.scoring import DEFAULT_CONFIG
+from ryder_cup_prediction.scoring import ScoringConfig
+from ryder_cup_prediction.scoring import head_to_head_matrix
+from ryder_cup_prediction.simulation import DEFAULT_PAIRINGS
+from ryder_cup_prediction.simulation import DEFAULT_STARTING_SCORE
+from ryder_cup_prediction.simulation import RETAIN_POINTS
+from ryder_cup_prediction.simulation import TEAMS
+
+# Improvements smaller than this are float noise, not a better lineup
+_TOLERANCE = 1e-12
+
+
+@dataclass
+class LineupResult:
+    """Best singles order found by `optimize_lineup`."""
+
+    team: str
+    # Our players by slot
+    order: list
+    # (our player, their player) per slot against the first opponent order
+    pairings: list
+    # Probability of taking the cup (weighted mean over the opponent orders)
+    cup_probability: float
+    # Our expected points from the singles
+    expected_singles_points: float
+    # False if the time limit stopped the search before it proved optimality
+    optimal: bool
+    # Splits of our players into the two halves of the order that the bound couldn't skip
+    splits_searched: int
+    splits_total: int
+    elapsed_s: float
+    opponent_orders: int = 1
+    # Cup probability of the expected-points (Hungarian) order, for comparison
+    initial_cup_probability: float = 0.0
+    pairing_probabilities: list = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        """Returns a JSON-serializable view of the result."""
+        return {
+            "team": self.team,
+            "order": list(self.order),
+            "pairings": [list(pairing) for pairing in self.pairings],
+            "cup_probability": self.cup_probability,
+            "expected_singles_points": self.expected_singles_points,
+            "optimal": self.optimal,
+            "splits_searched": self.splits_searched,
+            "splits_total": self.splits_total,
+            "elapsed_s": self.elapsed_s,
+            "opponent_orders": self.opponent_orders,
+            "initial_cup_probability": self.initial_cup_probability,
+            "pairing_probabilities": list(self.pairing_probabilities),
+        }
+
+
+def sample_orders(players, samples: int, seed: int | None = None) -> list:
+    """Draws `samples` uniformly random slot orders of `players` (a blind opponent)."""
+    players = list(players)
+    rng = np.random.default_rng(seed)
+    return [[players[i] for i in rng.permutation(len(players))] for _ in range(samples)]
+
+
+def _hungarian(cost: np.ndarray) -> np.ndarray:
+    """Solves the square linear assignment problem; returns the column assigned to each row."""
+    n = cost.shape[0]
+    # 1-based potentials formulation, O(n^3)
+    u = np.zeros(n + 1)
+    v = np.zeros(n + 1)
+    row_of_col = np.zeros(n + 1, dtype=np.int64)
+    way = np.zeros(n + 1, dtype=np.int64)
+    for row in range(1, n + 1):
+        row_of_col[0] = row
+        col = 0
+        min_slack = np.full(n + 1, np.inf)
+        used = np.zeros(n + 1, dtype=bool)
+        while row_of_col[col]:
+            used[col] = True
+            current_row = row_of_col[col]
+            slack = cost[current_row - 1] - u[current_row] - v[1:]
+            free = ~used[1:]
+            better = free & (slack < min_slack[1:])
+            min_slack[1:][better] = slack[better]
+            way[1:][better] = col
+            candidates = np.where(free, min_slack[1:], np.inf)
+            next_col = int(np.argmin(candidates)) + 1
+            delta = candidates[next_col - 1]
+            u[row_of_col[used]] += delta
+            v[used] -= delta
+            min_slack[1:][free] -= delta
+            col = next_col
+        while col:
+            previous = way[col]
+            row_of_col[col] = row_of_col[previous]
+            col = previous
+
+    assignment = np.empty(n, dtype=np.int64)
+    for col in range(1, n + 1):
+        assignment[row_of_col[col] - 1] = col - 1
+    return assignment
+
+
+def _convolve_outcomes(partial: np.ndarray, outcome: np.ndarray) -> np.ndarray:
+    """Adds one match to a batch of half-point distributions: (..., L) x (..., 3) -> (..., L + 2)."""
+    size = partial.shape[-1]
+    result = np.zeros(partial.shape[:-1] + (size + 2,))
+    result[..., :size] += partial * outcome[..., 0:1]
+    result[..., 1 : size + 1] += partial * outcome[..., 1:2]
+    result[..., 2:] += partial * outcome[..., 2:3]
+    return result
+
+
+def _cup_probability(poly: np.ndarray, weights: np.ndarray, needed: int, order) -> float:
+    """Weighted cup probability of one order; `poly[m, i, s]` is [loss, halve, win] of player i in slot s."""
+    partial = np.ones((poly.shape[0], 1))
+    for slot, player in enumerate(order):
+        partial = _convolve_outcomes(partial, poly[:, player, slot])
+    return float(weights @ partial[:, max(needed, 0) :].sum(axis=1))
+
+
+def _improve_by_swaps(poly: np.ndarray, weights: np.ndarray, needed: int, order: list) -> tuple:
+    """Swaps pairs of slots while that raises the cup probability; returns (order, value)."""
+    order = list(order)
+    value = _cup_probability(poly, weights, needed, order)
+    improved = True
+    while improved:
+        improved = False
+        for a, b in itertools.combinations(range(len(order)), 2):
+            order[a], order[b] = order[b], order[a]
+            candidate = _cup_probability(poly, weights, needed, order)
+            if candidate > value + _TOLERANCE:
+                value, improved = candidate, True
+            else:
+                order[a], order[b] = order[b], order[a]
+    return order, value
+
+
+def _permutations(size: int) -> np.ndarray:
+    if size == 0:
+        # The one empty order; reshape(-1, 0) can't infer the row count
+        return np.zeros((1, 0), dtype=np.int64)
+    return np.array(list(itertools.permutations(range(size))), dtype=np.int64).reshape(-1, size)
+
+
+def _half_distributions(poly: np.ndarray, players, slots, permutations: np.ndarray) -> np.ndarray:
+    """Half-point distributions of every order of `players` in `slots`: shape (M, orders, 2 * len(slots) + 1)."""
+    players = np.asarray(players, dtype=np.int64)
+    distributions = np.ones((poly.shape[0], len(permutations), 1))
+    for position, slot in enumerate(slots):
+        distributions = _convolve_outcomes(distributions, poly[:, players[permutations[:, position]], slot])
+    return distributions
+
+
+def _search_splits(poly, weights, needed, splits, best_value, deadline) -> tuple:
+    """
+    Scores every order of the first-half player sets in `splits` (also the process-pool entry point).
+
+    Returns:
+        tuple: (best value, best order or None if nothing beat `best_value`, splits searched, timed out).
+    """
+    n = poly.shape[1]
+    half = n // 2
+    first_permutations = _permutations(half)
+    second_permutations = _permutations(n - half)
+    best_order = None
+    searched = 0
+
+    for first in splits:
+        if deadline is not None and time.monotonic() > deadline:
+            return best_value, best_order, searched, True
+        second = [player for player in range(n) if player not in first]
+        first_half = _half_distributions(poly, first, range(half), first_permutations)
+        second_half = _half_distributions(poly, second, range(half, n), second_permutations)
+
+        # tail[m, b, k] = P(second-half order b earns >= needed - k half points), so the cup
+        # probability of orders (a, b) is the sum over m and k of weights * first_half[m, a, k] * tail[m, b, k]
+        survival = np.cumsum(second_half[..., ::-1], axis=-1)[..., ::-1]
+        survival = np.concatenate([survival, np.zeros(survival.shape[:-1] + (1,))], axis=-1)
+        tail = survival[..., np.clip(needed - np.arange(first_half.shape[-1]), 0, survival.shape[-1] - 1)]
+
+        weighted = weights[:, None, None] * first_half
+        bound = np.einsum("mak,mk->a", weighted, tail.max(axis=1)).max()
+        if bound <= best_value + _TOLERANCE:
+            continue
+        searched += 1
+
+        # Every combination of the two halves in one (orders_a, M * K) @ (M * K, orders_b) product
+        left = weighted.transpose(1, 0, 2).reshape(len(first_permutations), -1)
+        right = tail.transpose(0, 2, 1).reshape(-1, len(second_permutations))
+        values = left @ right
+        a, b = np.unravel_index(int(values.argmax()), values.shape)
+        if values[a, b] > best_value + _TOLERANCE:
+            best_value = float(values[a, b])
+            best_order = [first[i] for i in first_permutations[a]] + [second[i] for i in second_permutations[b]]
+    return best_value, best_order, searched, False
+
+
+def optimize_lineup(
+    our_players: dict,
+    their_players: dict,
+    starting_score: dict,
+    team: str = "Europe",
+    holder: str = "Europe",
+    opponent_orders=None,
+    weights=None,
+    config: ScoringConfig = DEFAULT_CONFIG,
+    matrix=None,
+    workers: int | None = None,
+    time_limit: float | None = None,
+) -> LineupResult:
+    """
+    Finds the singles order that maximizes our probability of taking the cup.
+
+    Args:
+        our_players: Our player name -> strokes-gained data (DataGolf shape).
+        their_players: Opponent player name -> strokes-gained data; its order is
+                       the opponent's slot order unless `opponent_orders` is given.
+        starting_score: Points after Saturday, e.g. {"USA": 4.5, "Europe": 11.5}.
+        team: The side we pick the order for, "Europe" or "USA".
+        holder: The team holding the cup; it needs 14 points, the other side 14.5.
+        opponent_orders: Opponent slot orders (lists of their player names) to
+                         optimize against, e.g. from `sample_orders`. Each one adds
+                         about 1.3 s of single-core search.
+        weights: Probability of each opponent order (uniform by default).
+        config: Scoring parameters of the head-to-head probabilities.
+        matrix: Precomputed (ours x theirs x [win, halve, loss]) probabilities,
+                in the order of `our_players` and `their_players`.
+        workers: Spread the splits over a process pool of this size.
+        time_limit: Seconds after which the best order found so far is returned.
+
+    Returns:
+        LineupResult: The order, its pairings and cup probability, and search statistics.
+    """
+    if team not in TEAMS or holder not in TEAMS:
+        raise ValueError(f"Teams must be one of {TEAMS}")
+    started = time.perf_counter()
+    deadline = time.monotonic() + time_limit if time_limit is not None else None
+
+    our_names = list(our_players)
+    their_names = list(their_players)
+    n = len(our_names)
+    if n == 0 or len(their_names) != n:
+        raise ValueError(f"Both sides need the same, non-zero number of players, got {n} and {len(their_names)}")
+    if matrix is None:
+        matrix = head_to_head_matrix(list(our_players.values()), list(their_players.values()), config)
+    matrix = np.asarray(matrix, dtype=np.float64)
+
+    orders = [their_names] if opponent_orders is None else [list(order) for order in opponent_orders]
+    weights = np.full(len(orders), 1.0 / len(orders)) if weights is None else np.asarray(weights, dtype=np.float64)
+    weights = weights / weights.sum()
+    their_index = {name: j for j, name in enumerate(their_names)}
+    columns = np.array([[their_index[name] for name in order] for order in orders])
+
+    # poly[m, i, s]: [loss, halve, win] of our player i against the player in slot s of order m
+    poly = matrix[:, columns, ::-1].transpose(1, 0, 2, 3)
+
+    target = RETAIN_POINTS if team == holder else RETAIN_POINTS + 0.5
+    needed = math.ceil(round(2 * (target - starting_score[team]), 9))
+
+    expected = (weights[:, None, None] * (poly[..., 2] + poly[..., 1] / 2)).sum(axis=0)
+    initial = [int(player) for player in np.argsort(_hungarian(-expected))]
+    initial_value = _cup_probability(poly, weights, needed, initial)
+    best_order, best_value = _improve_by_swaps(poly, weights, needed, initial)
+
+    splits = [list(first) for first in itertools.combinations(range(n), n // 2)]
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_search_splits, poly, weights, needed, splits[i::workers], best_value, deadline)
+                for i in range(workers)
+            ]
+            results = [future.result() for future in futures]
+    else:
+        results = [_search_splits(poly, weights, needed, splits, best_value, deadline)]
+    for value, order, _, _ in results:
+        if order is not None and value > best_value + _TOLERANCE:
+            best_order, best_value = order, value
+
+    # Report through the exact engine, which takes [Europe win, halve, USA win] rows
+    outlooks = [
+        ExactSinglesEngine(
+            matrix[best_order, order_columns] if team == "Europe" else matrix[best_order, order_columns, ::-1],
+            starting_score,
+            holder,
+        ).distribution()
+        for order_columns in columns
+    ]
+    slot_points = (poly[..., 2] + poly[..., 1] / 2)[:, best_order, np.arange(n)]
+    return LineupResult(
+        team=team,
+        order=[our_names[player] for player in best_order],
+        pairings=[(our_names[player], orders[0][slot]) for slot, player in enumerate(best_order)],
+        cup_probability=float(sum(w * outlook.clinch_probability(team) for w, outlook in zip(weights, outlooks))),
+        expected_singles_points=float(weights @ slot_points.sum(axis=1)),
+        optimal=not any(timed_out for _, _, _, timed_out in results),
+        splits_searched=sum(searched for _, _, searched, _ in results),
+        splits_total=len(splits),
+        elapsed_s=round(time.perf_counter() - started, 4),
+        opponent_orders=len(orders),
+        initial_cup_probability=initial_value,
+        pairing_probabilities=[[round(float(p), 4) for p in row] for row in matrix[best_order, columns[0]]],
+    )
+
+
+def main():
+    # Read the roster without touching the server's on-disk cache
+    os.environ.setdefault("DATAGOLF_CACHE_PATH", "")
+    from mcp_servers.datagolf_server import load_players
+
+    parser = argparse.ArgumentParser(description="Optimize the singles order of the default 2025 card.")
+    parser.add_argument("--team", choices=TEAMS, default="Europe", help="Side to pick the order for.")
+    parser.add_argument(
+        "--opponent-samples", type=int, default=0, help="Optimize against this many random orders (~1.3 s each)."
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the sampled opponent orders.")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size for the search.")
+    parser.add_argument("--time-limit", type=float, default=None, help="Stop after this many seconds.")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON.")
+    args = parser.parse_args()
+
+    ours, theirs = (0, 1) if args.team == "Europe" else (1, 0)
+    try:
+        players = load_players(name for pairing in DEFAULT_PAIRINGS for name in pairing)
+    except ValueError as error:
+        parser.error(str(error))
+    our_players = {pairing[ours]: players[pairing[ours]] for pairing in DEFAULT_PAIRINGS}
+    their_players = {pairing[theirs]: players[pairing[theirs]] for pairing in DEFAULT_PAIRINGS}
+    opponent_orders = sample_orders(their_players, args.opponent_samples, args.seed) if args.opponent_samples else None
+
+    result = optimize_lineup(
+        our_players,
+        their_players,
+        DEFAULT_STARTING_SCORE,
+        team=args.team,
+        opponent_orders=opponent_orders,
+        workers=args.workers,
+        time_limit=args.time_limit,
+    )
+    if args.json:
+        print(json.dumps(result.to_dict(), indent=2))
+        return
+
+    print(
+        f"{result.team} cup probability {result.cup_probability:.4f}"
+        f" (expected-points order {result.initial_cup_probability:.4f}),"
+        f" {'optimal' if result.optimal else 'time limit reached'} after"
+        f" {result.splits_searched}/{result.splits_total} splits in {result.elapsed_s:.2f} s"
+    )
+    for slot, ((our_name, their_name), probabilities) in enumerate(
+        zip(result.pairings, result.pairing_probabilities), start=1
+    ):
+        print(f"  Match {slot:>2}: {our_name:<20} vs {their_name:<20} win/halve/loss {probabilities}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+"""
+Live in-play re-prediction of the Sunday singles from hole-by-hole results.
+
+No model is called once play starts. Each match's pre-match [europe_win,
+halve, usa_win] probabilities are turned into per-hole probabilities with
+the same halve rate and the same Europe share of decided holes. The halve rate
+of an 18-hole match falls as fewer holes are halved, and Europe's share of the
+decided matches rises with its share of the decided holes, so a nested
+bisection finds both. Halve rates below what the model gives with 90% of
+holes decided (about 10% for an even match, less for a lopsided one) are
+clamped to that floor.
+
+Backward induction over (holes remaining, holes up) then gives a state table
+per match:
+
+    table[holes_remaining, europe_holes_up + holes] = [europe_win, halve, usa_win]
+
+A hole result moves one match to a new state. `LiveCard.apply` looks up that
+match's row, updates its leaf in an `ExactSinglesEngine` (log2(12) polynomial
+products) and reads the cup probabilities from the new exact distribution, in
+well under a millisecond.
+
+Hole results come from a feed of events like
+
+    {"match": 4, "hole": 7, "result": "Europe"}   # or "USA" / "halved"
+
+either appended to a JSONL file (`tail_jsonl`) or put on an asyncio queue
+(`queue_events`), and `run_live` turns them into cup updates:
+
+    card = LiveCard(match_probabilities, starting_score={"USA": 4.5, "Europe": 11.5})
+    async for update in run_live(card, tail_jsonl("holes.jsonl")):
+        print(update["status"], update["win_probability"])
+
+    python -m ryder_cup_prediction.live holes.jsonl [--follow] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import AsyncGenerator
+from typing import AsyncIterable
+
+import numpy as np
+from ryder_cup_prediction.exact import OUTCOMES
+from ryder_cup_prediction.exact import ExactSinglesEngine
+from ryder_cup_prediction.scoring import DEFAULT_CONFIG
+from ryder_cup_prediction.scoring import ScoringConfig
+from ryder_cup_prediction.scoring import score_matchup
+from ryder_cup_prediction.simulation import DEFAULT_PAIRINGS
+from ryder_cup_prediction.simulation import DEFAULT_STARTING_SCORE
+from ryder_cup_prediction.simulation import TEAMS
+from ryder_cup_prediction.simulation import probabilities_to_array
+
+logger = logging.getLogger(__name__)
+
+HOLES = 18
+
+# Range of the per-hole probability that a hole is won by either side. Within
+# it the match halve rate falls monotonically; close to 1 it rises again,
+# because an even number of decided holes can then only end all square.
+_DECIDED_RANGE = (0.05, 0.9)
+_BISECTION_STEPS = 32
+
+
+def state_tables(hole_probabilities, holes: int = HOLES) -> np.ndarray:
+    """
+    Computes the outcome probabilities of every match-play state by backward induction.
+
+    Args:
+        hole_probabilities: Per-match [europe_wins_hole, hole_halved, usa_wins_hole] rows.
+        holes: Holes in a match.
+
+    Returns:
+        np.ndarray: Array of shape (n_matches, holes + 1, 2 * holes + 1, 3) where
+                    [m, r, holes + up] holds [europe_win, halve, usa_win] of match m
+                    with r holes remaining and Europe `up` holes up (negative if down).
+    """
+    hole_probabilities = np.asarray(hole_probabilities, dtype=np.float64).reshape(-1, 3)
+    n_matches = hole_probabilities.shape[0]
+    up = np.arange(-holes, holes + 1)
+    # Result of a match that is over: decided by the sign of the margin
+    closed = np.stack([up > 0, up == 0, up < 0], axis=-1).astype(np.float64)
+
+    europe, halve, usa = (hole_probabilities[:, i, None, None] for i in range(3))
+    tables = np.empty((n_matches, holes + 1, 2 * holes + 1, 3))
+    tables[:, 0] = closed
+    for remaining in range(1, holes + 1):
+        previous = tables[:, remaining - 1]
+        current = np.broadcast_to(closed, previous.shape).copy()
+        current[:, 1:-1] = europe * previous[:, 2:] + halve * previous[:, 1:-1] + usa * previous[:, :-2]
+        # A side more holes up than remain has won; the match stops there
+        current[:, np.abs(up) > remaining] = closed[np.abs(up) > remaining]
+        tables[:, remaining] = current
+    return tables
+
+
+def _pre_match(decided: np.ndarray, europe_share: np.ndarray, holes: int) -> np.ndarray:
+    """Pre-match [europe_win, halve, usa_win] of the hole model, one row per match."""
+    hole_probabilities = np.stack([decided * europe_share, 1 - decided, decided * (1 - europe_share)], axis=-1)
+    return state_tables(hole_probabilities, holes)[:, holes, holes]
+
+
+def calibrate_hole_probabilities(match_probabilities, holes: int = HOLES) -> np.ndarray:
+    """
+    Finds per-hole probabilities that reproduce each match's pre-match probabilities.
+
+    Args:
+        match_probabilities: Per-match [europe_win, halve, usa_win] probabilities,
+                             see `probabilities_to_array`.
+        holes: Holes in a match.
+
+    Returns:
+        np.ndarray: Per-match [europe_wins_hole, hole_halved, usa_wins_hole] rows.
+    """
+    rows = probabilities_to_array(match_probabilities)
+    target_share = rows[:, 0] / np.maximum(rows[:, 0] + rows[:, 2], 1e-12)
+    target_halve = rows[:, 1]
+
+    def europe_share_for(decided):
+        # Europe's share of the decided matches rises with its share of the decided holes
+        low, high = np.zeros_like(decided), np.ones_like(decided)
+        for _ in range(_BISECTION_STEPS):
+            middle = (low + high) / 2
+            outcome = _pre_match(decided, middle, holes)
+            share = outcome[:, 0] / np.maximum(outcome[:, 0] + outcome[:, 2], 1e-12)
+            below = share < target_share
+            low, high = np.where(below, middle, low), np.where(below, high, middle)
+        return (low + high) / 2
+
+    # The halve rate falls as more holes are decided
+    low = np.full(len(rows), _DECIDED_RANGE[0])
+    high = np.full(len(rows), _DECIDED_RANGE[1])
+    for _ in range(_BISECTION_STEPS):
+        middle = (low + high) / 2
+        halve = _pre_match(middle, europe_share_for(middle), holes)[:, 1]
+        too_many_halves = halve > target_halve
+        low, high = np.where(too_many_halves, middle, low), np.where(too_many_halves, high, middle)
+    decided = (low + high) / 2
+    europe_share = europe_share_for(decided)
+    return np.stack([decided * europe_share, 1 - decided, decided * (1 - europe_share)], axis=-1)
+
+
+@dataclass
+class MatchState:
+    """Match-play state of one singles match."""
+
+    match: int
+    europe_player: str = ""
+    usa_player: str = ""
+    holes_played: int = 0
+    # Holes up for Europe, negative when USA is up
+    europe_up: int = 0
+    holes: int = HOLES
+
+    @property
+    def holes_remaining(self) -> int:
+        return self.holes - self.holes_played
+
+    @property
+    def finished(self) -> bool:
+        return abs(self.europe_up) > self.holes_remaining or self.holes_remaining == 0
+
+    def status(self) -> str:
+        """Match-play notation, e.g. "Europe 2 UP thru 7", "USA wins 3&2" or "Halved"."""
+        leader = "Europe" if self.europe_up > 0 else "USA"
+        margin = abs(self.europe_up)
+        if self.finished:
+            if margin == 0:
+                return "Halved"
+            if self.holes_remaining == 0:
+                return f"{leader} wins {margin} UP"
+            return f"{leader} wins {margin}&{self.holes_remaining}"
+        if margin == 0:
+            return f"AS thru {self.holes_played}" if self.holes_played else "Not started"
+        return f"{leader} {margin} UP thru {self.holes_played}"
+
+
+class LiveCard:
+    """
+    Match-play states of the singles card, with cup probabilities kept up to date per hole.
+
+    Match numbers are 1-based, like the `Match n` pairings of the card.
+    """
+
+    def __init__(
+        self,
+        match_probabilities,
+        starting_score: dict,
+        holder: str = "Europe",
+        pairings: list | None = None,
+        holes: int = HOLES,
+    ):
+        """
+        Args:
+            match_probabilities: Pre-match [europe_win, halve, usa_win] probabilities,
+                                 see `probabilities_to_array`.
+            starting_score: Points after Saturday, e.g. {"USA": 4.5, "Europe": 11.5}.
+            holder: The team holding the cup, which retains it on a 14-14 tie.
+            pairings: Optional (Europe player, USA player) per match, for the updates.
+            holes: Holes in a match.
+        """
+        rows = probabilities_to_array(match_probabilities)
+        self.holes = holes
+        self.hole_probabilities = calibrate_hole_probabilities(rows, holes)
+        self.tables = state_tables(self.hole_probabilities, holes)
+        pairings = pairings or [("", "")] * len(rows)
+        self.states = [
+            MatchState(match=i + 1, europe_player=europe, usa_player=usa, holes=holes)
+            for i, (europe, usa) in enumerate(pairings)
+        ]
+        # Start from the hole model's own pre-match row, so each hole moves along one table
+        self.engine = ExactSinglesEngine(self.tables[:, holes, holes], starting_score, holder)
+
+    @property
+    def finished(self) -> bool:
+        return all(state.finished for state in self.states)
+
+    def _row(self, state: MatchState) -> np.ndarray:
+        return self.tables[state.match - 1, state.holes_remaining, state.europe_up + self.holes]
+
+    def apply(self, event: dict) -> dict | None:
+        """
+        Applies one hole result and returns the updated cup probabilities.
+
+        Args:
+            event: {"match": 1-based match number, "hole": 1-based hole number,
+                    "result": "Europe", "USA" or "halved"}.
+
+        Returns:
+            dict | None: The update (see `snapshot`), or None for a repeated hole or a
+                         hole of a match that is already over.
+
+        Raises:
+            ValueError: For an unknown match or result, or a hole played out of order.
+        """
+        started = time.perf_counter()
+        match_number = int(event["match"])
+        if not 1 <= match_number <= len(self.states):
+            raise ValueError(f"Unknown match: {match_number}, the card has {len(self.states)} matches")
+        result = event["result"]
+        if result not in OUTCOMES:
+            raise ValueError(f"Unknown hole result: {result!r}, expected one of {sorted(OUTCOMES)}")
+
+        state = self.states[match_number - 1]
+        hole = int(event["hole"])
+        if hole <= state.holes_played or state.finished:
+            return None
+        if hole != state.holes_played + 1:
+            raise ValueError(f"Match {match_number}: hole {hole} reported after hole {state.holes_played}")
+
+        state.holes_played = hole
+        state.europe_up += {"Europe": 1, "halved": 0, "USA": -1}[result]
+        self.engine.update(match_number, self._row(state))
+        update = self.snapshot(match_number)
+        update["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        return update
+
+    def snapshot(self, match_number: int | None = None) -> dict:
+        """
+        Returns the current cup probabilities.
+
+        Args:
+            match_number: Also report this match's state and probabilities.
+
+        Returns:
+            dict: Win, retain and tie probabilities and expected points of the cup,
+                  plus `match`, `status`, the players and `match_probabilities` of
+                  the given match.
+        """
+        distribution = self.engine.distribution()
+        europe_points = float(distribution.europe_totals() @ distribution.half_point_probs)
+        total_points = sum(distribution.starting_score.values()) + distribution.n_matches
+        win = distribution.win_probability()
+        tie = distribution.tie_probability()
+        snapshot = {}
+        if match_number is not None:
+            state = self.states[match_number - 1]
+            europe_win, halve, usa_win = (round(float(p), 4) for p in self._row(state))
+            snapshot = {
+                "match": match_number,
+                "europe_player": state.europe_player,
+                "usa_player": state.usa_player,
+                "hole": state.holes_played,
+                "status": state.status(),
+                "match_probabilities": {"europe_win_prob": europe_win, "tie_prob": halve, "usa_win_prob": usa_win},
+            }
+        snapshot.update(
+            {
+                "win_probability": {team: round(p, 4) for team, p in win.items()},
+                "retain_probability": round(win[distribution.holder] + tie, 4),
+                "tie_probability": round(tie, 4),
+                "expected_points": {
+                    "Europe": round(europe_points, 3),
+                    "USA": round(total_points - europe_points, 3),
+                },
+                "matches_finished": sum(state.finished for state in self.states),
+            }
+        )
+        return snapshot
+
+
+async def tail_jsonl(path: str, poll_interval: float = 0.05, follow: bool = True) -> AsyncGenerator[dict, None]:
+    """
+    Yields the hole events of a JSONL file, waiting for new lines as they are appended.
+
+    Args:
+        path: File with one JSON event per line.
+        poll_interval: Seconds between checks for new lines.
+        follow: Keep waiting at the end of the file; otherwise stop there.
+    """
+    with open(path) as feed:
+        pending = ""
+        while True:
+            line = feed.readline()
+            if not line:
+                if not follow:
+                    return
+                await asyncio.sleep(poll_interval)
+                continue
+            # A line without its newline is still being written
+            pending += line
+            if not pending.endswith("\n"):
+                continue
+            text, pending = pending.strip(), ""
+            if not text:
+                continue
+            try:
+                yield json.loads(text)
+            except json.JSONDecodeError:
+                logger.warning("Skipping malformed hole event: %s", text)
+
+
+async def queue_events(queue: asyncio.Queue) -> AsyncGenerator[dict, None]:
+    """Yields the hole events put on `queue` until a None sentinel."""
+    while True:
+        event = await queue.get()
+        if event is None:
+            return
+        yield event
+
+
+async def run_live(card: LiveCard, events: AsyncIterable[dict]) -> AsyncGenerator[dict, None]:
+    """
+    Applies a stream of hole events to the card and yields an update per hole.
+
+    Invalid events are logged and skipped. The stream ends when every match is over.
+
+    Args:
+        card: The card to update.
+        events: Hole events, e.g. from `tail_jsonl` or `queue_events`.
+    """
+    async for event in events:
+        try:
+            update = card.apply(event)
+        except (KeyError, TypeError, ValueError) as error:
+            logger.warning("Skipping hole event %s: %s", event, error)
+            continue
+        if update is not None:
+            yield update
+        if card.finished:
+            return
+
+
+def numeric_match_probabilities(pairings: list, players: dict, config: ScoringConfig = DEFAULT_CONFIG) -> list:
+    """
+    Scores each pairing with `scoring.score_matchup`, without any model call.
+
+    Args:
+        pairings: (Europe player, USA player) per match.
+        players: Player name -> strokes-gained data.
+        config: Scoring parameters.
+
+    Returns:
+        list: [europe_win, halve, usa_win] rows.
+    """
+    rows = []
+    for europe_player, usa_player in pairings:
+        scored = score_matchup(players[europe_player], players[usa_player], config)
+        rows.append([scored["player_A_win_prob"], scored["tie_prob"], scored["player_B_win_prob"]])
+    return rows
+
+
+def _format_update(update: dict) -> str:
+    match = update["match_probabilities"]
+    win = update["win_probability"]
+    return (
+        f"Match {update['match']:>2} {update['status']:<22}"
+        f" match {match['europe_win_prob']:.3f}/{match['tie_prob']:.3f}/{match['usa_win_prob']:.3f}"
+        f" | cup Europe {win['Europe']:.4f} USA {win['USA']:.4f} retain {update['retain_probability']:.4f}"
+        f" | {update['latency_ms']:.3f} ms"
+    )
+
+
+async def _follow(card: LiveCard, events: AsyncIterable[dict], as_json: bool):
+    async for update in run_live(card, events):
+        print(json.dumps(update) if as_json else _format_update(update), flush=True)
+
+
+def main():
+    # Read the roster without touching the server's on-disk cache
+    os.environ.setdefault("DATAGOLF_CACHE_PATH", "")
+    from mcp_servers.datagolf_server import load_players
+
+    parser = argparse.ArgumentParser(description="Update the default 2025 singles card's cup odds hole by hole.")
+    parser.add_argument("feed", help='JSONL file of hole events: {"match": 4, "hole": 7, "result": "Europe"}.')
+    parser.add_argument("--follow", action="store_true", help="Keep waiting for new events at the end of the file.")
+    parser.add_argument(
+        "--probabilities", help="JSON file of pre-match probability rows (default: numeric scoring of the card)."
+    )
+    parser.add_argument("--holder", choices=TEAMS, default="Europe", help="Team holding the cup.")
+    parser.add_argument("--json", action="store_true", help="Print each update as JSON.")
+    args = parser.parse_args()
+
+    if args.probabilities:
+        with open(args.probabilities) as f:
+            match_probabilities = json.load(f)
+    else:
+        try:
+            players = load_players(name for pairing in DEFAULT_PAIRINGS for name in pairing)
+        except ValueError as error:
+            parser.error(str(error))
+        match_probabilities = numeric_match_probabilities(DEFAULT_PAIRINGS, players)
+
+    card = LiveCard(match_probabilities, DEFAULT_STARTING_SCORE, holder=args.holder, pairings=DEFAULT_PAIRINGS)
+    if not args.json:
+        pre_match = card.snapshot()["win_probability"]
+        print(f"Pre-match cup: Europe {pre_match['Europe']:.4f} USA {pre_match['USA']:.4f}")
+    asyncio.run(_follow(card, tail_jsonl(args.feed, follow=args.follow), args.json))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Opt-in, content-addressed cache of LLM responses for the pipeline stages.
+
+Re-running the same card repeats identical model calls: same model, same
+instruction (with the same session.state values injected), same tool results.
+The cache keys every request by a hash of exactly those inputs and stores the
+response in a local SQLite file, so a repeated or partially changed run only
+calls the model for stages whose inputs actually changed.
+
+It plugs into the agents through ADK's before/after model callbacks:
+
+    cache = LlmResponseCache()
+    cache.install(root_agent)
+
+or set RYDER_CUP_LLM_CACHE to a file path and `create_agent()` installs it.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest
+from google.adk.models import LlmResponse
+from pydantic import BaseModel
+from pydantic import TypeAdapter
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "rydercup_prediction", "llm_cache.sqlite3")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Requests awaiting their response; a failed call leaves its entry until it is pushed out
+DEFAULT_MAX_PENDING = 1024
+
+# Bump when the key derivation changes so stale entries are never served
+_KEY_VERSION = 2
+
+# Config fields that can hold a pydantic class (an agent's output_schema), which model_dump can't serialize
+_SCHEMA_FIELDS = ("response_schema", "response_json_schema")
+
+
+def _strip_call_ids(value):
+    """Drops the per-run ids ADK assigns to function calls and responses, which would defeat the cache."""
+    if isinstance(value, dict):
+        return {
+            key: (
+                {field: _strip_call_ids(item) for field, item in child.items() if field != "id"}
+                if key in ("function_call", "function_response") and isinstance(child, dict)
+                else _strip_call_ids(child)
+            )
+            for key, child in value.items()
+        }
+    if isinstance(value, list):
+        return [_strip_call_ids(item) for item in value]
+    return value
+
+
+def _schema_json(schema):
+    """JSON view of a response schema: a `types.Schema`, a JSON schema dict, or a type such as a pydantic class."""
+    if isinstance(schema, BaseModel):
+        return schema.model_dump(mode="json", exclude_none=True)
+    if isinstance(schema, dict):
+        return schema
+    # Pydantic classes, `list[Model]`, enums and the like
+    return TypeAdapter(schema).json_schema()
+
+
+def request_key(llm_request: LlmRequest) -> str:
+    """
+    Returns the content hash of a model request.
+
+    The key covers the model name, the system instruction (with session.state
+    already injected), the full conversation including tool calls and tool
+    results, the tool declarations and the generation config, including the
+    JSON schema of a structured response.
+    """
+    config = llm_request.config
+    schemas = {field: _schema_json(getattr(config, field)) for field in _SCHEMA_FIELDS if getattr(config, field, None)}
+    payload = {
+        "version": _KEY_VERSION,
+        "model": llm_request.model,
+        "contents": [content.model_dump(mode="json", exclude_none=True) for content in llm_request.contents],
+        "config": config.model_dump(mode="json", exclude_none=True, exclude=set(_SCHEMA_FIELDS)) if config else None,
+        "schemas": schemas,
+    }
+    encoded = json.dumps(_strip_call_ids(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class LlmResponseCache:
+    """SQLite-backed LLM response cache with least-recently-used, size-bounded eviction."""
+
+    def __init__(
+        self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES, max_pending: int = DEFAULT_MAX_PENDING
+    ):
+        """
+        Args:
+            path: SQLite file holding the cached responses.
+            max_bytes: Total size of stored responses above which the least recently
+                       used entries are evicted.
+            max_pending: Model calls in flight whose request keys are kept to store the
+                         response under. Agents have no model-error callback, so the
+                         keys of failed calls are dropped oldest first past this size.
+        """
+        self.path = os.path.expanduser(path)
+        self.max_bytes = max_bytes
+        self.max_pending = max_pending
+        self.hits = 0
+        self.misses = 0
+
+        # Key of the request each agent is waiting on, to store the response under, oldest first
+        self._pending = OrderedDict()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        # Running total of the stored bytes, so a write doesn't scan the table (counted at open,
+        # then this process's writes: other processes sharing the file are seen on the next open)
+        self._bytes = self._stored_bytes()
+
+    def before_model_callback(self, callback_context: CallbackContext, llm_request: LlmRequest):
+        """Serves the cached response for an identical request, skipping the model call."""
+        key = request_key(llm_request)
+        row = self._db.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            pending_key = (callback_context.invocation_id, callback_context.agent_name)
+            # A retry of the agent's call replaces the entry of its failed attempt
+            self._pending.pop(pending_key, None)
+            self._pending[pending_key] = key
+            while len(self._pending) > self.max_pending:
+                self._pending.popitem(last=False)
+            return None
+
+        self.hits += 1
+        self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        response = LlmResponse.model_validate_json(row[0])
+        response.custom_metadata = {**(response.custom_metadata or {}), "llm_cache": "hit"}
+        return response
+
+    def after_model_callback(self, callback_context: CallbackContext, llm_response: LlmResponse):
+        """Stores complete, successful responses under the key of their request."""
+        key = self._pending.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        if key is None or llm_response.partial or llm_response.error_code or not llm_response.content:
+            return None
+
+        encoded = json.dumps(_strip_call_ids(llm_response.model_dump(mode="json", exclude_none=True)))
+        replaced = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses (key, response, size, last_access) VALUES (?, ?, ?, ?)",
+            (key, encoded, len(encoded), time.time()),
+        )
+        self._bytes += len(encoded) - (replaced[0] if replaced else 0)
+        if self._bytes > self.max_bytes:
+            self._evict()
+        return None
+
+    def install(self, agent):
+        """Adds the cache callbacks to `agent` and every LlmAgent below it, keeping existing callbacks."""
+        if isinstance(agent, LlmAgent):
+            agent.before_model_callback = _prepend(self.before_model_callback, agent.before_model_callback)
+            agent.after_model_callback = _prepend(self.after_model_callback, agent.after_model_callback)
+        for sub_agent in agent.sub_agents:
+            self.install(sub_agent)
+        return agent
+
+    def stats(self) -> dict:
+        entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size, "path": self.path}
+
+    def clear(self):
+        self._db.execute("DELETE FROM responses")
+        self._bytes = 0
+
+    def _stored_bytes(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _evict(self):
+        total = self._bytes
+        # Walk from the least recently used entry until enough bytes are freed
+        freed, cutoff = 0, None
+        for last_access, size in self._db.execute("SELECT last_access, size FROM responses ORDER BY last_access"):
+            freed += size
+            cutoff = last_access
+            if total - freed <= self.max_bytes:
+                break
+        self._db.execute("DELETE FROM responses WHERE last_access <= ?", (cutoff,))
+        self._bytes = total - freed
+
+
+def _prepend(callback, existing):
+    """Runs `callback` before the agent's existing callback(s)."""
+    if existing is None:
+        return callback
+    if isinstance(existing, list):
+        return [callback, *existing]
+    return [callback, existing]
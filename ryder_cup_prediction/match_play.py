@@ -0,0 +1,334 @@
+"""
+Vectorized hole-by-hole match-play simulator driven by category strokes gained.
+
+`scoring.score_matchup` maps the total strokes-gained gap straight to match
+probabilities. This module plays the matches hole by hole instead, so the
+category breakdown matters:
+
+1. Each player's score on a hole, relative to par, starts from a tour-average
+   distribution (`TOUR_HOLE_SCORES`). Approach and putting strokes gained turn
+   pars into birdies, off-the-tee and around-the-green strokes gained turn
+   bogeys into pars, each at 1/18 of the per-round value per hole. The mean
+   per-hole score then moves by exactly total_sg / 18, but a birdie-making
+   player has more decided holes than a bogey-avoiding one of the same total.
+2. Two players' scores give the hole differential distribution and so the
+   probabilities of winning, halving or losing a hole.
+3. Matches are drawn as (matches x simulations x 18) arrays. A cumulative
+   sum of the hole results gives the margin after every hole, and the first
+   hole where the leader is up by more holes than remain ends the match
+   (3&2, dormie, ...).
+
+Besides win/halve/loss, each match reports its margin-of-victory distribution
+and the mean number of holes played.
+
+    python -m ryder_cup_prediction.match_play [--simulations 100000] [--seed 0]
+"""
+
+import argparse
+import json
+import os
+import time
+from dataclasses import dataclass
+from dataclasses import field
+
+import numpy as np
+from ryder_cup_prediction.scoring import BASELINE_WINDOW
+from ryder_cup_prediction.scoring import DEFAULT_CONFIG
+from ryder_cup_prediction.scoring import FORM_WINDOW
+from ryder_cup_prediction.scoring import SG_CATEGORIES
+from ryder_cup_prediction.scoring import ScoringConfig
+from ryder_cup_prediction.simulation import DEFAULT_NUM_SIMULATIONS
+from ryder_cup_prediction.simulation import DEFAULT_PAIRINGS
+
+HOLES = 18
+
+# Tour-average score per hole relative to par: eagle, birdie, par, bogey, double bogey or worse
+TOUR_HOLE_SCORES = np.array([0.01, 0.19, 0.62, 0.15, 0.03])
+SCORES_TO_PAR = np.arange(-2, 3)
+
+# Categories that make birdies and categories that save pars
+BIRDIE_CATEGORIES = ("approach", "putting")
+PAR_SAVING_CATEGORIES = ("off_the_tee", "around_the_green")
+
+# Matches x simulations x holes per batch; bounds peak memory at ~30 MB
+DEFAULT_BATCH_SIZE = 16_384
+
+
+@dataclass
+class MatchPlayResult:
+    """Simulated outcome of one singles match, from player A's (Europe's) point of view."""
+
+    player_a: str
+    player_b: str
+    num_simulations: int
+    win_probability: float
+    halve_probability: float
+    loss_probability: float
+    # Per-hole [A wins hole, halved, B wins hole]
+    hole_probabilities: list = field(default_factory=list)
+    # "A 3&2", "B 1 UP", "Halved" -> probability
+    margin_distribution: dict = field(default_factory=dict)
+    expected_holes_played: float = 0.0
+
+    def match_probabilities(self) -> dict:
+        """Returns the probabilities in the `probabilities_to_array` dict shape."""
+        return {
+            "europe_win_prob": self.win_probability,
+            "tie_prob": self.halve_probability,
+            "usa_win_prob": self.loss_probability,
+        }
+
+    def to_dict(self) -> dict:
+        """Returns a JSON-serializable view of the result."""
+        return {
+            "player_A": self.player_a,
+            "player_B": self.player_b,
+            "num_simulations": self.num_simulations,
+            "player_A_win_prob": self.win_probability,
+            "tie_prob": self.halve_probability,
+            "player_B_win_prob": self.loss_probability,
+            "hole_probabilities": list(self.hole_probabilities),
+            "margin_distribution": dict(self.margin_distribution),
+            "expected_holes_played": self.expected_holes_played,
+        }
+
+
+def category_skills(players: list[dict], config: ScoringConfig = DEFAULT_CONFIG) -> np.ndarray:
+    """
+    Blends the 2-year and 3-month category strokes gained of each player.
+
+    Args:
+        players: Strokes-gained data of each player.
+        config: Scoring parameters (`form_weight`).
+
+    Returns:
+        np.ndarray: Array of shape (len(players), 4) in `SG_CATEGORIES` order.
+    """
+    weight = config.form_weight
+    return np.array(
+        [
+            [(1 - weight) * player[BASELINE_WINDOW][c] + weight * player[FORM_WINDOW][c] for c in SG_CATEGORIES]
+            for player in players
+        ],
+        dtype=np.float64,
+    ).reshape(-1, len(SG_CATEGORIES))
+
+
+def hole_score_distribution(players: list[dict], config: ScoringConfig = DEFAULT_CONFIG) -> np.ndarray:
+    """
+    Computes each player's per-hole score distribution.
+
+    Args:
+        players: Strokes-gained data of each player.
+        config: Scoring parameters.
+
+    Returns:
+        np.ndarray: Array of shape (len(players), 5), probabilities of `SCORES_TO_PAR`.
+    """
+    skills = category_skills(players, config)
+    birdies = skills[:, [SG_CATEGORIES.index(c) for c in BIRDIE_CATEGORIES]].sum(axis=1) / HOLES
+    pars_saved = skills[:, [SG_CATEGORIES.index(c) for c in PAR_SAVING_CATEGORIES]].sum(axis=1) / HOLES
+
+    scores = np.tile(TOUR_HOLE_SCORES, (len(skills), 1))
+    scores[:, 1] += birdies
+    scores[:, 2] += pars_saved - birdies
+    scores[:, 3] -= pars_saved
+    # Only far-off-tour strokes gained leave the distribution, which is then clipped
+    scores = np.clip(scores, 0.0, None)
+    return scores / scores.sum(axis=1, keepdims=True)
+
+
+def hole_differential(players_a: list[dict], players_b: list[dict], config: ScoringConfig = DEFAULT_CONFIG):
+    """
+    Computes the per-hole score differential of each A-vs-B pairing.
+
+    Args:
+        players_a: Strokes-gained data of the A players.
+        players_b: Strokes-gained data of their B opponents, pairwise.
+        config: Scoring parameters.
+
+    Returns:
+        np.ndarray: Array of shape (n_pairings, 9): P(B's score - A's score = d) for d = -4..4,
+                    positive d meaning A wins the hole.
+    """
+    scores_a = hole_score_distribution(players_a, config)
+    scores_b = hole_score_distribution(players_b, config)
+    size = len(SCORES_TO_PAR)
+    differential = np.zeros((len(scores_a), 2 * size - 1))
+    for i in range(size):
+        # A scores i, B scores j: d = j - i
+        differential[:, size - 1 - i : 2 * size - 1 - i] += scores_a[:, i, None] * scores_b
+    return differential
+
+
+def hole_outcome_probabilities(players_a: list[dict], players_b: list[dict], config: ScoringConfig = DEFAULT_CONFIG):
+    """
+    Computes [A wins hole, halved, B wins hole] of each pairing.
+
+    Args:
+        players_a: Strokes-gained data of the A players.
+        players_b: Strokes-gained data of their B opponents, pairwise.
+        config: Scoring parameters.
+
+    Returns:
+        np.ndarray: Array of shape (n_pairings, 3).
+    """
+    differential = hole_differential(players_a, players_b, config)
+    middle = differential.shape[1] // 2
+    return np.stack(
+        [differential[:, middle + 1 :].sum(axis=1), differential[:, middle], differential[:, :middle].sum(axis=1)],
+        axis=-1,
+    )
+
+
+def _margin_label(margin: int, holes_left: int, players: tuple) -> str:
+    if margin == 0:
+        return "Halved"
+    winner = players[0] if margin > 0 else players[1]
+    return f"{winner} {abs(margin)} UP" if holes_left == 0 else f"{winner} {abs(margin)}&{holes_left}"
+
+
+def simulate_match_play(
+    hole_probabilities,
+    num_simulations: int = DEFAULT_NUM_SIMULATIONS,
+    seed: int | None = None,
+    holes: int = HOLES,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    pairings: list | None = None,
+) -> list[MatchPlayResult]:
+    """
+    Simulates match-play matches hole by hole, stopping each once it is decided.
+
+    Args:
+        hole_probabilities: Per-match [A wins hole, halved, B wins hole] rows,
+                            e.g. from `hole_outcome_probabilities`.
+        num_simulations: Simulated matches per pairing.
+        seed: Seed for the random generator; the same seed reproduces the run.
+        holes: Holes in a match.
+        batch_size: Simulations drawn per NumPy batch (for all matches at once), bounds peak memory.
+        pairings: Optional (player A, player B) names per match for the results; defaults to A / B.
+
+    Returns:
+        list[MatchPlayResult]: One result per match.
+    """
+    if num_simulations <= 0:
+        raise ValueError("num_simulations must be positive")
+    hole_probabilities = np.asarray(hole_probabilities, dtype=np.float64).reshape(-1, 3)
+    hole_probabilities = hole_probabilities / hole_probabilities.sum(axis=1, keepdims=True)
+    n_matches = hole_probabilities.shape[0]
+    pairings = pairings or [("A", "B")] * n_matches
+
+    # One uniform draw per hole: A wins it below the first threshold, B above the second
+    win_threshold = hole_probabilities[:, 0, None, None].astype(np.float32)
+    loss_threshold = (1 - hole_probabilities[:, 2, None, None]).astype(np.float32)
+    holes_left = holes - 1 - np.arange(holes)
+
+    # Counts by (match, final margin + holes, holes left when the match ended)
+    outcomes_per_match = (2 * holes + 1) * (holes + 1)
+    counts = np.zeros(n_matches * outcomes_per_match, dtype=np.int64)
+    offsets = (np.arange(n_matches) * outcomes_per_match)[:, None]
+
+    rng = np.random.default_rng(seed)
+    remaining = num_simulations
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        draws = rng.random((n_matches, size, holes), dtype=np.float32)
+        results = (draws < win_threshold).view(np.int8) - (draws >= loss_threshold).view(np.int8)
+        margins = np.cumsum(results, axis=-1, dtype=np.int8)
+
+        decided = np.abs(margins) > holes_left
+        decided[..., -1] = True
+        last_hole = decided.argmax(axis=-1)
+        final_margin = np.take_along_axis(margins, last_hole[..., None], axis=-1)[..., 0].astype(np.int64)
+
+        codes = offsets + (final_margin + holes) * (holes + 1) + (holes - 1 - last_hole)
+        counts += np.bincount(codes.ravel(), minlength=len(counts))
+        remaining -= size
+
+    counts = counts.reshape(n_matches, 2 * holes + 1, holes + 1) / num_simulations
+    by_margin = counts.sum(axis=2)
+    holes_played = holes - np.arange(holes + 1)
+
+    results = []
+    for match, players in enumerate(pairings):
+        margins = {
+            _margin_label(margin - holes, left, players): round(float(p), 6)
+            for (margin, left), p in np.ndenumerate(counts[match])
+            if p > 0
+        }
+        results.append(
+            MatchPlayResult(
+                player_a=players[0],
+                player_b=players[1],
+                num_simulations=num_simulations,
+                win_probability=float(by_margin[match, holes + 1 :].sum()),
+                halve_probability=float(by_margin[match, holes]),
+                loss_probability=float(by_margin[match, :holes].sum()),
+                hole_probabilities=[round(float(p), 4) for p in hole_probabilities[match]],
+                margin_distribution=dict(sorted(margins.items(), key=lambda item: -item[1])),
+                expected_holes_played=float(counts[match].sum(axis=0) @ holes_played),
+            )
+        )
+    return results
+
+
+def simulate_pairings(
+    pairings: list,
+    players: dict,
+    num_simulations: int = DEFAULT_NUM_SIMULATIONS,
+    seed: int | None = None,
+    config: ScoringConfig = DEFAULT_CONFIG,
+) -> list[MatchPlayResult]:
+    """
+    Simulates every (player A, player B) pairing hole by hole from the players' strokes gained.
+
+    Args:
+        pairings: (player A, player B) names per match, Europe player first on the card.
+        players: Player name -> strokes-gained data.
+        num_simulations: Simulated matches per pairing.
+        seed: Seed for the random generator.
+        config: Scoring parameters.
+
+    Returns:
+        list[MatchPlayResult]: One result per pairing.
+    """
+    hole_probabilities = hole_outcome_probabilities(
+        [players[a] for a, _ in pairings], [players[b] for _, b in pairings], config
+    )
+    return simulate_match_play(hole_probabilities, num_simulations, seed, pairings=pairings)
+
+
+def main():
+    # Read the roster without touching the server's on-disk cache
+    os.environ.setdefault("DATAGOLF_CACHE_PATH", "")
+    from mcp_servers.datagolf_server import load_players
+
+    parser = argparse.ArgumentParser(description="Simulate the default 2025 singles card hole by hole.")
+    parser.add_argument("--simulations", type=int, default=DEFAULT_NUM_SIMULATIONS, help="Simulations per match.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args()
+
+    try:
+        players = load_players(name for pairing in DEFAULT_PAIRINGS for name in pairing)
+    except ValueError as error:
+        parser.error(str(error))
+    started = time.perf_counter()
+    results = simulate_pairings(DEFAULT_PAIRINGS, players, args.simulations, args.seed)
+    elapsed = time.perf_counter() - started
+    if args.json:
+        print(json.dumps([result.to_dict() for result in results], indent=2))
+        return
+
+    print(f"{len(results)} matches x {args.simulations} simulations in {elapsed:.3f} s")
+    for match, result in enumerate(results, start=1):
+        top_margins = ", ".join(f"{label} {p:.3f}" for label, p in list(result.margin_distribution.items())[:3])
+        print(
+            f"  Match {match:>2}: {result.player_a:<20} vs {result.player_b:<20}"
+            f" win/halve/loss {result.win_probability:.3f}/{result.halve_probability:.3f}/{result.loss_probability:.3f}"
+            f"  holes {result.expected_holes_played:.1f}  most likely: {top_margins}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Typed, compact state passed between the pipeline stages.
+
+Every stage writes one of these models to its session.state key. LLM stages
+get them as ADK `output_schema`, so Gemini answers in JSON mode, or through
+`set_model_response` for the tool-using PlayerProfilerAgent. The numeric
+path builds the same models from code.
+
+Strokes-gained data is encoded as plain arrays in `SG_METRICS` order:
+
+    [total_sg, off_the_tee, approach, around_the_green, putting]
+
+A player profile is then about 70 bytes instead of a nested dict of ~250.
+Downstream prompts get the values templated straight into their instruction,
+so they don't have to re-read the conversation.
+
+`load_state()` is the parsing layer for both stages and code consumers. It
+accepts a model instance, a dict, or JSON text (optionally in a ```json fence)
+and returns a validated model. `MatchProfiles` also reads the older verbose
+profile layouts.
+"""
+
+import json
+import re
+from typing import Literal
+
+from pydantic import BaseModel
+from pydantic import Field
+from ryder_cup_prediction.scoring import BASELINE_WINDOW
+from ryder_cup_prediction.scoring import DEFAULT_CONFIG
+from ryder_cup_prediction.scoring import FORM_WINDOW
+from ryder_cup_prediction.scoring import SG_CATEGORIES
+from ryder_cup_prediction.scoring import SG_METRICS
+from ryder_cup_prediction.scoring import ScoringConfig
+from ryder_cup_prediction.scoring import form_delta
+from ryder_cup_prediction.scoring import form_trend
+from ryder_cup_prediction.scoring import strength_profile
+
+_JSON_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+_SG_ORDER = "[total_sg, off_the_tee, approach, around_the_green, putting]"
+
+
+def _round(values, digits=3) -> list:
+    return [round(float(value), digits) for value in values]
+
+
+class PlayerProfile(BaseModel):
+    """One player's True Strokes Gained per round in the two time windows."""
+
+    name: str = Field(description="Canonical player name as returned by the DataGolf tool")
+    sg_2y: list[float] = Field(
+        min_length=len(SG_METRICS),
+        max_length=len(SG_METRICS),
+        description=f"2-year strokes gained per round: {_SG_ORDER}",
+    )
+    sg_3m: list[float] = Field(
+        min_length=len(SG_METRICS),
+        max_length=len(SG_METRICS),
+        description=f"3-month strokes gained per round: {_SG_ORDER}",
+    )
+
+    @classmethod
+    def from_windows(cls, name: str, data: dict) -> "PlayerProfile":
+        """Encodes the DataGolf `{"2-year": {...}, "3-month": {...}}` shape."""
+        return cls(
+            name=name,
+            sg_2y=_round(data[BASELINE_WINDOW][metric] for metric in SG_METRICS),
+            sg_3m=_round(data[FORM_WINDOW][metric] for metric in SG_METRICS),
+        )
+
+    def windows(self) -> dict:
+        """Decodes back into the DataGolf shape used by `ryder_cup_prediction.scoring`."""
+        return {
+            BASELINE_WINDOW: dict(zip(SG_METRICS, self.sg_2y)),
+            FORM_WINDOW: dict(zip(SG_METRICS, self.sg_3m)),
+        }
+
+
+class MatchProfiles(BaseModel):
+    """Output of the PlayerProfilerAgent (`player_profiles`)."""
+
+    players: list[PlayerProfile] = Field(description="Both players of the match, Europe player first")
+
+    def player_data(self) -> dict:
+        """Returns name -> DataGolf-shaped strokes-gained data of every player."""
+        return {player.name: player.windows() for player in self.players}
+
+    @classmethod
+    def from_legacy(cls, data: dict) -> "MatchProfiles":
+        """Reads the verbose layouts: player1/player2 with `true_strokes_gained`, or the raw tool output."""
+        players = [
+            PlayerProfile.from_windows(entry["name"], entry["true_strokes_gained"])
+            for entry in (data.get("player1"), data.get("player2"))
+            if isinstance(entry, dict) and "true_strokes_gained" in entry
+        ]
+        if not players:
+            players = [
+                PlayerProfile.from_windows(name, windows)
+                for name, windows in data.items()
+                if isinstance(windows, dict) and BASELINE_WINDOW in windows
+            ]
+        return cls(players=players)
+
+
+class PlayerForm(BaseModel):
+    name: str
+    delta: float = Field(description="3-month minus 2-year total strokes gained per round")
+    trend: Literal["improving", "stable", "declining"]
+
+
+class RecentForm(BaseModel):
+    """Output of the RecentFormAnalyst (`recent_form_analysis`)."""
+
+    players: list[PlayerForm]
+    summary: str = Field(default="", description="One sentence on the form comparison")
+
+    @classmethod
+    def from_player_data(cls, players: dict, config: ScoringConfig = DEFAULT_CONFIG) -> "RecentForm":
+        entries = []
+        for name, data in players.items():
+            delta = form_delta(data)["total_sg"]
+            entries.append(PlayerForm(name=name, delta=round(delta, 3), trend=form_trend(delta, config)))
+        return cls(players=entries)
+
+
+class PlayerSkill(BaseModel):
+    name: str
+    total_sg: float = Field(description="2-year total strokes gained per round")
+    strongest: Literal[SG_CATEGORIES]
+    weakest: Literal[SG_CATEGORIES]
+
+
+class BaselineSkill(BaseModel):
+    """Output of the BaselineSkillAnalyst (`baseline_skill_analysis`)."""
+
+    players: list[PlayerSkill]
+    summary: str = Field(default="", description="One sentence on the baseline skill comparison")
+
+    @classmethod
+    def from_player_data(cls, players: dict) -> "BaselineSkill":
+        entries = []
+        for name, data in players.items():
+            profile = strength_profile(data, BASELINE_WINDOW)
+            entries.append(
+                PlayerSkill(
+                    name=name,
+                    total_sg=round(profile["total_sg"], 3),
+                    strongest=profile["strongest"],
+                    weakest=profile["weakest"],
+                )
+            )
+        return cls(players=entries)
+
+
+class MatchProbabilities(BaseModel):
+    """Output of the MatchupSynthesizerAgent or NumericMatchupAgent (`match_probabilities`)."""
+
+    player_A: str
+    player_B: str
+    player_A_win_prob: float = Field(ge=0, le=1)
+    tie_prob: float = Field(ge=0, le=1)
+    player_B_win_prob: float = Field(ge=0, le=1)
+    europe_win_prob: float | None = Field(default=None, ge=0, le=1, description="Win probability of the Europe player")
+    usa_win_prob: float | None = Field(default=None, ge=0, le=1, description="Win probability of the USA player")
+    skill_gap: float | None = Field(default=None, description="Blended strokes-gained gap, player A minus B")
+
+    def europe_view(self) -> tuple | None:
+        """Returns (Europe win, tie, USA win), or None if the teams of the players are unknown."""
+        if self.europe_win_prob is None or self.usa_win_prob is None:
+            return None
+        return self.europe_win_prob, self.tie_prob, self.usa_win_prob
+
+
+class CardSimulation(BaseModel):
+    """Numbers of a `simulate_ryder_cup_singles` run (`simulation_results`)."""
+
+    num_simulations: int
+    win_probability: dict[str, float]
+    retain_probability: float
+    tie_probability: float
+    expected_points: dict[str, float]
+    match_expected_points: list
+
+
+def _parse_json(value):
+    if isinstance(value, (dict, list)):
+        return value
+    text = str(value).strip()
+    fenced = _JSON_FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    elif not text.startswith(("{", "[")):
+        text = text[text.find("{") : text.rfind("}") + 1]
+    return json.loads(text)
+
+
+def load_state(value, schema: type[BaseModel]) -> BaseModel:
+    """
+    Parses a session.state value into `schema`.
+
+    Args:
+        value: A `schema` instance, a dict, or JSON text (optionally in a ```json fence).
+        schema: One of the state models of this module.
+
+    Returns:
+        BaseModel: The validated model.
+
+    Raises:
+        ValueError: If the value is empty, not JSON or doesn't match the schema
+                    (pydantic's ValidationError is a ValueError).
+    """
+    if isinstance(value, schema):
+        return value
+    if value is None or value == "":
+        raise ValueError(f"no {schema.__name__} in session.state")
+    data = _parse_json(value)
+    if schema is MatchProfiles and isinstance(data, dict) and "players" not in data:
+        return MatchProfiles.from_legacy(data)
+    return schema.model_validate(data)
+
+
+def dump_state(model: BaseModel) -> dict:
+    """Returns the compact state encoding of a model (unset optional fields left out)."""
+    return model.model_dump(exclude_none=True)
@@ -0,0 +1,206 @@
+"""
+Deterministic scoring of singles matchups from True Strokes Gained data.
+
+This is the numeric fast path for the RecentFormAnalyst, BaselineSkillAnalyst
+and MatchupSynthesizerAgent stages: form deltas (3-month vs 2-year), per-category
+strength profiles and calibrated match-play win/tie/loss probabilities.
+
+Player data uses the shape returned by the DataGolf MCP server:
+
+    {"2-year": {"total_sg": 2.85, "off_the_tee": 0.95, ...},
+     "3-month": {"total_sg": 3.10, "off_the_tee": 1.05, ...}}
+"""
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+SG_CATEGORIES = ("off_the_tee", "approach", "around_the_green", "putting")
+SG_METRICS = ("total_sg",) + SG_CATEGORIES
+
+BASELINE_WINDOW = "2-year"
+FORM_WINDOW = "3-month"
+
+
+@dataclass(frozen=True)
+class ScoringConfig:
+    """Parameters of the skill-gap to match-play probability mapping."""
+
+    # Weight of the 3-month window in the blended skill (the rest is 2-year)
+    form_weight: float = 0.35
+    # Strokes-per-round gap that moves the decisive-match odds by a factor of e
+    sg_scale: float = 1.6
+    # Halve rate of two evenly matched players (singles halve about 1 in 7)
+    base_tie_rate: float = 0.14
+    # Gap (strokes per round) over which the halve rate decays
+    tie_decay: float = 1.5
+    # Floor of the halve rate for very lopsided matches
+    min_tie_rate: float = 0.04
+    # Form deltas smaller than this are reported as "stable"
+    form_threshold: float = 0.1
+
+
+DEFAULT_CONFIG = ScoringConfig()
+
+
+def form_delta(player_data: dict) -> dict:
+    """
+    Computes the 3-month minus 2-year difference for every metric.
+
+    Args:
+        player_data: The player's `2-year` and `3-month` strokes-gained dicts.
+
+    Returns:
+        dict: Metric -> delta; positive means the player is in better form than usual.
+    """
+    baseline = player_data[BASELINE_WINDOW]
+    form = player_data[FORM_WINDOW]
+    return {metric: round(form[metric] - baseline[metric], 4) for metric in SG_METRICS}
+
+
+def form_trend(delta: float, config: ScoringConfig = DEFAULT_CONFIG) -> str:
+    """Labels a total strokes-gained delta as improving, declining or stable."""
+    if delta >= config.form_threshold:
+        return "improving"
+    if delta <= -config.form_threshold:
+        return "declining"
+    return "stable"
+
+
+def blended_skill(player_data: dict, config: ScoringConfig = DEFAULT_CONFIG) -> dict:
+    """
+    Blends the 2-year baseline and the 3-month form into one value per metric.
+
+    Args:
+        player_data: The player's `2-year` and `3-month` strokes-gained dicts.
+        config: Scoring parameters, `form_weight` sets the 3-month share.
+
+    Returns:
+        dict: Metric -> blended strokes gained per round.
+    """
+    baseline = player_data[BASELINE_WINDOW]
+    form = player_data[FORM_WINDOW]
+    weight = config.form_weight
+    return {metric: (1 - weight) * baseline[metric] + weight * form[metric] for metric in SG_METRICS}
+
+
+def strength_profile(player_data: dict, window: str = BASELINE_WINDOW) -> dict:
+    """
+    Ranks a player's strokes-gained categories for one time window.
+
+    Args:
+        player_data: The player's `2-year` and `3-month` strokes-gained dicts.
+        window: The time window to profile.
+
+    Returns:
+        dict: `total_sg`, the categories ordered strongest first, plus the
+              strongest and weakest category.
+    """
+    data = player_data[window]
+    ranked = sorted(SG_CATEGORIES, key=lambda category: data[category], reverse=True)
+    return {
+        "total_sg": data["total_sg"],
+        "categories": {category: data[category] for category in ranked},
+        "strongest": ranked[0],
+        "weakest": ranked[-1],
+    }
+
+
+def outcome_probabilities(skill_gap, config: ScoringConfig = DEFAULT_CONFIG):
+    """
+    Maps a strokes-per-round skill gap to win/tie/loss probabilities.
+
+    The halve rate peaks at `base_tie_rate` for an even match and decays with
+    the size of the gap. The remaining mass is split by a logistic curve.
+    Works on floats and NumPy arrays alike.
+
+    Args:
+        skill_gap: Blended strokes gained of player A minus player B.
+        config: Scoring parameters.
+
+    Returns:
+        tuple: (A win, tie, B win) probabilities.
+    """
+    gap = np.asarray(skill_gap, dtype=np.float64)
+    tie = np.maximum(config.min_tie_rate, config.base_tie_rate * np.exp(-((gap / config.tie_decay) ** 2)))
+    decisive_a = 1.0 / (1.0 + np.exp(-gap / config.sg_scale))
+    win_a = (1.0 - tie) * decisive_a
+    win_b = (1.0 - tie) * (1.0 - decisive_a)
+    if gap.ndim == 0:
+        return float(win_a), float(tie), float(win_b)
+    return win_a, tie, win_b
+
+
+def score_matchup(player_a: dict, player_b: dict, config: ScoringConfig = DEFAULT_CONFIG) -> dict:
+    """
+    Computes the match-play probabilities for one pairing.
+
+    Args:
+        player_a: Strokes-gained data of player A.
+        player_b: Strokes-gained data of player B.
+        config: Scoring parameters.
+
+    Returns:
+        dict: Blended skills, the skill gap and the A win / tie / B win probabilities.
+    """
+    weight = config.form_weight
+    skill_a = (1 - weight) * player_a[BASELINE_WINDOW]["total_sg"] + weight * player_a[FORM_WINDOW]["total_sg"]
+    skill_b = (1 - weight) * player_b[BASELINE_WINDOW]["total_sg"] + weight * player_b[FORM_WINDOW]["total_sg"]
+    gap = skill_a - skill_b
+
+    # Scalar twin of `outcome_probabilities`, NumPy is slower than math for one pairing
+    tie = max(config.min_tie_rate, config.base_tie_rate * math.exp(-((gap / config.tie_decay) ** 2)))
+    decisive_a = 1.0 / (1.0 + math.exp(-gap / config.sg_scale))
+
+    return {
+        "player_A_skill": round(skill_a, 4),
+        "player_B_skill": round(skill_b, 4),
+        "skill_gap": round(gap, 4),
+        "player_A_win_prob": round((1 - tie) * decisive_a, 4),
+        "tie_prob": round(tie, 4),
+        "player_B_win_prob": round((1 - tie) * (1 - decisive_a), 4),
+    }
+
+
+def skill_vector(players: list[dict], config: ScoringConfig = DEFAULT_CONFIG) -> np.ndarray:
+    """Returns the blended total strokes gained of several players as an array."""
+    baseline = np.array([player[BASELINE_WINDOW]["total_sg"] for player in players], dtype=np.float64)
+    form = np.array([player[FORM_WINDOW]["total_sg"] for player in players], dtype=np.float64)
+    return (1 - config.form_weight) * baseline + config.form_weight * form
+
+
+def head_to_head_matrix(players_a: list[dict], players_b: list[dict], config: ScoringConfig = DEFAULT_CONFIG):
+    """
+    Computes the probabilities of every A-vs-B pairing at once.
+
+    Args:
+        players_a: Strokes-gained data of team A's players (rows).
+        players_b: Strokes-gained data of team B's players (columns).
+        config: Scoring parameters.
+
+    Returns:
+        np.ndarray: Array of shape (len(players_a), len(players_b), 3) holding
+                    (A win, tie, B win) for each pairing.
+    """
+    gap = skill_vector(players_a, config)[:, None] - skill_vector(players_b, config)[None, :]
+    return np.stack(outcome_probabilities(gap, config), axis=-1)
+
+
+def analyze_recent_form(players: dict, config: ScoringConfig = DEFAULT_CONFIG) -> dict:
+    """Numeric equivalent of the RecentFormAnalyst output, keyed by player name."""
+    analysis = {}
+    for name, player_data in players.items():
+        delta = form_delta(player_data)
+        analysis[name] = {
+            "3-month_total_sg": player_data[FORM_WINDOW]["total_sg"],
+            "2-year_total_sg": player_data[BASELINE_WINDOW]["total_sg"],
+            "delta": delta,
+            "trend": form_trend(delta["total_sg"], config),
+        }
+    return analysis
+
+
+def analyze_baseline_skill(players: dict) -> dict:
+    """Numeric equivalent of the BaselineSkillAnalyst output, keyed by player name."""
+    return {name: strength_profile(player_data, BASELINE_WINDOW) for name, player_data in players.items()}
@@ -0,0 +1,790 @@
+"""
+Long-lived, multi-tenant prediction service.
+
+One process serves many concurrent card predictions. The pieces that a
+one-shot `run_prediction.py` run can afford to leave unbounded are shared and
+bounded here:
+
+- `BoundedSessionService`: ADK's in-memory session store with a size cap (least
+  recently used sessions are evicted first) and an idle TTL. Sessions of runs
+  still in flight are never evicted.
+- `ModelCallScheduler`: one async gate for every model call of every card. It
+  caps the calls in flight and the request rate (token bucket), rejects new
+  calls with `ServiceOverloaded` once too many are waiting (backpressure),
+  retries rate-limit, server and timeout errors with exponential backoff and
+  full jitter, and coalesces identical requests in flight (same
+  `llm_cache.request_key`) into one call, which outlives any one cancelled
+  caller.
+- `ScheduledLlm`: the `BaseLlm` every agent of the service gets, which routes
+  its inner model's calls through the scheduler.
+- `PredictionService`: admission control, one Runner per card (kept in a small
+  LRU, since the agent tree embeds the pairings) and `predict`, an async
+  generator that yields each match as soon as its `match_probabilities` lands
+  in session.state, together with the exact cup probabilities so far (matches
+  not yet predicted count as even), and the card result last.
+
+    service = PredictionService(model=StubLlm(latency=0.5), numeric_scoring=True)
+    async for event in service.predict(DEFAULT_PAIRINGS, DEFAULT_STARTING_SCORE, user_id="tenant-a"):
+        print(event["type"], event.get("match"), event.get("win_probability"))
+
+`create_app` serves it over HTTP, streaming newline-delimited JSON events. It
+validates the card (`PredictRequest`) and answers 422 for an invalid one:
+
+    python -m ryder_cup_prediction.service [--port 8080] [--numeric] [--stub 0.5]
+    curl -N localhost:8080/predict -d '{"pairings": [["Jon Rahm", "Scottie Scheffler"]], "user_id": "a"}'
+
+Start the DataGolf server once with `--transport streamable-http` and set
+DATAGOLF_MCP_URL, so every card shares one MCP connection instead of spawning
+a server per Runner.
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import random
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextlib import contextmanager
+from typing import Any
+from typing import AsyncGenerator
+from typing import Awaitable
+from typing import Callable
+
+from google.adk import Runner
+from google.adk.models import BaseLlm
+from google.adk.models import LlmRequest
+from google.adk.models import LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions import Session
+from google.adk.tools.base_toolset import BaseToolset
+from google.genai import types
+from pydantic import BaseModel
+from pydantic import Field
+from pydantic import ValidationError
+from pydantic import ValidationInfo
+from pydantic import field_validator
+from mcp_servers.name_index import normalize_name
+from ryder_cup_prediction.agent import _SHARED_MCP_TOOLSETS
+from ryder_cup_prediction.agent import MODEL
+from ryder_cup_prediction.agent import SIMULATION_STATE_KEY
+from ryder_cup_prediction.agent import create_agent
+from ryder_cup_prediction.agent import match_state_key
+from ryder_cup_prediction.exact import ExactSinglesEngine
+from ryder_cup_prediction.instrumentation import tracing_plugins
+from ryder_cup_prediction.llm_cache import request_key
+from ryder_cup_prediction.schemas import CardSimulation
+from ryder_cup_prediction.schemas import MatchProbabilities
+from ryder_cup_prediction.schemas import load_state
+from ryder_cup_prediction.simulation import DEFAULT_PAIRINGS
+from ryder_cup_prediction.simulation import DEFAULT_STARTING_SCORE
+from ryder_cup_prediction.simulation import TEAMS
+
+logger = logging.getLogger(__name__)
+
+APP_NAME = "ryder_cup_service"
+
+# HTTP status codes of google.genai API errors worth retrying: rate limited, timed out, server side
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+# The card aggregator's "no information" row for a match without probabilities
+_EVEN_MATCH = (0.45, 0.10, 0.45)
+
+
+class ServiceOverloaded(RuntimeError):
+    """Raised instead of queueing work once the service's waiting room is full."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failed model call is worth retrying: rate limits, server errors and timeouts."""
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    return getattr(error, "code", None) in RETRYABLE_STATUS_CODES
+
+
+class BoundedSessionService(InMemorySessionService):
+    """
+    In-memory session store bounded by a session count and an idle TTL.
+
+    Every create/get/append refreshes a session's last use. Sessions idle for
+    longer than `ttl_seconds` read as missing and are deleted; past
+    `max_sessions`, the least recently used are evicted. Sessions held with
+    `in_use` (runs in flight), and a session being created, are exempt from both.
+    """
+
+    def __init__(self, max_sessions: int = 1024, ttl_seconds: float | None = 3600.0):
+        super().__init__()
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        # (app_name, user_id, session_id) -> monotonic time of last use, least recent first
+        self._last_used = OrderedDict()
+        self._in_use = {}
+        self._stats = {"evicted": 0, "expired": 0}
+
+    def _touch(self, key: tuple):
+        self._last_used[key] = time.monotonic()
+        self._last_used.move_to_end(key)
+
+    def _expired(self, key: tuple, now: float) -> bool:
+        if self.ttl_seconds is None or key in self._in_use:
+            return False
+        return now - self._last_used.get(key, now) > self.ttl_seconds
+
+    def _drop(self, key: tuple, reason: str):
+        app_name, user_id, session_id = key
+        self._last_used.pop(key, None)
+        self.sessions.get(app_name, {}).get(user_id, {}).pop(session_id, None)
+        self._stats[reason] += 1
+
+    def _enforce_bounds(self, keep: tuple | None = None):
+        now = time.monotonic()
+        # Least recently used first: stop at the first session that is neither expired nor over the cap
+        for key in list(self._last_used):
+            if key in self._in_use or key == keep:
+                continue
+            if self._expired(key, now):
+                self._drop(key, "expired")
+            elif len(self._last_used) > self.max_sessions:
+                self._drop(key, "evicted")
+            else:
+                break
+
+    async def create_session(self, *, app_name, user_id, state=None, session_id=None) -> Session:
+        session = await super().create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+        key = (app_name, user_id, session.id)
+        self._touch(key)
+        # Not evicted by its own creation: the caller is about to hold it with `in_use`
+        self._enforce_bounds(keep=key)
+        return session
+
+    async def get_session(self, *, app_name, user_id, session_id, config=None) -> Session | None:
+        key = (app_name, user_id, session_id)
+        if self._expired(key, time.monotonic()):
+            self._drop(key, "expired")
+            return None
+        session = await super().get_session(app_name=app_name, user_id=user_id, session_id=session_id, config=config)
+        if session is not None:
+            self._touch(key)
+        return session
+
+    async def delete_session(self, *, app_name, user_id, session_id):
+        self._last_used.pop((app_name, user_id, session_id), None)
+        await super().delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    async def append_event(self, session, event):
+        key = (session.app_name, session.user_id, session.id)
+        if key in self._last_used:
+            self._touch(key)
+        return await super().append_event(session=session, event=event)
+
+    @contextmanager
+    def in_use(self, session: Session):
+        """Exempts a session from expiry and eviction while a run uses it."""
+        key = (session.app_name, session.user_id, session.id)
+        self._in_use[key] = self._in_use.get(key, 0) + 1
+        try:
+            yield session
+        finally:
+            self._in_use[key] -= 1
+            if not self._in_use[key]:
+                del self._in_use[key]
+            if key in self._last_used:
+                self._touch(key)
+            self._enforce_bounds()
+
+    def stats(self) -> dict:
+        """Returns the session count and how many sessions were evicted or expired."""
+        return {"sessions": len(self._last_used), "in_use": len(self._in_use), **self._stats}
+
+
+class ModelCallScheduler:
+    """
+    Shared async gate for model calls: concurrency and rate limits, backpressure, retries and coalescing.
+
+    Calls are zero-argument coroutine functions returning the full list of
+    responses, so a failed attempt can be retried from scratch and one
+    result can be handed to every coalesced caller.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        requests_per_minute: float | None = None,
+        max_pending: int = 256,
+        max_retries: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        coalesce: bool = True,
+    ):
+        """
+        Args:
+            max_concurrency: Model calls in flight at once.
+            requests_per_minute: Sustained request rate (token bucket, bursts up to
+                                 `max_concurrency`); None leaves the rate unlimited.
+            max_pending: Calls admitted (waiting or in flight) before new ones are
+                         rejected with `ServiceOverloaded`. Coalesced calls don't count.
+            max_retries: Retries of a call failing with a `is_retryable` error.
+            base_delay: Backoff of the first retry in seconds, doubled on every retry.
+            max_delay: Cap of the backoff in seconds.
+            coalesce: Share one call between identical requests in flight.
+        """
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.coalesce = coalesce
+
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._rate_lock = asyncio.Lock()
+        self._tokens = float(max_concurrency)
+        self._refilled = time.monotonic()
+        self._inflight = {}
+        # Call task -> callers awaiting it
+        self._callers = {}
+        self._pending = 0
+        self._active = 0
+        self._stats = {"calls": 0, "coalesced": 0, "retries": 0, "rejected": 0, "failed": 0, "rate_limited_s": 0.0}
+
+    async def _take_token(self):
+        if not self.requests_per_minute:
+            return
+        rate = self.requests_per_minute / 60.0
+        # The lock queues waiters in order, so a burst drains the bucket fairly
+        async with self._rate_lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(float(self.max_concurrency), self._tokens + (now - self._refilled) * rate)
+                self._refilled = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / rate
+                self._stats["rate_limited_s"] += wait
+                await asyncio.sleep(wait)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff: uniform in [0, min(max_delay, base_delay * 2**attempt)]."""
+        return random.uniform(0.0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    async def _call_with_retries(self, call: Callable[[], Awaitable[list]]) -> list:
+        attempt = 0
+        while True:
+            await self._take_token()
+            async with self._slots:
+                self._active += 1
+                self._stats["calls"] += 1
+                try:
+                    return await call()
+                except Exception as error:
+                    if attempt >= self.max_retries or not is_retryable(error):
+                        raise
+                    logger.warning("Model call failed (%s), retry %d of %d", error, attempt + 1, self.max_retries)
+                finally:
+                    self._active -= 1
+            # Back off outside the slot, so other calls use it meanwhile
+            self._stats["retries"] += 1
+            await asyncio.sleep(self.backoff(attempt))
+            attempt += 1
+
+    async def _run(self, call: Callable[[], Awaitable[list]], key: str | None) -> list:
+        """The task of one admitted call, shared by every caller coalesced into it."""
+        try:
+            return await self._call_with_retries(call)
+        except Exception:
+            self._stats["failed"] += 1
+            raise
+        finally:
+            self._pending -= 1
+            self._forget(key, asyncio.current_task())
+
+    def _forget(self, key: str | None, task: asyncio.Task):
+        if key is not None and self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def submit(self, call: Callable[[], Awaitable[list]], key: str | None = None) -> list:
+        """
+        Runs a model call under the scheduler's limits.
+
+        The call runs in a task of its own. A caller that is cancelled leaves it running for
+        the callers coalesced into it, and it is only cancelled once none of them is left.
+
+        Args:
+            call: Zero-argument coroutine function making the call and returning its responses.
+            key: Coalescing key (see `llm_cache.request_key`); callers with the same
+                 key while a call is in flight share its result. None never coalesces.
+
+        Returns:
+            list: The call's responses; every caller of a keyed call gets its own deep copy.
+
+        Raises:
+            ServiceOverloaded: `max_pending` calls are already waiting or in flight.
+        """
+        key = key if self.coalesce else None
+        task = self._inflight.get(key) if key is not None else None
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            if self._pending >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise ServiceOverloaded(f"{self._pending} model calls pending, the limit is {self.max_pending}")
+            self._pending += 1
+            task = asyncio.ensure_future(self._run(call, key))
+            if key is not None:
+                self._inflight[key] = task
+
+        self._callers[task] = self._callers.get(task, 0) + 1
+        try:
+            # Shielded: cancelling one caller must not cancel the call the others wait on
+            result = await asyncio.shield(task)
+        finally:
+            self._callers[task] -= 1
+            if not self._callers[task]:
+                del self._callers[task]
+                if not task.done():
+                    # Nobody waits for the call any more; new callers start their own
+                    self._forget(key, task)
+                    task.cancel()
+        # ADK fills in function call ids on the responses it gets; keep the shared result pristine
+        return copy.deepcopy(result) if key is not None else result
+
+    def stats(self) -> dict:
+        """Returns the calls pending, active and coalesced, retries, rejections and time spent rate limited."""
+        return {
+            "pending": self._pending,
+            "active": self._active,
+            **self._stats,
+            "rate_limited_s": round(self._stats["rate_limited_s"], 3),
+        }
+
+
+class ScheduledLlm(BaseLlm):
+    """Routes every call of an inner model through a shared `ModelCallScheduler`."""
+
+    inner: BaseLlm
+    scheduler: Any
+    """The `ModelCallScheduler` (typed Any: pydantic can't validate it)."""
+
+    @classmethod
+    def wrap(cls, model: str | BaseLlm | None, scheduler: "ModelCallScheduler") -> "ScheduledLlm":
+        """Wraps a model name (resolved with ADK's registry) or `BaseLlm` instance."""
+        inner = model if isinstance(model, BaseLlm) else LLMRegistry.new_llm(model or MODEL)
+        return cls(model=inner.model, inner=inner, scheduler=scheduler)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        # Responses are buffered: a retried or coalesced call is only handed out once complete
+        async def call():
+            return [response async for response in self.inner.generate_content_async(llm_request, stream=False)]
+
+        key = None
+        if self.scheduler.coalesce:
+            try:
+                key = request_key(llm_request)
+            except (TypeError, ValueError) as error:
+                # Only coalescing needs the key: run the call on its own rather than fail the card
+                logger.warning("Model request not coalesced, its key failed: %s", error)
+        for response in await self.scheduler.submit(call, key):
+            yield response
+
+
+def _private_toolsets(agent) -> list:
+    """Toolsets of an agent tree that belong to it alone, i.e. not a shared MCP connection."""
+    shared = {id(toolset) for toolset in _SHARED_MCP_TOOLSETS.values()}
+    toolsets = [
+        tool for tool in getattr(agent, "tools", []) if isinstance(tool, BaseToolset) and id(tool) not in shared
+    ]
+    for sub_agent in agent.sub_agents:
+        toolsets.extend(_private_toolsets(sub_agent))
+    return list({id(toolset): toolset for toolset in toolsets}.values())
+
+
+def _card_prompt(pairings: list) -> str:
+    lines = [f"Match {n}: {europe} (Europe) vs {usa} (USA)" for n, (europe, usa) in enumerate(pairings, start=1)]
+    return "Predict the singles card:\n" + "\n".join(lines)
+
+
+def _match_update(engine: ExactSinglesEngine, number: int, pairings: list, value) -> dict:
+    """The `match` event of a match's `match_probabilities` state value; updates the engine with it."""
+    europe_player, usa_player = pairings[number - 1]
+    update = {"type": "match", "match": number, "europe_player": europe_player, "usa_player": usa_player}
+    try:
+        probabilities = load_state(value, MatchProbabilities)
+    except ValueError as error:
+        # Scored as "no information", like the card aggregator does
+        update["error"] = str(error)
+        return update
+    row = probabilities.europe_view() or (
+        probabilities.player_A_win_prob,
+        probabilities.tie_prob,
+        probabilities.player_B_win_prob,
+    )
+    engine.update(number, row)
+    update["match_probabilities"] = dict(zip(("europe_win_prob", "tie_prob", "usa_win_prob"), row))
+    return update
+
+
+class PredictionService:
+    """Serves concurrent card predictions from shared, bounded sessions and a shared model-call scheduler."""
+
+    def __init__(
+        self,
+        model: str | BaseLlm | None = None,
+        scheduler: ModelCallScheduler | None = None,
+        session_service: BoundedSessionService | None = None,
+        numeric_scoring: bool = False,
+        narrative: bool = False,
+        max_active_cards: int = 8,
+        max_waiting_cards: int = 64,
+        max_runners: int = 16,
+        holder: str = "Europe",
+        mcp_url: str | None = None,
+        llm_cache=None,
+    ):
+        """
+        Args:
+            model: Model name or `BaseLlm` instance of every stage (e.g. the offline `StubLlm`).
+                   Defaults to `agent.MODEL`.
+            scheduler: Model-call scheduler shared by every card; defaults to `ModelCallScheduler()`.
+            session_service: Session store; defaults to `BoundedSessionService()`.
+            numeric_scoring: Score the matchups with `ryder_cup_prediction.scoring`, see `create_agent`.
+            narrative: Keep the narrative stage in numeric scoring mode.
+            max_active_cards: Cards predicted at once; the next ones wait for a slot.
+            max_waiting_cards: Cards waiting for a slot before new ones are rejected with
+                               `ServiceOverloaded`.
+            max_runners: Runners (one agent tree per distinct card) kept for reuse.
+            holder: The team holding the cup, which retains it on a 14-14 tie.
+            mcp_url: URL of a shared DataGolf MCP server, see `create_agent`.
+            llm_cache: Optional `LlmResponseCache`, see `create_agent`.
+        """
+        self.scheduler = scheduler or ModelCallScheduler()
+        self.session_service = session_service or BoundedSessionService()
+        self.model = ScheduledLlm.wrap(model, self.scheduler)
+        self.numeric_scoring = numeric_scoring
+        self.narrative = narrative
+        self.max_active_cards = max_active_cards
+        self.max_waiting_cards = max_waiting_cards
+        self.max_runners = max_runners
+        self.holder = holder
+        self.mcp_url = mcp_url
+        self.llm_cache = llm_cache
+
+        self._card_slots = asyncio.Semaphore(max_active_cards)
+        self._waiting = 0
+        self._active = 0
+        # card key -> Runner, least recently used first; runs in flight pin their Runner
+        self._runners = OrderedDict()
+        self._runner_users = {}
+        self._stats = {"cards": 0, "rejected": 0, "failed": 0, "runners_built": 0}
+
+    def _runner(self, key: tuple, pairings: list, starting_score: dict) -> Runner:
+        runner = self._runners.get(key)
+        if runner is None:
+            agent = create_agent(
+                pairings=pairings,
+                starting_score=starting_score,
+                numeric_scoring=self.numeric_scoring,
+                narrative=self.narrative,
+                llm_cache=self.llm_cache,
+                mcp_url=self.mcp_url,
+                model=self.model,
+            )
+            runner = Runner(
+                app_name=APP_NAME, agent=agent, session_service=self.session_service, plugins=tracing_plugins(agent)
+            )
+            self._runners[key] = runner
+            self._stats["runners_built"] += 1
+        self._runners.move_to_end(key)
+        return runner
+
+    async def _evict_runners(self):
+        for key in list(self._runners):
+            if len(self._runners) <= self.max_runners:
+                break
+            if self._runner_users.get(key):
+                continue
+            runner = self._runners.pop(key)
+            await self._close_toolsets(runner)
+
+    @staticmethod
+    async def _close_toolsets(runner: Runner):
+        # Runner.close() would also close the MCP connection shared with the other cards
+        for toolset in _private_toolsets(runner.agent):
+            try:
+                await toolset.close()
+            except Exception as error:
+                logger.warning("Closing toolset %s failed: %s", type(toolset).__name__, error)
+
+    async def _admit(self):
+        if self._waiting >= self.max_waiting_cards:
+            self._stats["rejected"] += 1
+            raise ServiceOverloaded(f"{self._waiting} cards waiting, the limit is {self.max_waiting_cards}")
+        self._waiting += 1
+        try:
+            await self._card_slots.acquire()
+        finally:
+            self._waiting -= 1
+
+    def _cup(self, engine: ExactSinglesEngine) -> dict:
+        distribution = engine.distribution()
+        win = distribution.win_probability()
+        tie = distribution.tie_probability()
+        return {
+            "win_probability": {team: round(p, 4) for team, p in win.items()},
+            "retain_probability": round(win[distribution.holder] + tie, 4),
+            "tie_probability": round(tie, 4),
+        }
+
+    async def predict(
+        self, pairings: list, starting_score: dict, user_id: str = "anonymous"
+    ) -> AsyncGenerator[dict, None]:
+        """
+        Predicts a singles card, streaming each match as soon as its probabilities are known.
+
+        Args:
+            pairings: (Europe player, USA player) tuples in match order.
+            starting_score: Points after Saturday, e.g. {"USA": 4.5, "Europe": 11.5}.
+            user_id: Tenant the card's session belongs to.
+
+        Yields:
+            dict: An `accepted` event with the session id once the card has a slot, a
+                  `match` event per match in completion order (with the exact cup
+                  probabilities so far, matches not yet predicted counting as even), and a
+                  final `card` event with the cup probabilities and the card aggregator's
+                  simulation, if it ran. Every event carries `elapsed_s`.
+
+        Raises:
+            ServiceOverloaded: `max_waiting_cards` cards are already waiting for a slot.
+        """
+        pairings = [tuple(pairing) for pairing in pairings]
+        starting_score = dict(starting_score)
+        key = (tuple(pairings), tuple(sorted(starting_score.items())))
+        started = time.perf_counter()
+
+        await self._admit()
+        self._active += 1
+        self._runner_users[key] = self._runner_users.get(key, 0) + 1
+        try:
+            runner = self._runner(key, pairings, starting_score)
+            session = await self.session_service.create_session(app_name=APP_NAME, user_id=user_id)
+            with self.session_service.in_use(session):
+                engine = ExactSinglesEngine([_EVEN_MATCH] * len(pairings), starting_score, self.holder)
+                elapsed = round(time.perf_counter() - started, 3)
+                yield {"type": "accepted", "session_id": session.id, "elapsed_s": elapsed}
+
+                states = {match_state_key("match_probabilities", n): n for n in range(1, len(pairings) + 1)}
+                predicted = set()
+                message = types.Content(role="user", parts=[types.Part(text=_card_prompt(pairings))])
+                async for event in runner.run_async(user_id=user_id, session_id=session.id, new_message=message):
+                    delta = event.actions.state_delta if event.actions else {}
+                    for state_key in delta.keys() & (states.keys() - predicted):
+                        predicted.add(state_key)
+                        update = _match_update(engine, states[state_key], pairings, delta[state_key])
+                        update.update(self._cup(engine))
+                        update["elapsed_s"] = round(time.perf_counter() - started, 3)
+                        yield update
+
+                final = await self.session_service.get_session(
+                    app_name=APP_NAME, user_id=user_id, session_id=session.id
+                )
+                card = {"type": "card", "session_id": session.id, **self._cup(engine)}
+                card["matches_missing"] = sorted(states[state_key] for state_key in states.keys() - predicted)
+                try:
+                    card["simulation"] = load_state(final.state.get(SIMULATION_STATE_KEY), CardSimulation).model_dump()
+                except ValueError:
+                    card["simulation"] = None
+                card["elapsed_s"] = round(time.perf_counter() - started, 3)
+                self._stats["cards"] += 1
+                yield card
+        except Exception:
+            self._stats["failed"] += 1
+            raise
+        finally:
+            self._runner_users[key] -= 1
+            if not self._runner_users[key]:
+                del self._runner_users[key]
+            self._active -= 1
+            self._card_slots.release()
+            await self._evict_runners()
+
+    def stats(self) -> dict:
+        """Returns the card, scheduler and session counters."""
+        return {
+            "cards": {"active": self._active, "waiting": self._waiting, "runners": len(self._runners), **self._stats},
+            "model_calls": self.scheduler.stats(),
+            "sessions": self.session_service.stats(),
+        }
+
+    async def close(self):
+        """Closes every Runner's toolsets, including shared MCP connections."""
+        runners, self._runners = list(self._runners.values()), OrderedDict()
+        for runner in runners:
+            await self._close_toolsets(runner)
+        for toolset in list(_SHARED_MCP_TOOLSETS.values()):
+            await toolset.close()
+
+
+class PredictRequest(BaseModel):
+    """
+    Body of `POST /predict`; fields left out default to the 2025 card.
+
+    Validate with `context={"player_index": ...}` (a `PlayerNameIndex`) to also reject
+    players the DataGolf store doesn't know.
+    """
+
+    pairings: list[tuple[str, str]] = Field(default_factory=lambda: list(DEFAULT_PAIRINGS), min_length=1, max_length=12)
+    starting_score: dict[str, float] = Field(default_factory=lambda: dict(DEFAULT_STARTING_SCORE))
+    user_id: str = Field(default="anonymous", min_length=1)
+
+    @field_validator("pairings")
+    @classmethod
+    def _check_players(cls, pairings: list, info: ValidationInfo) -> list:
+        index = (info.context or {}).get("player_index")
+        seen, problems = {}, []
+        for name in (name for pairing in pairings for name in pairing):
+            canonical = index.resolve(name) if index is not None else name
+            if canonical is None:
+                suggestions = ", ".join(index.suggest(name))
+                problems.append(f"unknown player {name!r}" + (f" (did you mean {suggestions}?)" if suggestions else ""))
+                continue
+            key = normalize_name(canonical)
+            if key in seen:
+                problems.append(f"{name!r} plays twice (also as {seen[key]!r})")
+            seen.setdefault(key, name)
+        if problems:
+            raise ValueError("; ".join(problems))
+        return pairings
+
+    @field_validator("starting_score")
+    @classmethod
+    def _check_score(cls, starting_score: dict) -> dict:
+        if set(starting_score) != set(TEAMS):
+            raise ValueError(f"needs exactly the teams {', '.join(TEAMS)}")
+        if any(points < 0 for points in starting_score.values()):
+            raise ValueError("points can't be negative")
+        return starting_score
+
+
+def create_app(service: PredictionService, player_index=None):
+    """
+    Creates the HTTP front end of a `PredictionService`.
+
+    `POST /predict` takes a `PredictRequest`, {"pairings": [[europe, usa], ...],
+    "starting_score": {...}, "user_id": "..."}, and streams the `predict` events as
+    newline-delimited JSON. It answers 422 for an invalid card (no matches, a player
+    twice, a player not in the store) and 503 when the service is overloaded.
+    `GET /stats` returns `service.stats()`.
+
+    Args:
+        service: The service to serve.
+        player_index: `PlayerNameIndex` the card's players must resolve in; defaults
+                      to the DataGolf server's, built from the same player store.
+
+    Returns:
+        FastAPI: The ASGI app.
+    """
+    # Imported here: only the HTTP front end needs FastAPI
+    from fastapi import FastAPI
+    from fastapi import Request
+    from fastapi.responses import JSONResponse
+    from fastapi.responses import StreamingResponse
+
+    if player_index is None:
+        from mcp_servers.datagolf_server import PLAYER_INDEX as player_index
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await service.close()
+
+    app = FastAPI(title="Ryder Cup prediction service", lifespan=lifespan)
+
+    @app.post("/predict")
+    async def predict(request: Request):
+        try:
+            body = await request.json() if await request.body() else {}
+        except ValueError as error:
+            return JSONResponse({"error": f"Invalid JSON: {error}"}, status_code=400)
+        try:
+            card = PredictRequest.model_validate(body, context={"player_index": player_index})
+        except ValidationError as error:
+            detail = [
+                {"loc": list(problem["loc"]), "msg": problem["msg"]}
+                for problem in error.errors(include_url=False, include_context=False, include_input=False)
+            ]
+            return JSONResponse({"error": "Invalid card", "detail": detail}, status_code=422)
+        events = service.predict(card.pairings, card.starting_score, user_id=card.user_id)
+        try:
+            # Admission happens before the first event, so an overload is still a plain 503
+            accepted = await anext(events)
+        except ServiceOverloaded as error:
+            await events.aclose()
+            return JSONResponse({"error": str(error)}, status_code=503, headers={"Retry-After": "1"})
+
+        async def stream():
+            yield json.dumps(accepted) + "\n"
+            try:
+                async for event in events:
+                    yield json.dumps(event) + "\n"
+            except Exception as error:
+                logger.exception("Card prediction failed")
+                yield json.dumps({"type": "error", "error": str(error)}) + "\n"
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    @app.get("/stats")
+    async def stats():
+        return service.stats()
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Ryder Cup card predictions over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--numeric", action="store_true", help="Score the matchups numerically")
+    parser.add_argument(
+        "--stub", type=float, metavar="LATENCY", default=None, help="Use the offline StubLlm with this latency (s)"
+    )
+    parser.add_argument("--max-model-calls", type=int, default=16, help="Model calls in flight at once")
+    parser.add_argument("--requests-per-minute", type=float, default=None, help="Model request rate limit")
+    parser.add_argument("--max-pending-calls", type=int, default=256, help="Model calls queued before rejecting")
+    parser.add_argument("--max-active-cards", type=int, default=8, help="Cards predicted at once")
+    parser.add_argument("--max-waiting-cards", type=int, default=64, help="Cards queued before rejecting")
+    parser.add_argument("--max-sessions", type=int, default=1024, help="Sessions kept in memory")
+    parser.add_argument("--session-ttl", type=float, default=3600.0, help="Idle session lifetime (s)")
+    args = parser.parse_args()
+
+    # Imported here: only the server needs uvicorn
+    import uvicorn
+
+    model = None
+    if args.stub is not None:
+        from ryder_cup_prediction.stub_llm import StubLlm
+
+        model = StubLlm(latency=args.stub)
+    service = PredictionService(
+        model=model,
+        scheduler=ModelCallScheduler(
+            max_concurrency=args.max_model_calls,
+            requests_per_minute=args.requests_per_minute,
+            max_pending=args.max_pending_calls,
+        ),
+        session_service=BoundedSessionService(max_sessions=args.max_sessions, ttl_seconds=args.session_ttl),
+        numeric_scoring=args.numeric,
+        max_active_cards=args.max_active_cards,
+        max_waiting_cards=args.max_waiting_cards,
+    )
+    uvicorn.run(create_app(service), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Vectorized Monte Carlo engine for the Sunday singles session.
+
+Each of the 12 singles matches is described by three probabilities from
+Europe's point of view: Europe win, halve, USA win. The engine draws whole
+Sunday sessions in batched NumPy arrays, adds them to the score after
+Saturday and reports the distribution of team totals together with the
+probability that each side wins or retains the cup.
+
+Points are tracked internally in half-point units (win = 2, halve = 1,
+loss = 0) so that a full session fits in small integer arrays.
+"""
+
+from dataclasses import dataclass
+from dataclasses import field
+
+import numpy as np
+
+TEAMS = ("Europe", "USA")
+
+# 28 points are available across the three days; the holder retains with 14.
+TOTAL_POINTS = 28.0
+RETAIN_POINTS = TOTAL_POINTS / 2
+
+# The 2025 Sunday singles card (Europe player first) and the score after Saturday,
+# the default card of the command lines and the prediction service
+DEFAULT_PAIRINGS = [
+    ("Justin Rose", "Cameron Young"),
+    ("Tommy Fleetwood", "Justin Thomas"),
+    ("Matt Fitzpatrick", "Bryson DeChambeau"),
+    ("Rory McIlroy", "Scottie Scheffler"),
+    ("Ludvig Åberg", "Patrick Cantlay"),
+    ("Jon Rahm", "Xander Schauffele"),
+    ("Sepp Straka", "J. J. Spaun"),
+    ("Shane Lowry", "Russell Henley"),
+    ("Rasmus Højgaard", "Ben Griffin"),
+    ("Tyrrell Hatton", "Collin Morikawa"),
+    ("Robert MacIntyre", "Sam Burns"),
+    ("Viktor Hovland", "Harris English"),
+]
+DEFAULT_STARTING_SCORE = {"USA": 4.5, "Europe": 11.5}
+
+DEFAULT_NUM_SIMULATIONS = 100_000
+DEFAULT_BATCH_SIZE = 131_072
+
+
+@dataclass
+class SimulationResult:
+    """Aggregated outcome of a Monte Carlo run over the singles session."""
+
+    num_simulations: int
+    seed: int | None
+    holder: str
+    starting_score: dict
+    # Final team total (e.g. 15.5) -> probability, from Europe's perspective.
+    europe_total_distribution: dict = field(default_factory=dict)
+    expected_points: dict = field(default_factory=dict)
+    # Per-match expected singles points for Europe and the USA.
+    match_expected_points: list = field(default_factory=list)
+    win_probability: dict = field(default_factory=dict)
+    retain_probability: float = 0.0
+    tie_probability: float = 0.0
+
+    def to_dict(self) -> dict:
+        """Returns a JSON-serializable view of the result."""
+        return {
+            "num_simulations": self.num_simulations,
+            "seed": self.seed,
+            "holder": self.holder,
+            "starting_score": dict(self.starting_score),
+            "europe_total_distribution": {f"{k:g}": v for k, v in self.europe_total_distribution.items()},
+            "expected_points": dict(self.expected_points),
+            "match_expected_points": list(self.match_expected_points),
+            "win_probability": dict(self.win_probability),
+            "retain_probability": self.retain_probability,
+            "tie_probability": self.tie_probability,
+        }
+
+
+def probabilities_to_array(match_probabilities) -> np.ndarray:
+    """
+    Normalizes match probabilities into an (n_matches, 3) array.
+
+    Args:
+        match_probabilities: Either an array-like of [europe_win, halve, usa_win]
+                             rows or a list of dicts with the keys
+                             `europe_win_prob`, `tie_prob` and `usa_win_prob`.
+
+    Returns:
+        np.ndarray: Rows of [europe_win, halve, usa_win] that each sum to 1.
+    """
+    rows = []
+    for match in match_probabilities:
+        if isinstance(match, dict):
+            rows.append([match["europe_win_prob"], match["tie_prob"], match["usa_win_prob"]])
+        else:
+            rows.append(list(match))
+
+    probs = np.asarray(rows, dtype=np.float64).reshape(-1, 3)
+    if np.any(probs < 0):
+        raise ValueError("Match probabilities must be non-negative")
+
+    totals = probs.sum(axis=1, keepdims=True)
+    if np.any(totals <= 0):
+        raise ValueError("Each match needs at least one outcome with positive probability")
+
+    # LLM-produced probabilities rarely sum to exactly 1, so rescale them.
+    return probs / totals
+
+
+def simulate_singles(
+    match_probabilities,
+    starting_score: dict,
+    num_simulations: int = DEFAULT_NUM_SIMULATIONS,
+    seed: int | None = None,
+    holder: str = "Europe",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> SimulationResult:
+    """
+    Simulates full Sunday singles sessions and aggregates the team totals.
+
+    Args:
+        match_probabilities: Per-match [europe_win, halve, usa_win] probabilities,
+                             see `probabilities_to_array`.
+        starting_score: Points after Saturday, e.g. {"USA": 4.5, "Europe": 11.5}.
+        num_simulations: Number of full sessions to draw.
+        seed: Seed for the random generator; the same seed reproduces the run.
+        holder: The team holding the cup, which retains it on a 14-14 tie.
+        batch_size: Sessions drawn per NumPy batch, bounds peak memory.
+
+    Returns:
+        SimulationResult: Team-total distribution, win/retain probabilities and
+                          per-match expected points.
+    """
+    if holder not in TEAMS:
+        raise ValueError(f"Unknown holder: {holder}")
+    if num_simulations <= 0:
+        raise ValueError("num_simulations must be positive")
+
+    probs = probabilities_to_array(match_probabilities)
+    n_matches = probs.shape[0]
+
+    # Europe earns a half point below the halve threshold and another below the
+    # win threshold, so one uniform draw per match decides the outcome.
+    win_threshold = probs[:, 0].astype(np.float32)
+    halve_threshold = (probs[:, 0] + probs[:, 1]).astype(np.float32)
+
+    rng = np.random.default_rng(seed)
+    session_counts = np.zeros(2 * n_matches + 1, dtype=np.int64)
+    match_half_points = np.zeros(n_matches, dtype=np.int64)
+
+    remaining = num_simulations
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        draws = rng.random((size, n_matches), dtype=np.float32)
+        half_points = (draws < win_threshold).view(np.int8) + (draws < halve_threshold).view(np.int8)
+
+        session_counts += np.bincount(half_points.sum(axis=1), minlength=2 * n_matches + 1)
+        match_half_points += half_points.sum(axis=0, dtype=np.int64)
+        remaining -= size
+
+    session_probs = session_counts / num_simulations
+    europe_totals = starting_score["Europe"] + np.arange(2 * n_matches + 1) / 2
+    usa_totals = starting_score["USA"] + n_matches - np.arange(2 * n_matches + 1) / 2
+
+    europe_win = float(session_probs[europe_totals > RETAIN_POINTS].sum())
+    usa_win = float(session_probs[usa_totals > RETAIN_POINTS].sum())
+    tie = float(session_probs[europe_totals == RETAIN_POINTS].sum())
+
+    europe_match_points = match_half_points / (2 * num_simulations)
+
+    return SimulationResult(
+        num_simulations=num_simulations,
+        seed=seed,
+        holder=holder,
+        starting_score=dict(starting_score),
+        europe_total_distribution={
+            float(total): float(p) for total, p in zip(europe_totals, session_probs) if p > 0
+        },
+        expected_points={
+            "Europe": float(europe_totals @ session_probs),
+            "USA": float(usa_totals @ session_probs),
+        },
+        match_expected_points=[
+            {"match": i + 1, "Europe": float(points), "USA": float(1 - points)}
+            for i, points in enumerate(europe_match_points)
+        ],
+        win_probability={"Europe": europe_win, "USA": usa_win},
+        retain_probability=(europe_win if holder == "Europe" else usa_win) + tie,
+        tie_probability=tie,
+    )
+
+
+def simulate_ryder_cup_singles(
+    match_probabilities: list[dict],
+    europe_starting_score: float,
+    usa_starting_score: float,
+    num_simulations: int = DEFAULT_NUM_SIMULATIONS,
+    seed: int = 0,
+) -> dict:
+    """
+    Runs a Monte Carlo simulation of the full Sunday singles session.
+
+    Call this once the win/tie probabilities of all singles matches are known.
+
+    Args:
+        match_probabilities: One entry per match with the keys `europe_win_prob`,
+                             `tie_prob` and `usa_win_prob`.
+        europe_starting_score: Europe's points before the singles.
+        usa_starting_score: USA's points before the singles.
+        num_simulations: Number of simulated sessions (100,000 to 1,000,000).
+        seed: Random seed, reuse it to reproduce a run.
+
+    Returns:
+        dict: Team-total distribution, each side's win probability, Europe's
+              retain probability and the expected points of every match, or
+              {"error": ...} if the arguments are malformed.
+    """
+    try:
+        result = simulate_singles(
+            match_probabilities,
+            starting_score={"Europe": europe_starting_score, "USA": usa_starting_score},
+            num_simulations=num_simulations,
+            seed=seed,
+        )
+    except (KeyError, TypeError, ValueError) as error:
+        # Returned, not raised: ADK re-raises tool exceptions, which would end the whole run
+        detail = f"missing key {error}" if isinstance(error, KeyError) else str(error)
+        return {"error": f"Invalid simulation arguments: {detail}"}
+    return result.to_dict()
@@ -0,0 +1,195 @@
+"""
+Deterministic stand-in for Gemini to run the real agent tree offline.
+
+`StubLlm` plays every pipeline stage with a fixed script instead of a model:
+
+- with the DataGolf tools available (PlayerProfilerAgent) it calls
+  `getPlayersTrueStrokesGained` for the match's players, then returns the
+  tool result as the compact player profiles (through ADK's
+  `set_model_response` tool when the agent has an output schema);
+- with `simulate_ryder_cup_singles` available (coordinator, card aggregator)
+  it calls the simulation with the match probabilities found in its
+  instruction, then reports the tool result;
+- asked for match probabilities (MatchupSynthesizerAgent) it returns a fixed
+  probability JSON derived from the player names;
+- any other stage with an output schema gets a placeholder JSON of that
+  schema, and stages without one a short canned summary.
+
+Its answers depend only on the request, so runs are reproducible. It needs no
+credentials or network, which makes it useful for benchmarks and CI.
+
+    agent = create_agent(pairings=pairings, starting_score=score, model=StubLlm(latency=0.5))
+"""
+
+import asyncio
+import json
+import re
+import zlib
+from typing import AsyncGenerator
+
+from google.adk.models import BaseLlm
+from google.adk.models import LlmRequest
+from google.adk.models import LlmResponse
+from google.genai import types
+from pydantic import BaseModel
+from ryder_cup_prediction.schemas import PlayerProfile
+
+PLAYERS_TOOL = "getPlayersTrueStrokesGained"
+SIMULATION_TOOL = "simulate_ryder_cup_singles"
+# Added by ADK to agents with both tools and an output_schema
+STRUCTURED_RESPONSE_TOOL = "set_model_response"
+
+_PAIRING = re.compile(r"([^\n:]+?) \(Europe\) vs ([^\n]+?) \(USA\)")
+_SCORES = {team: re.compile(team + r":?\s*([0-9]+(?:\.[0-9]+)?)") for team in ("Europe", "USA")}
+_PROBABILITY = re.compile(r"""['"](europe_win_prob|tie_prob|usa_win_prob)['"]:\s*([0-9.]+)""")
+
+# Used for a match without probabilities, as instructed in CARD_AGGREGATOR_INSTRUCTIONS
+_EVEN_MATCH = {"europe_win_prob": 0.45, "tie_prob": 0.10, "usa_win_prob": 0.45}
+
+
+def _is_model(schema) -> bool:
+    return isinstance(schema, type) and issubclass(schema, BaseModel)
+
+
+def _text(content: types.Content | None) -> str:
+    if not content or not content.parts:
+        return ""
+    return "\n".join(part.text for part in content.parts if part.text)
+
+
+def _tool_result(response: dict):
+    """Unwraps an MCP CallToolResult dump or a plain function tool result."""
+    if "structuredContent" in response:
+        return response["structuredContent"].get("result", response["structuredContent"])
+    if "content" in response and isinstance(response["content"], list):
+        return json.loads(response["content"][0]["text"])
+    return response.get("result", response)
+
+
+def _placeholder(schema: dict, definitions: dict):
+    """Builds the smallest value matching a JSON schema: first enum value, zeros and one-item lists."""
+    if "$ref" in schema:
+        return _placeholder(definitions[schema["$ref"].rsplit("/", 1)[-1]], definitions)
+    if "anyOf" in schema:
+        return _placeholder(next(option for option in schema["anyOf"] if option.get("type") != "null"), definitions)
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if kind == "object":
+        return {name: _placeholder(field, definitions) for name, field in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [_placeholder(schema.get("items", {}), definitions)]
+    return {"string": "stub", "number": 0.0, "integer": 0, "boolean": False}.get(kind)
+
+
+def stub_probabilities(europe_player: str, usa_player: str) -> dict:
+    """Returns fixed, name-derived probabilities of a match (Europe point of view)."""
+    spread = zlib.crc32(f"{europe_player}|{usa_player}".encode()) % 31 / 100
+    europe_win = round(0.28 + spread, 2)
+    tie = 0.12
+    return {"europe_win_prob": europe_win, "tie_prob": tie, "usa_win_prob": round(1 - europe_win - tie, 2)}
+
+
+class StubLlm(BaseLlm):
+    """Scripted, credential-free model that drives the pipeline's tools like the real model would."""
+
+    model: str = "stub-llm"
+    latency: float = 0.0
+    """Seconds each call sleeps to mimic model latency."""
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"stub-llm.*"]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        instruction = str(llm_request.config.system_instruction or "") if llm_request.config else ""
+        conversation = "\n".join(_text(content) for content in llm_request.contents)
+        last_parts = (llm_request.contents[-1].parts or []) if llm_request.contents else []
+        function_responses = [part.function_response for part in last_parts if part.function_response]
+
+        response_schema = llm_request.config.response_schema if llm_request.config else None
+        if function_responses:
+            structured = STRUCTURED_RESPONSE_TOOL in llm_request.tools_dict
+            parts = [self._answer_tool_result(response, structured) for response in function_responses]
+        elif PLAYERS_TOOL in llm_request.tools_dict:
+            players = [name.strip() for pairing in _PAIRING.findall(instruction or conversation) for name in pairing]
+            parts = [types.Part(function_call=types.FunctionCall(name=PLAYERS_TOOL, args={"player_names": players}))]
+        elif SIMULATION_TOOL in llm_request.tools_dict:
+            args = self._simulation_args(instruction, conversation)
+            parts = [types.Part(function_call=types.FunctionCall(name=SIMULATION_TOOL, args=args))]
+        elif _is_model(response_schema) and "player_A_win_prob" in response_schema.model_fields:
+            parts = [types.Part(text=json.dumps(self._match_probabilities(instruction)))]
+        elif _is_model(response_schema):
+            schema = response_schema.model_json_schema()
+            parts = [types.Part(text=json.dumps(_placeholder(schema, schema.get("$defs", {}))))]
+        else:
+            parts = [types.Part(text=f"Stub analysis ({len(instruction)} instruction characters).")]
+
+        content = types.Content(role="model", parts=parts)
+        yield LlmResponse(
+            content=content,
+            turn_complete=True,
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                # Rough 4-characters-per-token estimate, for token accounting in benchmarks
+                prompt_token_count=(len(instruction) + len(conversation)) // 4,
+                candidates_token_count=len(content.model_dump_json(exclude_none=True)) // 4,
+            ),
+        )
+
+    def _answer_tool_result(self, function_response: types.FunctionResponse, structured: bool) -> types.Part:
+        result = _tool_result(function_response.response or {})
+        if function_response.name == PLAYERS_TOOL and isinstance(result, dict) and structured:
+            players = [
+                PlayerProfile.from_windows(name, data).model_dump()
+                for name, data in result.items()
+                if isinstance(data, dict) and "error" not in data
+            ]
+            return types.Part(
+                function_call=types.FunctionCall(name=STRUCTURED_RESPONSE_TOOL, args={"players": players})
+            )
+        if function_response.name == PLAYERS_TOOL and isinstance(result, dict):
+            profiles = {
+                f"player{i + 1}": {"name": name, "true_strokes_gained": data}
+                for i, (name, data) in enumerate(result.items())
+                if isinstance(data, dict)
+            }
+            return types.Part(text=f"```json\n{json.dumps(profiles)}\n```")
+        return types.Part(text=f"```json\n{json.dumps(result)}\n```")
+
+    def _match_probabilities(self, instruction: str) -> dict:
+        pairing = _PAIRING.search(instruction)
+        europe_player, usa_player = (name.strip() for name in pairing.groups()) if pairing else ("Europe", "USA")
+        probabilities = stub_probabilities(europe_player, usa_player)
+        return {
+            "player_A": europe_player,
+            "player_B": usa_player,
+            "player_A_win_prob": probabilities["europe_win_prob"],
+            "tie_prob": probabilities["tie_prob"],
+            "player_B_win_prob": probabilities["usa_win_prob"],
+            **probabilities,
+        }
+
+    def _simulation_args(self, instruction: str, conversation: str) -> dict:
+        # Each "Match n: ..." block of the aggregator instruction carries that match's state
+        blocks = re.split(r"\nMatch \d+: ", instruction)[1:] or [instruction]
+        matches = []
+        for block in blocks:
+            found = dict(_PROBABILITY.findall(block))
+            complete = len(found) == len(_EVEN_MATCH)
+            matches.append({key: float(found[key]) for key in _EVEN_MATCH} if complete else dict(_EVEN_MATCH))
+
+        scores = {}
+        for team, pattern in _SCORES.items():
+            found = pattern.search(instruction) or pattern.search(conversation)
+            scores[team] = float(found.group(1)) if found else 0.0
+        return {
+            "match_probabilities": matches,
+            "europe_starting_score": scores["Europe"],
+            "usa_starting_score": scores["USA"],
+            "seed": 0,
+        }
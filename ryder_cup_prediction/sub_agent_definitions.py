@@ -3,17 +3,49 @@ MASTER_INSTRUCTIONS = """You are a world-class golf analyst coordinating a seque
 
 Your process:
 1. Delegate to the MatchAnalysisPipeline sub-agent for each match
-2. The pipeline will automatically execute 5 stages for each match:
+2. The pipeline will automatically execute 4 stages for each match:
    - PlayerProfilerAgent: Fetches TSG data
    - RecentFormAnalyst: Analyzes 3-month trends
    - BaselineSkillAnalyst: Analyzes 2-year baseline
    - MatchupSynthesizerAgent: Synthesizes probabilities
-   - MonteCarloSimulationAgent: Generates discrete outcome
-3. Collect results and aggregate the final score
+3. Collect the win/tie probabilities of every match from Europe's point of view
+4. Call the `simulate_ryder_cup_singles` tool once with all match probabilities and
+   the starting score to get the team-total distribution and the cup win/retain probabilities
 
 Each stage writes to session.state and subsequent stages read from it.
 """
 
+# Instructions for the final step of the fan-out mode, which runs after all
+# per-match pipelines have finished
+CARD_AGGREGATOR_INSTRUCTIONS = """You aggregate the Sunday singles predictions of the 2025 Ryder Cup.
+
+Every match below was analyzed by its own pipeline, which saved its probabilities
+to session.state['match_<n>_match_probabilities']. The player names in each entry tell
+you which probability belongs to the Europe player and which to the USA player.
+
+Your process:
+1. Convert every match to Europe's point of view: europe_win_prob, tie_prob, usa_win_prob
+2. Call the `simulate_ryder_cup_singles` tool ONCE with all matches and the current score
+3. Report each match's prediction and the cup win/retain probabilities of both teams
+
+If a match has no probabilities, treat it as an even match (0.45 / 0.10 / 0.45) and say so.
+"""
+
+# Instructions for the optional narrative stage of the numeric scoring mode, where
+# the form, baseline and probability numbers are computed without an LLM
+NARRATIVE_INSTRUCTIONS = """You are a golf writer previewing a Ryder Cup singles match.
+
+The numbers below were computed deterministically from True Strokes Gained data. Do NOT
+change or recompute them; explain them in a short narrative (at most 120 words) covering
+each player's recent form, their baseline strengths and who is favoured.
+
+Recent form: {recent_form}
+
+Baseline skill: {baseline_skill}
+
+Match probabilities: {match_probabilities}
+"""
+
 # --- Sub-Agent Definitions ---
 # This list of dictionaries defines the specialized sub-agents [1, 7, 8]
 
@@ -34,23 +66,19 @@ def get_sub_agents(mcp_tools: list) -> list:
             "description": "Retrieves player strokes-gained data from the DataGolf MCP server.",
             "prompt": """You are a data retrieval specialist. Your task is to fetch player performance data.
 
-When given player names, use the `getPlayerTrueStrokesGained` tool to gather their 2-year and 3-month True Strokes Gained data.
-
-Format the data as a structured JSON object with both players' data. This will be automatically saved to session.state['player_profiles'] for the next agent to use.
-
-Example output format:
-{
-  "match_id": "Match 1",
-  "player1": {
-    "name": "Cameron Young",
-    "country": "USA",
-    "true_strokes_gained": {
-      "2-year": {...},
-      "3-month": {...}
-    }
-  },
-  "player2": {...}
-}""",
+When given player names, use the `getPlayersTrueStrokesGained` tool to gather their 2-year and 3-month True Strokes Gained data.
+Fetch every player you need in a single call by passing all names at once (e.g. both players of a match, or all
+24 players of a full singles card). Only fall back to `getPlayerTrueStrokesGained` for a single player that needs a retry.
+Names are matched ignoring accents, punctuation and case; always use the canonical `player_name` returned by the tool.
+If a player is not found, pick the right name from the returned `suggestions` instead of guessing spellings.
+
+Return both players in the compact `player_profiles` format: `sg_2y` and `sg_3m` hold each player's
+strokes gained per round as arrays in the order [total_sg, off_the_tee, approach, around_the_green, putting].
+List the Europe player first. It is saved to session.state['player_profiles'] for the next stages.
+
+Example output:
+{"players": [{"name": "Justin Rose", "sg_2y": [1.4, 0.3, 0.7, 0.2, 0.2], "sg_3m": [1.5, 0.35, 0.75, 0.15, 0.25]},
+             {"name": "Cameron Young", "sg_2y": [1.8, 0.8, 0.6, 0.1, 0.3], "sg_3m": [1.95, 0.85, 0.65, 0.1, 0.35]}]}""",
             "tools": player_profiler_tools,
         },
         {
@@ -58,11 +86,13 @@ Example output format:
             "description": "Analyzes a player's performance over the last 3 months to assess their current form.",
             "prompt": """You are an analyst focused on short-term trends.
 
-Read player data from session.state['player_profiles']. Analyze each player's 3-month performance data to identify significant trends (compare 3-month vs 2-year averages).
-
-Output a summary of both players' current form. This will be automatically saved to session.state['recent_form_analysis'].
+The player profiles below hold each player's strokes gained per round as arrays in the order
+[total_sg, off_the_tee, approach, around_the_green, putting], for the last 2 years (`sg_2y`) and
+the last 3 months (`sg_3m`). For each player compute `delta` = 3-month total_sg minus 2-year
+total_sg and label the `trend`: "improving" (delta >= 0.1), "declining" (delta <= -0.1) or "stable".
+Add a one-sentence `summary` comparing the two players' form.
 
-Do NOT attempt to use file operations - all data is passed via session.state.""",
+Your JSON answer is saved to session.state['recent_form_analysis'].""",
             "tools": [],
         },
         {
@@ -70,11 +100,12 @@ Do NOT attempt to use file operations - all data is passed via session.state."""
             "description": "Analyzes a player's long-term (2-year) performance data to establish their baseline skill level.",
             "prompt": """You are a statistician focused on long-term player quality.
 
-Read player data from session.state['player_profiles']. Analyze each player's 2-year True Strokes Gained data to determine their core strengths and weaknesses.
-
-Output a summary of both players' baseline skill levels. This will be automatically saved to session.state['baseline_skill_analysis'].
+The player profiles below hold each player's strokes gained per round as arrays in the order
+[total_sg, off_the_tee, approach, around_the_green, putting]. Use the 2-year values (`sg_2y`):
+report each player's `total_sg` and their `strongest` and `weakest` category (off_the_tee,
+approach, around_the_green or putting). Add a one-sentence `summary` comparing the players.
 
-Do NOT attempt to use file operations - all data is passed via session.state.""",
+Your JSON answer is saved to session.state['baseline_skill_analysis'].""",
             "tools": [],
         },
         {
@@ -82,41 +113,15 @@ Do NOT attempt to use file operations - all data is passed via session.state."""
             "description": "Synthesizes analyses from all specialist agents to predict the outcome of a single match.",
             "prompt": """You are the lead match analyst.
 
-Read the analyses from:
-- session.state['recent_form_analysis']
-- session.state['baseline_skill_analysis']
-
-Compare both players' baseline skills and recent form. Weigh these factors to determine win probabilities.
-
-Output a JSON object with probabilities. This will be automatically saved to session.state['match_probabilities'].
-
-Example format:
-{
-  "player_A": "Cameron Young",
-  "player_B": "Justin Rose",
-  "player_A_win_prob": 0.48,
-  "player_B_win_prob": 0.40,
-  "tie_prob": 0.12
-}
-
-Do NOT attempt to use file operations - all data is passed via session.state.""",
-            "tools": [],
-        },
-        {
-            "name": "MonteCarloSimulationAgent",
-            "description": "Runs a simulation of a single match to determine a discrete outcome (Win, Loss, Tie).",
-            "prompt": """You are a simulation engine.
-
-Read probabilities from session.state['match_probabilities'].
-
-Determine the most likely discrete outcome:
-- If Player A win prob is highest: output 1
-- If Player B win prob is highest: output 0
-- If tie prob is highest: output 0.5
+Compare both players' baseline skills and recent form from the analyses below. Weigh these
+factors to determine the win and halve probabilities; the three probabilities must sum to 1.
+Set `europe_win_prob` and `usa_win_prob` to the win probabilities of the Europe and the USA player.
 
-Output the result as a simple statement. This will be automatically saved to session.state['simulation_results'].
+Your JSON answer is saved to session.state['match_probabilities'].
 
-Do NOT attempt to use file operations - all data is passed via session.state.""",
+Example:
+{"player_A": "Justin Rose", "player_B": "Cameron Young", "player_A_win_prob": 0.40, "tie_prob": 0.12,
+ "player_B_win_prob": 0.48, "europe_win_prob": 0.40, "usa_win_prob": 0.48}""",
             "tools": [],
         },
     ]